@@ -1,9 +1,12 @@
 """Top-level package for aimet-ml."""
-import static_ffmpeg
+from typing import TYPE_CHECKING
 
-from . import features, processing, utils
+from ._lazy import attach
 
-static_ffmpeg.add_paths()
+if TYPE_CHECKING:
+    from . import features, metrics, model_selection, processing, utils
+
+__getattr__, __dir__, __all__ = attach(__name__, ["features", "metrics", "model_selection", "processing", "utils"])
 
 __author__ = """Pasit Jakkrawankul"""
 __email__ = 'pasit.j@aimet.tech'
@@ -0,0 +1,41 @@
+import importlib
+import sys
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def attach(
+    package_name: str,
+    submodules: Iterable[str] = (),
+    submodule_attrs: Optional[Dict[str, Iterable[str]]] = None,
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]], List[str]]:
+    """
+    Build PEP 562 `__getattr__` and `__dir__` hooks that import submodules on first attribute access.
+
+    Args:
+        package_name (str): The `__name__` of the package installing the hooks.
+        submodules (Iterable[str], optional): Submodule names exposed as attributes of the package.
+        submodule_attrs (Dict[str, Iterable[str]], optional): Mapping from a submodule name to the attribute names
+            it re-exports at the package level.
+
+    Returns:
+        Tuple[Callable, Callable, List[str]]: The `__getattr__` function, the `__dir__` function and `__all__`.
+    """
+    submodules = set(submodules)
+    attr_to_submodule = {attr: submodule for submodule, attrs in (submodule_attrs or {}).items() for attr in attrs}
+    __all__ = sorted(submodules | set(attr_to_submodule))
+
+    def __getattr__(name: str) -> Any:
+        if name in submodules:
+            return importlib.import_module(f"{package_name}.{name}")
+        if name in attr_to_submodule:
+            module: ModuleType = importlib.import_module(f"{package_name}.{attr_to_submodule[name]}")
+            value = getattr(module, name)
+            setattr(sys.modules[package_name], name, value)
+            return value
+        raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+
+    def __dir__() -> List[str]:
+        return __all__.copy()
+
+    return __getattr__, __dir__, __all__
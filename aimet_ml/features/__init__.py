@@ -1 +1,8 @@
-from . import audio, facial, textual
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+if TYPE_CHECKING:
+    from . import audio, facial, textual
+
+__getattr__, __dir__, __all__ = attach(__name__, ["audio", "facial", "textual"])
@@ -0,0 +1,210 @@
+import asyncio
+import time
+from collections import Counter, deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+from .transformers import TransformerFeatureExtractor
+
+
+@dataclass
+class BatchingMetrics:
+    """Snapshot of the request and batch statistics of a `BatchingFeatureExtractor`."""
+
+    queue_depth: int = 0
+    num_requests: int = 0
+    num_batches: int = 0
+    batch_size_histogram: Dict[int, int] = field(default_factory=dict)
+    latency_p50: float = 0.0
+    latency_p99: float = 0.0
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Average number of requests per forward pass."""
+        return self.num_requests / self.num_batches if self.num_batches else 0.0
+
+
+class BatchingFeatureExtractor:
+    """
+    Asyncio front end that groups concurrent requests into batched calls of a `TransformerFeatureExtractor`.
+
+    Requests are queued, and a background task collects them into a batch until it holds `max_batch_size` texts or
+    `max_wait` seconds have passed since its first request. The batch is passed to `extract_features` in an executor,
+    so the event loop keeps accepting requests during the forward pass, and each caller receives its own vector.
+
+    It can be used as an async context manager, which processes the queued requests and stops the batching task on
+    exit.
+    """
+
+    def __init__(
+        self,
+        extractor: TransformerFeatureExtractor,
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+        executor: Optional[Executor] = None,
+        num_latency_samples: int = 10000,
+    ):
+        """
+        Initializes the BatchingFeatureExtractor.
+
+        Args:
+            extractor (TransformerFeatureExtractor): The feature extractor running the batches.
+            max_batch_size (int, optional): Maximum number of texts per batch. Default is 32.
+            max_wait (float, optional): Maximum time in seconds a batch waits for more requests after its first one.
+                Default is 0.005.
+            executor (Executor, optional): Executor running `extract_features`. Default is None, which uses a
+                dedicated single thread.
+            num_latency_samples (int, optional): Number of most recent request latencies the percentiles are
+                computed from. Default is 10000.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive integer")
+        if max_wait < 0:
+            raise ValueError("max_wait must not be negative")
+
+        self.extractor = extractor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._executor = executor
+        self._own_executor = executor is None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._num_requests = 0
+        self._batch_sizes: Counter = Counter()
+        self._latencies: Deque[float] = deque(maxlen=num_latency_samples)
+
+    async def extract(self, text: str) -> torch.Tensor:
+        """
+        Extract the features of one text, batched with the other pending requests.
+
+        The batching task is started on the first request.
+
+        Args:
+            text (str): Input text.
+
+        Returns:
+            torch.Tensor: The feature vector of the text.
+
+        Raises:
+            RuntimeError: If the extractor is stopping or stopped.
+        """
+        if self._stopping or (self._task is not None and self._task.done()):
+            raise RuntimeError("BatchingFeatureExtractor is stopped")
+        if self._task is None:
+            self.start()
+        assert self._queue is not None
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, future, time.perf_counter()))
+        return await future
+
+    def start(self) -> None:
+        """Start the batching task on the running event loop."""
+        if self._task is not None:
+            raise RuntimeError("BatchingFeatureExtractor is already started")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Process the queued requests, then stop the batching task. Later requests are rejected."""
+        self._stopping = True
+        if self._task is None or self._queue is None:
+            return
+        if not self._task.done():
+            self._queue.put_nowait(None)
+        await self._task
+        if self._own_executor and self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def metrics(self) -> BatchingMetrics:
+        """
+        Get a snapshot of the current statistics.
+
+        Returns:
+            BatchingMetrics: The number of queued requests, the numbers of requests and batches, the batch size
+                histogram and the 50th and 99th percentiles of the request latency in seconds, from enqueuing a
+                request to resolving it.
+        """
+        latency_p50, latency_p99 = np.percentile(self._latencies, [50, 99]) if self._latencies else (0.0, 0.0)
+        return BatchingMetrics(
+            queue_depth=self._queue.qsize() if self._queue is not None else 0,
+            num_requests=self._num_requests,
+            num_batches=sum(self._batch_sizes.values()),
+            batch_size_histogram=dict(sorted(self._batch_sizes.items())),
+            latency_p50=float(latency_p50),
+            latency_p99=float(latency_p99),
+        )
+
+    async def __aenter__(self) -> "BatchingFeatureExtractor":
+        """Start the batching task."""
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Process the queued requests, then stop the batching task."""
+        await self.stop()
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        try:
+            await self._run_batches(self._queue)
+        finally:
+            # requests that were not taken into a batch would otherwise never be resolved
+            while not self._queue.empty():
+                request = self._queue.get_nowait()
+                if request is not None and not request[1].done():
+                    request[1].set_exception(RuntimeError("BatchingFeatureExtractor is stopped"))
+
+    async def _run_batches(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            request = await queue.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        request = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    request = queue.get_nowait()
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            await self._run_batch(batch)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        texts = [text for text, _, _ in batch]
+        try:
+            features = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self.extractor.extract_features, texts
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for row, (_, future, _) in enumerate(batch):
+                # requests whose caller gave up are cancelled, and their results are dropped
+                if not future.done():
+                    future.set_result(features[row])
+
+        now = time.perf_counter()
+        self._latencies.extend(now - enqueued for _, _, enqueued in batch)
+        self._num_requests += len(batch)
+        self._batch_sizes[len(batch)] += 1
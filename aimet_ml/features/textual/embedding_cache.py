@@ -0,0 +1,178 @@
+import fcntl
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def text_key(text: str) -> str:
+    """
+    Compute the cache key of a text.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest of the UTF-8 encoded text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Append-only on-disk store of embedding vectors, keyed by text hash.
+
+    Each namespace, e.g. one model and extraction configuration, is a directory holding the vectors as one raw
+    array file that is memory-mapped for reads, and an index of `key row` lines. Writers append under an exclusive
+    file lock, vectors before their index lines, so concurrent processes can share one cache and readers never see
+    an index entry whose vector is incomplete.
+    """
+
+    def __init__(self, cache_dir: str, namespace: Dict[str, Any], dtype: str = "float32"):
+        """
+        Initializes the EmbeddingCache.
+
+        Args:
+            cache_dir (str): Root directory of the cache. It is created if it does not exist.
+            namespace (Dict[str, Any]): JSON-serializable description of everything the vectors depend on besides
+                the text, such as the model name, revision and extraction parameters.
+            dtype (str, optional): Storage dtype of new namespaces, "float32" or "float16". Default is "float32".
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        namespace_key = hashlib.sha256(json.dumps(namespace, sort_keys=True).encode()).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, namespace_key)
+        self.namespace = namespace
+        self.dtype = dtype
+        self.dim: Optional[int] = None
+        self._rows: Dict[str, int] = {}
+        self._index_offset = 0
+        self._num_vectors = 0
+        self._vectors: Optional[np.ndarray] = None
+        os.makedirs(self.path, exist_ok=True)
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.bin")
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.path, "index.txt")
+
+    def __len__(self) -> int:
+        """Number of cached vectors."""
+        self._refresh()
+        return len(self._rows)
+
+    def keys(self) -> List[str]:
+        """
+        List the cached keys.
+
+        Returns:
+            List[str]: The keys in insertion order.
+        """
+        self._refresh()
+        return list(self._rows)
+
+    def get(self, keys: Sequence[str]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Look up the vectors of many keys.
+
+        Args:
+            keys (Sequence[str]): The keys, e.g. from `text_key`.
+
+        Returns:
+            Tuple[np.ndarray, Optional[np.ndarray]]: A boolean array marking the cached keys, and a float32 array of
+                shape `(len(keys), dim)` whose rows are filled for the cached keys, or None if the cache is empty.
+        """
+        self._refresh()
+        rows = np.array([self._rows.get(key, -1) for key in keys], dtype=np.int64)
+        found = rows >= 0
+        if self._vectors is None or self.dim is None:
+            return found, None
+        vectors = np.zeros((len(keys), self.dim), dtype=np.float32)
+        vectors[found] = self._vectors[rows[found]]
+        return found, vectors
+
+    def put(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        Append vectors to the cache. Keys that are already cached are skipped.
+
+        Args:
+            keys (Sequence[str]): The keys, one for each vector.
+            vectors (np.ndarray): The vectors, of shape `(len(keys), dim)`.
+        """
+        if len(keys) == 0:
+            return
+        with open(os.path.join(self.path, "lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._load_meta(default_dim=vectors.shape[1])
+                self._refresh_index()
+                new = {key: i for i, key in enumerate(keys) if key not in self._rows}
+                if not new:
+                    return
+                data = np.ascontiguousarray(vectors[list(new.values())], dtype=self.dtype)
+                row_bytes = data[0].nbytes
+
+                # rows are counted from the file size and the index is cut after its last complete line, so partial
+                # writes left by a crashed writer are overwritten
+                mode = "r+b" if os.path.exists(self._vectors_path) else "w+b"
+                with open(self._vectors_path, mode) as f:
+                    num_rows = os.fstat(f.fileno()).st_size // row_bytes
+                    f.seek(num_rows * row_bytes)
+                    f.write(data.tobytes())
+                    f.truncate()
+                    f.flush()
+                    os.fsync(f.fileno())
+                with open(self._index_path, "a") as f:
+                    f.truncate(self._index_offset)
+                    f.writelines(f"{key} {num_rows + i}\n" for i, key in enumerate(new))
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load_meta(self, default_dim: Optional[int] = None) -> None:
+        if self.dim is not None:
+            return
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r") as f:
+                meta = json.load(f)
+        elif default_dim is not None:
+            # only called under the write lock, so the first writer defines the layout of the namespace
+            meta = {"dim": default_dim, "dtype": self.dtype, "namespace": self.namespace}
+            tmp_path = f"{self._meta_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, self._meta_path)
+        else:
+            return
+        self.dim, self.dtype = meta["dim"], meta["dtype"]
+
+    def _refresh_index(self) -> None:
+        # read the index lines appended since the last refresh, ignoring a partially written last line
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
+        complete = data[: data.rfind(b"\n") + 1]
+        self._index_offset += len(complete)
+        for line in complete.decode().splitlines():
+            key, row = line.split()
+            self._rows[key] = int(row)
+            self._num_vectors = max(self._num_vectors, int(row) + 1)
+
+    def _refresh(self) -> None:
+        self._load_meta()
+        self._refresh_index()
+        if self.dim is None or self._num_vectors == 0:
+            return
+        if self._vectors is None or len(self._vectors) < self._num_vectors:
+            shape = (self._num_vectors, self.dim)
+            self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=shape)
@@ -0,0 +1,152 @@
+import itertools
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .transformers import TransformerFeatureExtractor
+
+MANIFEST_FILE = "manifest.json"
+
+
+def write_embedding_shards(
+    extractor: TransformerFeatureExtractor,
+    texts: Iterable[str],
+    output_dir: str,
+    shard_size: int = 100_000,
+    chunk_size: int = 1024,
+    dtype: str = "float32",
+) -> Dict[str, Any]:
+    """
+    Extract features from a stream of texts and write them to `.npy` shards with a manifest.
+
+    Features are computed chunk by chunk with `TransformerFeatureExtractor.iter_features` and copied into a
+    memory-mapped shard file, so memory use is bounded by the chunk size rather than the number of texts. A shard is
+    written under a temporary name and recorded in `manifest.json` once it is full. If the run is interrupted,
+    calling this function again with the same texts, in the same order, skips the recorded rows and continues with
+    the next shard. Calling it after a completed run returns the manifest without extracting anything.
+
+    Args:
+        extractor (TransformerFeatureExtractor): The feature extractor.
+        texts (Iterable[str]): Input texts, such as a list, a DataFrame column or a generator.
+        output_dir (str): Directory of the shards and the manifest. It is created if it does not exist.
+        shard_size (int, optional): Number of rows per shard. The last shard may be smaller. Default is 100000.
+        chunk_size (int, optional): Number of texts per call of `extract_features`. Default is 1024.
+        dtype (str, optional): Storage dtype of the features, "float32" or "float16". Default is "float32".
+
+    Returns:
+        Dict[str, Any]: The manifest, holding the total number of rows under "num_rows", the feature dimension under
+            "dim" and the shard files and their number of rows under "shards".
+
+    Raises:
+        ValueError: If the arguments are invalid, or if `output_dir` holds shards written with another model or
+            other settings.
+    """
+    if shard_size < 1 or chunk_size < 1:
+        raise ValueError("shard_size and chunk_size must be positive integers")
+    if dtype not in ("float32", "float16"):
+        raise ValueError(f"Unsupported dtype: {dtype}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    settings = {"namespace": extractor.namespace, "shard_size": shard_size, "dtype": dtype}
+    manifest = read_manifest(output_dir) if os.path.exists(os.path.join(output_dir, MANIFEST_FILE)) else None
+    if manifest is None:
+        manifest = {**settings, "dim": None, "num_rows": 0, "shards": [], "complete": False}
+    elif any(manifest[key] != value for key, value in settings.items()):
+        raise ValueError(f"{output_dir} holds shards written with other settings: {manifest}")
+    if manifest["complete"]:
+        return manifest
+
+    shard: Optional[np.memmap] = None
+    num_rows = 0
+    remaining = itertools.islice(texts, manifest["num_rows"], None)
+    for features in extractor.iter_features(remaining, chunk_size):
+        vectors = features.numpy()
+        start = 0
+        while start < len(vectors):
+            if shard is None:
+                manifest["dim"] = vectors.shape[1]
+                shard = np.lib.format.open_memmap(
+                    _temp_path(output_dir), mode="w+", dtype=dtype, shape=(shard_size, vectors.shape[1])
+                )
+                num_rows = 0
+            count = min(shard_size - num_rows, len(vectors) - start)
+            shard[num_rows : num_rows + count] = vectors[start : start + count]
+            num_rows += count
+            start += count
+            if num_rows == shard_size:
+                _finish_shard(output_dir, manifest, shard, num_rows)
+                shard = None
+
+    if shard is not None:
+        _finish_shard(output_dir, manifest, shard, num_rows)
+    manifest["complete"] = True
+    _write_manifest(output_dir, manifest)
+    return manifest
+
+
+def read_manifest(output_dir: str) -> Dict[str, Any]:
+    """
+    Read the manifest of a shard directory.
+
+    Args:
+        output_dir (str): Directory written by `write_embedding_shards`.
+
+    Returns:
+        Dict[str, Any]: The manifest.
+    """
+    with open(os.path.join(output_dir, MANIFEST_FILE), "r") as f:
+        return json.load(f)
+
+
+def load_embedding_shards(output_dir: str, mmap: bool = True) -> List[np.ndarray]:
+    """
+    Load the shards recorded in the manifest of a shard directory.
+
+    Args:
+        output_dir (str): Directory written by `write_embedding_shards`.
+        mmap (bool, optional): If True, memory-map the shards read-only instead of reading them into memory.
+            Default is True.
+
+    Returns:
+        List[np.ndarray]: The shards in input order. Their concatenation holds one row per text.
+    """
+    manifest = read_manifest(output_dir)
+    return [
+        np.load(os.path.join(output_dir, shard["file"]), mmap_mode="r" if mmap else None)
+        for shard in manifest["shards"]
+    ]
+
+
+def _temp_path(output_dir: str) -> str:
+    return os.path.join(output_dir, f"shard.part-{os.getpid()}.npy")
+
+
+def _finish_shard(output_dir: str, manifest: Dict[str, Any], shard: np.memmap, num_rows: int) -> None:
+    file_name = f"shard-{len(manifest['shards']):05d}.npy"
+    file_path = os.path.join(output_dir, file_name)
+    temp_path = _temp_path(output_dir)
+    if num_rows < len(shard):
+        # the last shard is shorter than its preallocated file, so its rows are copied into a file of the right size
+        final = np.lib.format.open_memmap(file_path, mode="w+", dtype=shard.dtype, shape=(num_rows, shard.shape[1]))
+        final[:] = shard[:num_rows]
+        final.flush()
+        del final
+        os.remove(temp_path)
+    else:
+        shard.flush()
+        os.replace(temp_path, file_path)
+
+    manifest["shards"].append({"file": file_name, "num_rows": num_rows})
+    manifest["num_rows"] += num_rows
+    _write_manifest(output_dir, manifest)
+
+
+def _write_manifest(output_dir: str, manifest: Dict[str, Any]) -> None:
+    # written to a temporary file and renamed, so an interrupted run never leaves a truncated manifest
+    file_path = os.path.join(output_dir, MANIFEST_FILE)
+    temp_path = f"{file_path}.part-{os.getpid()}"
+    with open(temp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, file_path)
@@ -0,0 +1,208 @@
+import multiprocessing as mp
+import os
+import queue
+import traceback
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+import torch
+
+from .transformers import TransformerFeatureExtractor
+
+
+def _worker(
+    worker_id: int,
+    extractor_kwargs: dict,
+    num_threads: int,
+    cores: Optional[Set[int]],
+    tasks: Any,
+    results: Any,
+) -> None:
+    try:
+        if cores is not None:
+            os.sched_setaffinity(0, cores)
+        extractor = TransformerFeatureExtractor(**extractor_kwargs, device="cpu", num_threads=num_threads)
+        dim = int(extractor.model.config.hidden_size)
+    except Exception:
+        results.put(("error", worker_id, traceback.format_exc()))
+        return
+    results.put(("ready", worker_id, dim))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        task_id, texts, shm_name, offset = task
+        try:
+            features = extractor.extract_features(texts).numpy()
+            shm = SharedMemory(name=shm_name)
+            try:
+                # each task writes its rows straight into the output array of the parent process
+                out: np.ndarray = np.ndarray(features.shape, dtype=np.float32, buffer=shm.buf, offset=offset * dim * 4)
+                out[:] = features
+                del out
+            finally:
+                shm.close()
+            results.put(("done", task_id, len(texts)))
+        except Exception:
+            results.put(("error", task_id, traceback.format_exc()))
+
+
+class ParallelFeatureExtractor:
+    """
+    Data-parallel `TransformerFeatureExtractor` running one model copy per CPU worker process.
+
+    Texts are split into chunks that idle workers pick up from a shared queue. Each worker writes the features of
+    its chunk into one shared memory array at the rows of the chunk, so the features are returned in the input order
+    without being pickled back to the parent process. Workers are started with the "spawn" method, so scripts using
+    this class must guard their entry point with `if __name__ == "__main__":`.
+
+    It can be used as a context manager, which stops the workers on exit.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        num_workers: int,
+        threads_per_worker: Optional[int] = None,
+        pin_cores: bool = False,
+        chunk_size: int = 256,
+        **extractor_kwargs: Any,
+    ):
+        """
+        Initializes the ParallelFeatureExtractor and starts the workers, which load their model copy.
+
+        Args:
+            model_name (str): The name or path of the pre-trained transformer model.
+            num_workers (int): Number of worker processes.
+            threads_per_worker (int, optional): Number of intra-op threads of each worker. Default is None, which
+                divides the CPUs available to this process evenly between the workers.
+            pin_cores (bool, optional): If True, bind each worker to its own `threads_per_worker` CPUs, so that
+                workers do not compete for cores or migrate between NUMA nodes. Linux only. Default is False.
+            chunk_size (int, optional): Number of texts per task. Default is 256.
+            **extractor_kwargs: Other keyword arguments of `TransformerFeatureExtractor`, except `device` and
+                `num_threads`.
+
+        Raises:
+            ValueError: If the arguments are invalid.
+            RuntimeError: If a worker fails to load its model.
+        """
+        if num_workers < 1 or chunk_size < 1:
+            raise ValueError("num_workers and chunk_size must be positive integers")
+        if "device" in extractor_kwargs or "num_threads" in extractor_kwargs:
+            raise ValueError("device and num_threads are set by the ParallelFeatureExtractor")
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        if threads_per_worker is None:
+            threads_per_worker = max(len(cpus) // num_workers, 1)
+        if pin_cores and num_workers * threads_per_worker > len(cpus):
+            raise ValueError(f"pin_cores needs {num_workers * threads_per_worker} CPUs, but {len(cpus)} are available")
+
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self.chunk_size = chunk_size
+        self.dim = 0
+
+        context = mp.get_context("spawn")
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._processes: List[Any] = []
+        self._closed = False
+        for worker_id in range(num_workers):
+            cores = None
+            if pin_cores:
+                cores = set(cpus[worker_id * threads_per_worker : (worker_id + 1) * threads_per_worker])
+            process = context.Process(
+                target=_worker,
+                args=(
+                    worker_id,
+                    {"model_name": model_name, **extractor_kwargs},
+                    threads_per_worker,
+                    cores,
+                    self._tasks,
+                    self._results,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+        for _ in range(num_workers):
+            status, worker_id, payload = self._get_result()
+            if status == "error":
+                self.close()
+                raise RuntimeError(f"Worker {worker_id} failed to start:\n{payload}")
+            self.dim = payload
+
+    def extract_features(self, texts: Union[str, Sequence[str]]) -> torch.Tensor:
+        """
+        Extracts features from input texts on the workers.
+
+        Args:
+            texts (str or Sequence[str]): Input text or texts.
+
+        Returns:
+            torch.Tensor: Extracted features for input texts, in input order.
+
+        Raises:
+            RuntimeError: If the extractor is closed, or if a worker fails to extract the features of a chunk or
+                exits unexpectedly.
+        """
+        if self._closed or not self._processes:
+            raise RuntimeError("ParallelFeatureExtractor is closed")
+        if isinstance(texts, str):
+            texts = [texts]
+        texts = list(texts)
+        if not texts:
+            return torch.empty(0, self.dim)
+
+        shm = SharedMemory(create=True, size=len(texts) * self.dim * 4)
+        try:
+            num_tasks = 0
+            for start in range(0, len(texts), self.chunk_size):
+                self._tasks.put((num_tasks, texts[start : start + self.chunk_size], shm.name, start))
+                num_tasks += 1
+
+            # every task reports back exactly once, so the shared memory is only released once no worker uses it
+            errors = []
+            for _ in range(num_tasks):
+                status, task_id, payload = self._get_result()
+                if status == "error":
+                    errors.append(f"Task {task_id} failed:\n{payload}")
+            if errors:
+                raise RuntimeError("\n".join(errors))
+
+            features: np.ndarray = np.ndarray((len(texts), self.dim), dtype=np.float32, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+        return torch.from_numpy(features)
+
+    def close(self) -> None:
+        """Stop the workers. The extractor cannot be used afterwards."""
+        self._closed = True
+        for process in self._processes:
+            if process.is_alive():
+                self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+
+    def __enter__(self) -> "ParallelFeatureExtractor":
+        """Return the extractor itself."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop the workers."""
+        self.close()
+
+    def _get_result(self) -> Tuple[str, int, Any]:
+        while True:
+            try:
+                return self._results.get(timeout=1.0)
+            except queue.Empty:
+                if self._closed or not all(process.is_alive() for process in self._processes):
+                    self.close()
+                    raise RuntimeError("A feature extraction worker exited unexpectedly")
@@ -1,7 +1,219 @@
-from typing import List, Union
+import contextlib
+import itertools
+import threading
+import weakref
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import torch
-from transformers import AutoModel, AutoTokenizer
+from transformers import AutoConfig, AutoModel, AutoTokenizer
+from transformers.utils import is_accelerate_available
+
+from .embedding_cache import EmbeddingCache, text_key
+
+JIT_MODES = ("compile", "torchscript")
+POOLING_MODES = ("cls", "mean", "max")
+
+# models shared by all extractors of the process, dropped once no extractor references them
+_MODELS: "weakref.WeakValueDictionary[Tuple[Any, ...], torch.nn.Module]" = weakref.WeakValueDictionary()
+_MODELS_LOCK = threading.Lock()
+
+
+def _resolve_dtype(torch_dtype: Optional[Union[str, torch.dtype]]) -> Optional[Union[str, torch.dtype]]:
+    if torch_dtype is None or torch_dtype == "auto" or isinstance(torch_dtype, torch.dtype):
+        return torch_dtype
+    dtype = getattr(torch, torch_dtype, None)
+    if not isinstance(dtype, torch.dtype):
+        raise ValueError(f"Invalid torch_dtype: {torch_dtype}")
+    return dtype
+
+
+def load_model(
+    model_name: str,
+    revision: Optional[str] = None,
+    device: Union[str, torch.device] = "cpu",
+    torch_dtype: Optional[Union[str, torch.dtype]] = None,
+    quantize: bool = False,
+    use_safetensors: Optional[bool] = None,
+    shared: bool = True,
+) -> Any:
+    """
+    Load a pre-trained transformer model in evaluation mode, sharing it within the process.
+
+    The weights are loaded in `torch_dtype` directly. Safetensors checkpoints are memory-mapped instead of read into
+    a buffer, and if `accelerate` is installed, the model is created without initializing its weights and placed on
+    `device` while loading, so that at most one copy of the weights is held. Without `accelerate`, the model is
+    loaded on the CPU and then moved to `device`.
+
+    Shared models are kept in a process-wide registry for as long as they are referenced, and later calls with the
+    same arguments return the same model instead of loading it again.
+
+    Args:
+        model_name (str): The name or path of the pre-trained transformer model.
+        revision (str, optional): Model revision, such as a branch, tag or commit id. Default is None.
+        device (str or torch.device, optional): Device of the model. Default is "cpu".
+        torch_dtype (str or torch.dtype, optional): Dtype of the weights, such as "float16", "bfloat16", or "auto"
+            for the dtype of the checkpoint. Default is None, which means float32.
+        quantize (bool, optional): If True, quantize the weights of the linear layers to int8 with dynamic
+            activation quantization. CPU only. Default is False.
+        use_safetensors (bool, optional): Whether to load safetensors weights. Default is None, which prefers them
+            if the checkpoint has them.
+        shared (bool, optional): If True, use the process-wide registry. Default is True.
+
+    Returns:
+        Any: The model.
+
+    Raises:
+        ValueError: If `torch_dtype` is invalid, or if `quantize` is combined with a dtype other than float32.
+    """
+    dtype = _resolve_dtype(torch_dtype)
+    if quantize and dtype not in (None, torch.float32):
+        raise ValueError("quantize requires float32 weights")
+    device = torch.device(device)
+    key = (model_name, revision, str(device), str(dtype), quantize, use_safetensors)
+
+    # loading under the lock makes concurrent requests for one model wait for it instead of loading it twice
+    with _MODELS_LOCK:
+        model = _MODELS.get(key) if shared else None
+        if model is not None:
+            return model
+
+        kwargs: Dict[str, Any] = {"revision": revision, "torch_dtype": dtype, "use_safetensors": use_safetensors}
+        if is_accelerate_available():
+            kwargs.update(low_cpu_mem_usage=True, device_map={"": device})
+        model = AutoModel.from_pretrained(model_name, **kwargs)
+        model.to(device)
+        model.eval()
+        if quantize:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        if shared:
+            _MODELS[key] = model
+    return model
+
+
+def _length_buckets(lengths: np.ndarray, batch_size: int, max_tokens: Optional[int] = None) -> List[np.ndarray]:
+    # group input indices by decreasing length, so that each bucket is padded only to its first (longest) member
+    buckets: List[np.ndarray] = []
+    order = np.argsort(-lengths, kind="stable")
+    start = 0
+    while start < len(order):
+        padded_length = max(int(lengths[order[start]]), 1)
+        size = batch_size if max_tokens is None else min(batch_size, max(max_tokens // padded_length, 1))
+        buckets.append(order[start : start + size])
+        start += size
+    return buckets
+
+
+def _pool(hidden_state: torch.Tensor, attention_mask: torch.Tensor, pooling: str) -> torch.Tensor:
+    if pooling == "cls":
+        return hidden_state[:, 0]
+    mask = attention_mask.unsqueeze(-1).to(hidden_state.dtype)
+    if pooling == "mean":
+        return (hidden_state * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+    return hidden_state.masked_fill(mask == 0, float("-inf")).max(dim=1).values
+
+
+def _hidden_state_modules(model: Any) -> Optional[List[torch.nn.Module]]:
+    # the modules whose outputs are the hidden states of BERT-like encoders, starting with the embeddings, which
+    # ELECTRA-like models project to the hidden size before the first layer when the two sizes differ
+    embeddings = getattr(model, "embeddings_project", None) or getattr(model, "embeddings", None)
+    for path in ("encoder.layer", "transformer.layer"):
+        try:
+            layers = model.get_submodule(path)
+        except AttributeError:
+            continue
+        if embeddings is not None and isinstance(layers, torch.nn.ModuleList):
+            if len(layers) == model.config.num_hidden_layers:
+                return [embeddings, *layers]
+    return None
+
+
+class _StopForward(Exception):
+    pass
+
+
+class _PoolingState(threading.local):
+    # the pooling of the forward pass running in the current thread, shared by the hooks of all models
+    active: Optional[Dict[str, Any]] = None
+
+
+_POOLING_STATE = _PoolingState()
+_HOOKED_MODULES: "weakref.WeakSet[torch.nn.Module]" = weakref.WeakSet()
+_HOOKS_LOCK = threading.Lock()
+
+
+def _pooling_hook(layer: int) -> Callable[..., None]:
+    def hook(module: torch.nn.Module, inputs: Any, output: Any) -> None:
+        state = _POOLING_STATE.active
+        if state is None or module not in state["modules"] or layer not in state["layers"]:
+            # the model is called outside of an extractor, or by one that does not pool this layer
+            return
+        hidden_state = output[0] if isinstance(output, tuple) else output
+        state["pooled"][layer] = _pool(hidden_state, state["attention_mask"], state["pooling"])
+        if layer == state["last"]:
+            raise _StopForward
+
+    return hook
+
+
+def _install_pooling_hooks(modules: Sequence[torch.nn.Module]) -> None:
+    # one hook per module and process, so that extractors sharing a model neither add hooks nor see each other's
+    with _HOOKS_LOCK:
+        for layer, module in enumerate(modules):
+            if module not in _HOOKED_MODULES:
+                module.register_forward_hook(_pooling_hook(layer))
+                _HOOKED_MODULES.add(module)
+
+
+def _check_layers(layers: Sequence[int], num_hidden_layers: int) -> None:
+    num_states = num_hidden_layers + 1
+    if any(not -num_states <= layer < num_states for layer in layers):
+        raise ValueError(f"layers must be hidden state indices between {-num_states} and {num_states - 1}")
+
+
+class _LayerPooling(torch.nn.Module):
+    # the forward pass of the extractor as one module, so that it can be traced or compiled as a whole
+    def __init__(self, model: Any, layers: Sequence[int], pooling: str):
+        super().__init__()
+        num_hidden_layers = int(model.config.num_hidden_layers)
+        _check_layers(layers, num_hidden_layers)
+
+        self.model = model
+        self.pooling = pooling
+        self.layers = [layer % (num_hidden_layers + 1) for layer in layers]
+
+        # hooks pool each required hidden state as soon as it is computed and stop the forward pass after the deepest
+        # one, so the other layers never run and no hidden state is kept beyond its pooled vector
+        self.hidden_state_modules = _hidden_state_modules(model)
+        if self.hidden_state_modules is not None:
+            _install_pooling_hooks(self.hidden_state_modules)
+
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        if self.hidden_state_modules is None:
+            hidden_states = self.model(input_ids, attention_mask=attention_mask, output_hidden_states=True)
+            pooled = {
+                layer: _pool(hidden_states["hidden_states"][layer], attention_mask, self.pooling)
+                for layer in set(self.layers)
+            }
+        else:
+            # the state of the call is thread-local, so that concurrent calls never share it
+            pooled = {}
+            previous = _POOLING_STATE.active
+            _POOLING_STATE.active = {
+                "modules": set(self.hidden_state_modules),
+                "layers": set(self.layers),
+                "last": max(self.layers),
+                "pooling": self.pooling,
+                "attention_mask": attention_mask,
+                "pooled": pooled,
+            }
+            try:
+                self.model(input_ids, attention_mask=attention_mask)
+            except _StopForward:
+                pass
+            finally:
+                _POOLING_STATE.active = previous
+        return torch.stack([pooled[layer] for layer in self.layers]).sum(dim=0)
 
 
 class TransformerFeatureExtractor:
@@ -13,60 +225,308 @@ class TransformerFeatureExtractor:
         num_emb_layers: int = 4,
         max_length: int = 512,
         device: Union[str, torch.device] = "cuda:0",
+        batch_size: int = 32,
+        max_tokens: Optional[int] = None,
+        revision: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        cache_dtype: str = "float32",
+        inference_mode: bool = False,
+        quantize: bool = False,
+        jit: Optional[str] = None,
+        autocast_bf16: bool = False,
+        num_threads: Optional[int] = None,
+        pooling: str = "cls",
+        layers: Optional[Sequence[int]] = None,
+        torch_dtype: Optional[Union[str, torch.dtype]] = None,
+        use_safetensors: Optional[bool] = None,
+        share_model: bool = True,
     ):
         """
         Initializes the TransformerFeatureExtractor.
 
         Args:
             model_name (str): The name or path of the pre-trained transformer model.
-            num_emb_layers (int, optional): Number of layers to use for feature extraction. Default is 4.
+            num_emb_layers (int, optional): Number of last layers whose pooled hidden states are summed, unless
+                `layers` is given. Default is 4.
             max_length (int, optional): Maximum length of input text for tokenization. Default is 512.
             device (str or torch.device, optional): Device to use for computation ('cuda:0', 'cpu', etc.).
                 Default is 'cuda:0' if available, else 'cpu'.
+            batch_size (int, optional): Maximum number of texts per forward pass. Default is 32.
+            max_tokens (int, optional): Maximum number of tokens per forward pass, counting padding. A text longer
+                than the budget still forms a batch on its own. Default is None, which means no token budget.
+            revision (str, optional): Model revision, such as a branch, tag or commit id. Default is None, which
+                means the default branch.
+            cache_dir (str, optional): Directory of a persistent embedding cache shared by all extractors with the
+                same model, revision and extraction settings. Default is None, which disables caching.
+            cache_dtype (str, optional): Storage dtype of cached embeddings, "float32" or "float16". Default is
+                "float32".
+            inference_mode (bool, optional): If True, run the model under `torch.inference_mode` instead of
+                `torch.no_grad`. The returned features are then inference tensors, which cannot be used in autograd.
+                Default is False.
+            quantize (bool, optional): If True, quantize the weights of the linear layers to int8 with dynamic
+                activation quantization. CPU only. Default is False.
+            jit (str, optional): Optimize the forward pass with "compile", using `torch.compile` with dynamic
+                shapes, or "torchscript", tracing it on the first batch. Default is None, which runs it eagerly.
+            autocast_bf16 (bool, optional): If True, run the model under bfloat16 autocast. The features are still
+                returned as float32. Default is False.
+            num_threads (int, optional): Number of intra-op CPU threads, set process-wide with
+                `torch.set_num_threads`. Default is None, which keeps the current setting.
+            pooling (str, optional): How each selected hidden state is pooled over the tokens: "cls" takes the
+                first token, "mean" averages and "max" takes the maximum over the non-padding tokens. Default is
+                "cls".
+            layers (Sequence[int], optional): Indices of the hidden states to pool and sum, where 0 is the output of
+                the embeddings and negative indices count from the last layer. Default is None, which selects the
+                last `num_emb_layers` layers.
+            torch_dtype (str or torch.dtype, optional): Dtype the weights are loaded in, such as "float16",
+                "bfloat16", or "auto" for the dtype of the checkpoint. The features are still returned as float32.
+                Default is None, which means float32.
+            use_safetensors (bool, optional): Whether to load safetensors weights. Default is None, which prefers
+                them if the checkpoint has them.
+            share_model (bool, optional): If True, share the model with the other extractors of the process that
+                load it with the same settings, see `load_model`. Extractors sharing a model may run concurrently,
+                including with different layers or pooling. Default is True.
         """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        if jit is not None and jit not in JIT_MODES:
+            raise ValueError(f"Invalid jit mode: {jit}. Expected one of {JIT_MODES}")
+        if pooling not in POOLING_MODES:
+            raise ValueError(f"Invalid pooling: {pooling}. Expected one of {POOLING_MODES}")
+        if layers is not None and len(layers) == 0:
+            raise ValueError("layers must not be empty")
 
         if not torch.cuda.is_available():
             device = "cpu"
+        if quantize and torch.device(device).type != "cpu":
+            raise ValueError("quantize is only supported on the CPU")
+        torch_dtype = _resolve_dtype(torch_dtype)
+        if quantize and torch_dtype not in (None, torch.float32):
+            raise ValueError("quantize requires float32 weights")
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
 
-        self.model = AutoModel.from_pretrained(model_name)
-        self.model.to(device)
-
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model_name = model_name
+        self.revision = revision
+        self.device = device
+        self.torch_dtype = torch_dtype
+        self.use_safetensors = use_safetensors
+        self.share_model = share_model
+        self._model: Optional[Any] = None
+        self._tokenizer: Optional[Any] = None
         self.num_emb_layers = num_emb_layers
+        self.pooling = pooling
+        self.layers = list(layers) if layers is not None else [-i for i in range(1, num_emb_layers + 1)]
         self.max_length = max_length
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.inference_mode = inference_mode
+        self.quantize = quantize
+        self.jit = jit
+        self.autocast_bf16 = autocast_bf16
+        self._forward: Optional[Callable[[torch.Tensor, torch.Tensor], torch.Tensor]] = None
+        self._lock = threading.RLock()
+
+        config = AutoConfig.from_pretrained(model_name, revision=revision)
+        if getattr(config, "num_hidden_layers", None) is not None:
+            _check_layers(self.layers, int(config.num_hidden_layers))
+
+        self.cache: Optional[EmbeddingCache] = None
+        if cache_dir is not None:
+            self.cache = EmbeddingCache(cache_dir, self.namespace, dtype=cache_dtype)
+
+    @property
+    def namespace(self) -> Dict[str, Any]:
+        """The model and extraction settings that the features depend on besides the texts."""
+        return {
+            "model_name": self.model_name,
+            "revision": self.revision,
+            "torch_dtype": str(self.torch_dtype) if self.torch_dtype is not None else None,
+            "layers": self.layers,
+            "pooling": self.pooling,
+            "max_length": self.max_length,
+            "quantize": self.quantize,
+            "autocast_bf16": self.autocast_bf16,
+        }
 
-    def extract_features(self, texts: Union[str, List[str]]) -> torch.Tensor:
+    @property
+    def model(self) -> Any:
+        """The transformer model, loaded with `load_model` on first access."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = load_model(
+                        self.model_name,
+                        revision=self.revision,
+                        device=self.device,
+                        torch_dtype=self.torch_dtype,
+                        quantize=self.quantize,
+                        use_safetensors=self.use_safetensors,
+                        shared=self.share_model,
+                    )
+        return self._model
+
+    @property
+    def tokenizer(self) -> Any:
+        """The tokenizer of the model, loaded on first access."""
+        if self._tokenizer is None:
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name, revision=self.revision)
+        return self._tokenizer
+
+    def extract_features(self, texts: Union[str, List[str], Mapping[str, Any]]) -> torch.Tensor:
         """
         Extracts features from input texts using transformer embeddings.
 
+        Texts are tokenized in one batched tokenizer call, sorted by length and split into batches of at most
+        `batch_size` texts and `max_tokens` padded tokens. Each batch is padded only to its longest text, and the
+        features are returned in the input order.
+
+        With a cache, raw texts are looked up by their hash first, and only the distinct texts that are not cached
+        are tokenized and run through the model, which is not loaded at all if every text is cached. The new
+        features are then added to the cache. Pre-tokenized input bypasses the cache.
+
         Args:
-            texts (str or list): Input text or list of texts for feature extraction.
+            texts (str, list or mapping): Input text or list of texts for feature extraction, or pre-tokenized
+                input such as the output of `encode`. Pre-tokenized input holds "input_ids" as sequences of token
+                ids, or as a right-padded array together with an "attention_mask".
 
         Returns:
             torch.Tensor: Extracted features for input texts.
         """
-        self.model.eval()
-
         if isinstance(texts, str):
             texts = [texts]
+        if self.cache is not None and not isinstance(texts, Mapping):
+            return self._extract_cached(texts)
+        return self._extract(texts)
+
+    def iter_features(self, texts: Iterable[str], chunk_size: int = 1024) -> Iterator[torch.Tensor]:
+        """
+        Extracts features lazily from a stream of texts, one chunk at a time.
+
+        Only one chunk of texts and its features are held in memory at once, so arbitrarily long iterables, such as
+        a DataFrame column or the lines of a file, can be processed. Each chunk is passed to `extract_features`.
+
+        Args:
+            texts (Iterable[str]): Input texts.
+            chunk_size (int, optional): Number of texts per chunk. Larger chunks group texts of similar length
+                better, see `extract_features`. Default is 1024.
+
+        Yields:
+            torch.Tensor: Extracted features of the next chunk of texts, in input order.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        iterator = iter(texts)
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield self.extract_features(chunk)
+
+    def _extract_cached(self, texts: Sequence[str]) -> torch.Tensor:
+        assert self.cache is not None
+        keys = [text_key(text) for text in texts]
+        found, vectors = self.cache.get(keys)
+        if found.all() and vectors is not None:
+            return torch.from_numpy(vectors)
+
+        misses = {key: text for key, text, hit in zip(keys, texts, found) if not hit}
+        computed = self._extract(list(misses.values())).float().numpy()
+        self.cache.put(list(misses), computed)
+
+        rows = {key: row for row, key in enumerate(misses)}
+        if vectors is None:
+            vectors = np.empty((len(texts), computed.shape[1]), dtype=np.float32)
+        miss_indices = np.flatnonzero(~found)
+        vectors[miss_indices] = computed[[rows[keys[i]] for i in miss_indices]]
+        return torch.from_numpy(vectors)
+
+    def _extract(self, texts: Union[Sequence[str], Mapping[str, Any]]) -> torch.Tensor:
+        self.model.eval()
+        token_ids = self._token_ids(texts if isinstance(texts, Mapping) else self.encode(texts))
+        lengths = np.array([len(ids) for ids in token_ids], dtype=np.int64)
+
+        batch_embeddings, order = [], []
+        for bucket in _length_buckets(lengths, self.batch_size, self.max_tokens):
+            input_ids, attention_mask = self._pad([token_ids[i] for i in bucket])
+            batch_embeddings.append(self._embed(input_ids, attention_mask))
+            order.append(bucket)
+
+        if not batch_embeddings:
+            return torch.empty(0, self.model.config.hidden_size)
+        inverse_order = torch.from_numpy(np.argsort(np.concatenate(order)))
+        return torch.cat(batch_embeddings)[inverse_order]
+
+    def encode(self, texts: Sequence[str]) -> Mapping[str, Any]:
+        """
+        Tokenizes a batch of texts in one tokenizer call, without padding.
+
+        Args:
+            texts (Sequence[str]): Input texts.
+
+        Returns:
+            Mapping[str, Any]: The token ids of each text under "input_ids", truncated to `max_length` and
+                including the special tokens. It can be passed to `extract_features` in place of the texts.
+        """
+        if len(texts) == 0:
+            return {"input_ids": []}
+        return self.tokenizer(
+            list(texts),
+            add_special_tokens=True,
+            max_length=self.max_length,
+            truncation=True,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )
+
+    @staticmethod
+    def _token_ids(encodings: Mapping[str, Any]) -> List[Sequence[int]]:
+        input_ids = encodings["input_ids"]
+        if isinstance(input_ids, torch.Tensor):
+            input_ids = input_ids.numpy(force=True)
+        attention_mask = encodings.get("attention_mask")
+        if attention_mask is None:
+            return list(input_ids)
+        lengths = np.asarray(attention_mask.cpu() if isinstance(attention_mask, torch.Tensor) else attention_mask)
+        return [ids[:length] for ids, length in zip(input_ids, lengths.sum(axis=1))]
 
-        input_ids, attention_masks = [], []
-        for text in texts:
-            tokenized_output = self.tokenize(text)
-            input_ids.append(tokenized_output["input_ids"])
-            attention_masks.append(tokenized_output["attention_mask"])
-        input_ids_tensor = torch.cat(input_ids, dim=0).to(self.model.device)
-        attention_masks_tensor = torch.cat(attention_masks, dim=0).to(self.model.device)
+    def _pad(self, token_ids: Sequence[Sequence[int]]) -> Tuple[torch.Tensor, torch.Tensor]:
+        # right padding, so that the CLS token stays at position 0
+        lengths = [len(ids) for ids in token_ids]
+        input_ids = np.full((len(token_ids), max(lengths)), self.tokenizer.pad_token_id or 0, dtype=np.int64)
+        attention_mask = np.zeros_like(input_ids)
+        for row, (ids, length) in enumerate(zip(token_ids, lengths)):
+            input_ids[row, :length] = ids
+            attention_mask[row, :length] = 1
+        return torch.from_numpy(input_ids), torch.from_numpy(attention_mask)
 
-        with torch.no_grad():
-            hidden_states = self.model(
-                input_ids_tensor, attention_mask=attention_masks_tensor, output_hidden_states=True
-            )["hidden_states"]
+    def _embed(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        input_ids = input_ids.to(self.model.device)
+        attention_mask = attention_mask.to(self.model.device)
+        with self._inference_context():
+            if self._forward is None:
+                with self._lock:
+                    if self._forward is None:
+                        self._forward = self._build_forward(input_ids, attention_mask)
+            embeddings = self._forward(input_ids, attention_mask)
+        return embeddings.detach().float().cpu()
 
-        embeddings = sum(hidden_states[-i][:, 0, :] for i in range(1, self.num_emb_layers + 1))
-        embeddings = embeddings.detach().cpu()
+    def _inference_context(self) -> contextlib.ExitStack:
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode() if self.inference_mode else torch.no_grad())
+        if self.autocast_bf16:
+            stack.enter_context(torch.autocast(self.model.device.type, dtype=torch.bfloat16))
+        return stack
 
-        return embeddings
+    def _build_forward(
+        self, input_ids: torch.Tensor, attention_mask: torch.Tensor
+    ) -> Callable[[torch.Tensor, torch.Tensor], torch.Tensor]:
+        module = _LayerPooling(self.model, self.layers, self.pooling)
+        if self.jit == "torchscript":
+            # traced inside the inference context, so that autocast is recorded in the graph
+            return torch.jit.trace(module, (input_ids, attention_mask), strict=False)
+        if self.jit == "compile":
+            return torch.compile(module, dynamic=True)
+        return module
 
     def tokenize(self, text: str) -> dict:
         """
@@ -1,2 +1,16 @@
-from .plots import get_confusion_matrix, get_prc_display, get_roc_display
-from .reports import add_metric_to_report, flatten_dict
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+if TYPE_CHECKING:
+    from .plots import get_confusion_matrix, get_prc_display, get_roc_display
+    from .reports import add_metric_to_report, flatten_dict
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    ["plots", "reports"],
+    {
+        "plots": ["get_confusion_matrix", "get_prc_display", "get_roc_display"],
+        "reports": ["add_metric_to_report", "flatten_dict"],
+    },
+)
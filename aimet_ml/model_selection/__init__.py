@@ -1 +1,28 @@
-from .splits import get_splitter, join_cols, split_dataset, split_dataset_single_test, stratified_group_split
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+if TYPE_CHECKING:
+    from .splits import (
+        encode_cols,
+        get_splitter,
+        join_cols,
+        split_dataset,
+        split_dataset_single_test,
+        stratified_group_split,
+    )
+
+__getattr__, __dir__, __all__ = attach(
+    __name__,
+    ["splits"],
+    {
+        "splits": [
+            "encode_cols",
+            "get_splitter",
+            "join_cols",
+            "split_dataset",
+            "split_dataset_single_test",
+            "stratified_group_split",
+        ]
+    },
+)
@@ -1 +1,10 @@
-from . import audio, text, video
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+if TYPE_CHECKING:
+    from . import audio, audio_cache, batch, ffmpeg_utils, media, media_index, text, video
+
+__getattr__, __dir__, __all__ = attach(
+    __name__, ["audio", "audio_cache", "batch", "ffmpeg_utils", "media", "media_index", "text", "video"]
+)
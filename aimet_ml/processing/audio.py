@@ -1,8 +1,15 @@
-from typing import Optional, Tuple
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Iterator, List, Optional, Sequence, Tuple, cast
 
+import ffmpeg
 import numpy as np
 from pydub import AudioSegment, effects
 
+from .batch import BatchReport, JobResult, check_skip, partial_path, run_batch
+from .ffmpeg_utils import add_ffmpeg_paths, close_pipe, open_pipe, probe_stream, read_all_into, read_into
+
 
 def read_audio(file_path: str, target_sr: Optional[int] = None, normalize: bool = False) -> AudioSegment:
     """
@@ -16,6 +23,7 @@ def read_audio(file_path: str, target_sr: Optional[int] = None, normalize: bool
     Returns:
         AudioSegment: Audio waveform as an AudioSegment object.
     """
+    add_ffmpeg_paths()
     audio = AudioSegment.from_file(file_path)
     if target_sr:
         audio = audio.set_frame_rate(target_sr)
@@ -24,24 +32,274 @@ def read_audio(file_path: str, target_sr: Optional[int] = None, normalize: bool
     return audio
 
 
-def load_audio(file_path: str, target_sr: Optional[int] = None, normalize: bool = False) -> Tuple[np.ndarray, int]:
+def load_audio(
+    file_path: str, target_sr: Optional[int] = None, normalize: bool = False, backend: str = "pydub"
+) -> Tuple[np.ndarray, int]:
     """
     Load an audio file and return the waveform as a NumPy array and the target sample rate.
 
+    Multichannel audio is returned as interleaved samples. The "ffmpeg" backend decodes through `decode_audio` and
+    gives the same samples as the "pydub" backend when no resampling is needed, without the intermediate copies.
+
     Args:
         file_path (str): Path to the audio file.
         target_sr (int, optional): Target sample rate for the audio waveform.
         normalize (bool, optional): If True, normalize the audio waveform.
+        backend (str, optional): Decoder to use, either "pydub" or "ffmpeg". Defaults to "pydub".
 
     Returns:
         Tuple[np.ndarray, int]: A tuple containing the waveform as a NumPy array and the target sample rate.
     """
-    audio = read_audio(file_path, target_sr, normalize)
+    if backend == "ffmpeg":
+        waveform, sample_rate = decode_audio(file_path, target_sr, normalize=normalize)
+        return waveform.reshape(-1), sample_rate
+    if backend != "pydub":
+        raise ValueError(f"Unsupported backend: {backend}")
+
+    audio = read_audio(file_path, target_sr)
     waveform = np.asarray(audio.get_array_of_samples(), dtype=np.float32) / 32768.0
+    if normalize:
+        waveform *= _normalization_gains(waveform[None, :, None], "peak", -0.1)[0, 0]
     sample_rate = audio.frame_rate
     return waveform, sample_rate
 
 
+def decode_audio(
+    file_path: str, target_sr: Optional[int] = None, channels: Optional[int] = None, normalize: bool = False
+) -> Tuple[np.ndarray, int]:
+    """
+    Decode an audio file with ffmpeg straight into a float32 NumPy array.
+
+    ffmpeg converts the samples to float32 at the target sample rate and channel count, and its output is read
+    directly into the buffer of the returned array, so no intermediate copies are made.
+
+    Args:
+        file_path (str): Path to the audio file.
+        target_sr (int, optional): Target sample rate for the audio waveform. Defaults to the source sample rate.
+        channels (int, optional): Number of output channels, e.g. 1 to downmix to mono or 2 for stereo.
+            Defaults to the source channel count.
+        normalize (bool, optional): If True, normalize the peak of the audio waveform to -0.1 dBFS.
+
+    Returns:
+        Tuple[np.ndarray, int]: A tuple containing the waveform and the sample rate. The waveform has shape
+            `(num_samples,)` for mono audio and `(num_samples, channels)` otherwise.
+    """
+    stream_info = probe_stream(file_path, "audio")
+    sample_rate = target_sr if target_sr else int(stream_info["sample_rate"])
+    num_channels = channels if channels else int(stream_info["channels"])
+
+    # size the buffer from the reported duration and grow it only if the duration was underestimated
+    duration = float(stream_info.get("duration", 0))
+    waveform = np.empty((max(round(duration * sample_rate), sample_rate) + 1, num_channels), dtype=np.float32)
+
+    stream = ffmpeg.input(file_path).output(
+        "pipe:", format="f32le", acodec="pcm_f32le", ac=num_channels, ar=sample_rate
+    )
+    process = open_pipe(stream)
+    pipe = cast(IO[bytes], process.stdout)
+    try:
+        waveform, num_samples = read_all_into(pipe, waveform)
+    except BaseException:
+        close_pipe(process, check=False)
+        raise
+    close_pipe(process)
+
+    if normalize:
+        waveform[:num_samples] *= _normalization_gains(waveform[None, :num_samples], "peak", -0.1)[0]
+    waveform = waveform[:num_samples, 0] if num_channels == 1 else waveform[:num_samples]
+    return waveform, sample_rate
+
+
+DEFAULT_TARGET_LEVELS = {"peak": -0.1, "rms": -20.0, "lufs": -23.0}
+
+
+def _k_weighting_filters(sample_rate: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    # ITU-R BS.1770 pre-filter (high shelf) and RLB filter (high pass), derived for any sample rate
+    k = np.tan(np.pi * 1681.974450955533 / sample_rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh**0.4996667741545416
+    a0 = 1 + k / q + k**2
+    shelf_b = np.array([vh + vb * k / q + k**2, 2 * (k**2 - vh), vh - vb * k / q + k**2]) / a0
+    shelf_a = np.array([a0, 2 * (k**2 - 1), 1 - k / q + k**2]) / a0
+
+    k = np.tan(np.pi * 38.13547087602444 / sample_rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k**2
+    high_pass_b = np.array([1.0, -2.0, 1.0])
+    high_pass_a = np.array([a0, 2 * (k**2 - 1), 1 - k / q + k**2]) / a0
+    return [(shelf_b, shelf_a), (high_pass_b, high_pass_a)]
+
+
+def _integrated_loudness(waveforms: np.ndarray, sample_rate: int) -> np.ndarray:
+    # gated loudness of ITU-R BS.1770 over 400 ms blocks with 75% overlap, computed for a batch at once
+    from scipy.signal import lfilter
+
+    filtered = waveforms.astype(np.float64)
+    for b, a in _k_weighting_filters(sample_rate):
+        filtered = lfilter(b, a, filtered, axis=1)
+
+    num_samples = filtered.shape[1]
+    block_len = min(round(0.4 * sample_rate), num_samples)
+    step = max(round(0.1 * sample_rate), 1)
+    starts = np.arange(0, num_samples - block_len + 1, step)
+    energy = np.concatenate([np.zeros_like(filtered[:, :1]), np.cumsum(filtered**2, axis=1)], axis=1)
+    block_power = ((energy[:, starts + block_len] - energy[:, starts]) / block_len).sum(axis=2)
+
+    with np.errstate(divide="ignore"):
+        block_loudness = -0.691 + 10 * np.log10(block_power)
+        absolute_gate = block_loudness > -70.0
+        relative_threshold = -0.691 + 10 * np.log10(_gated_mean(block_power, absolute_gate)) - 10.0
+        gate = absolute_gate & (block_loudness > relative_threshold[:, None])
+        return -0.691 + 10 * np.log10(_gated_mean(block_power, gate))
+
+
+def _gated_mean(values: np.ndarray, gate: np.ndarray) -> np.ndarray:
+    return np.where(gate, values, 0.0).sum(axis=1) / np.maximum(gate.sum(axis=1), 1)
+
+
+def _normalization_gains(
+    waveforms: np.ndarray, mode: str, target_level: float, sample_rate: Optional[int] = None
+) -> np.ndarray:
+    # waveforms has shape (num_clips, num_samples, num_channels) and the gains have shape (num_clips, 1, 1)
+    if mode == "peak":
+        with np.errstate(divide="ignore"):
+            level = 20 * np.log10(np.max(np.abs(waveforms), axis=(1, 2), initial=0.0))
+    elif mode == "rms":
+        with np.errstate(divide="ignore"):
+            level = 10 * np.log10(np.mean(np.square(waveforms, dtype=np.float64), axis=(1, 2)))
+    elif mode == "lufs":
+        if sample_rate is None:
+            raise ValueError("sample_rate is required for the 'lufs' mode")
+        level = _integrated_loudness(waveforms, sample_rate)
+    else:
+        raise ValueError(f"Unsupported normalization mode: {mode}")
+
+    gains = np.where(np.isfinite(level), 10 ** ((target_level - level) / 20), 1.0)
+    return gains.astype(np.float32)[:, None, None]
+
+
+def normalize_waveform(
+    waveform: np.ndarray, mode: str = "peak", target_level: Optional[float] = None, sample_rate: Optional[int] = None
+) -> np.ndarray:
+    """
+    Normalize a float waveform to a target peak, RMS or loudness level.
+
+    Silent waveforms are returned unchanged. The "rms" and "lufs" modes do not limit the peaks, so loud targets can
+    push samples beyond full scale. The "lufs" mode requires scipy, which is imported only when it is used.
+
+    Args:
+        waveform (np.ndarray): Waveform of shape `(num_samples,)` or `(num_samples, num_channels)`.
+        mode (str, optional): "peak" for the maximum absolute sample in dBFS, "rms" for the root mean square level
+            in dBFS, or "lufs" for the gated ITU-R BS.1770 integrated loudness in LUFS. Defaults to "peak".
+        target_level (float, optional): Target level of the chosen mode. Defaults to -0.1 dBFS for "peak",
+            -20 dBFS for "rms" and -23 LUFS for "lufs".
+        sample_rate (int, optional): Sample rate of the waveform. Required for the "lufs" mode.
+
+    Returns:
+        np.ndarray: The normalized float32 waveform with the same shape as the input.
+    """
+    clips = waveform.reshape(1, waveform.shape[0], -1)
+    target_level = DEFAULT_TARGET_LEVELS.get(mode, 0.0) if target_level is None else target_level
+    gains = _normalization_gains(clips, mode, target_level, sample_rate)
+    return (clips * gains).astype(np.float32, copy=False).reshape(waveform.shape)
+
+
+def normalize_waveforms(
+    waveforms: np.ndarray, mode: str = "peak", target_level: Optional[float] = None, sample_rate: Optional[int] = None
+) -> np.ndarray:
+    """
+    Normalize a batch of equal-length mono clips independently, using vectorized operations over the batch.
+
+    Args:
+        waveforms (np.ndarray): Clips of shape `(num_clips, num_samples)`.
+        mode (str, optional): "peak", "rms" or "lufs", as in `normalize_waveform`. Defaults to "peak".
+        target_level (float, optional): Target level of the chosen mode, as in `normalize_waveform`.
+        sample_rate (int, optional): Sample rate of the clips. Required for the "lufs" mode.
+
+    Returns:
+        np.ndarray: The normalized float32 clips of shape `(num_clips, num_samples)`.
+    """
+    if waveforms.ndim != 2:
+        raise ValueError("waveforms must be a 2-D array of shape (num_clips, num_samples)")
+    target_level = DEFAULT_TARGET_LEVELS.get(mode, 0.0) if target_level is None else target_level
+    gains = _normalization_gains(waveforms[:, :, None], mode, target_level, sample_rate)
+    return (waveforms * gains[:, :, 0]).astype(np.float32, copy=False)
+
+
+def stream_audio(
+    file_path: str,
+    window_size: float,
+    hop_size: Optional[float] = None,
+    target_sr: Optional[int] = None,
+    mono: bool = True,
+    drop_last: bool = False,
+) -> Iterator[np.ndarray]:
+    """
+    Stream an audio file as fixed-size, optionally overlapping windows decoded straight from an ffmpeg pipe.
+
+    Resampling and mono downmixing are done by ffmpeg while decoding, and only one window is held in memory at a
+    time, so the peak memory is bounded by the window size rather than by the file length.
+
+    Args:
+        file_path (str): Path to the audio file.
+        window_size (float): Length of each window in seconds.
+        hop_size (float, optional): Distance between the starts of consecutive windows in seconds.
+            Defaults to `window_size`, i.e. non-overlapping windows.
+        target_sr (int, optional): Target sample rate for the audio waveform. Defaults to the source sample rate.
+        mono (bool, optional): If True, downmix the audio to a single channel. Defaults to True.
+        drop_last (bool, optional): If True, drop the trailing window when it is shorter than `window_size`.
+            Defaults to False.
+
+    Yields:
+        np.ndarray: A float32 window of shape `(num_samples,)` if `mono` is True,
+            otherwise `(num_samples, num_channels)`.
+    """
+    stream_info = probe_stream(file_path, "audio")
+    sample_rate = target_sr if target_sr else int(stream_info["sample_rate"])
+    num_channels = 1 if mono else int(stream_info["channels"])
+
+    window_len = round(window_size * sample_rate)
+    hop_len = round(hop_size * sample_rate) if hop_size is not None else window_len
+    if window_len <= 0 or hop_len <= 0:
+        raise ValueError("window_size and hop_size must be at least one sample long")
+
+    frame_bytes = 4 * num_channels
+    window = np.empty((window_len, num_channels), dtype=np.float32)
+    stream = ffmpeg.input(file_path).output(
+        "pipe:", format="f32le", acodec="pcm_f32le", ac=num_channels, ar=sample_rate
+    )
+    process = open_pipe(stream)
+    pipe = cast(IO[bytes], process.stdout)
+    finished = False
+    try:
+        num_samples = read_into(pipe, window) // frame_bytes
+        while num_samples == window_len:
+            yield window[:, 0].copy() if mono else window.copy()
+
+            if hop_len < window_len:
+                num_kept = window_len - hop_len
+                window[:num_kept] = window[hop_len:]
+            else:
+                num_kept = 0
+                num_skipped = 0
+                while num_skipped < hop_len - window_len:
+                    num_bytes = min(hop_len - window_len - num_skipped, window_len) * frame_bytes
+                    num_read = read_into(pipe, window[: num_bytes // frame_bytes])
+                    if num_read < num_bytes:
+                        break
+                    num_skipped += num_read // frame_bytes
+            num_samples = num_kept + read_into(pipe, window[num_kept:]) // frame_bytes
+            if num_samples == num_kept:
+                num_samples = 0
+
+        if 0 < num_samples and not drop_last:
+            yield window[:num_samples, 0].copy() if mono else window[:num_samples].copy()
+        finished = True
+    finally:
+        close_pipe(process, check=finished)
+
+
 def convert_audio(
     src_file: str, dst_file: str, target_sr: Optional[int] = None, normalize: bool = False
 ) -> AudioSegment:
@@ -61,3 +319,72 @@ def convert_audio(
     output_format = dst_file.split(".")[-1]
     audio.export(dst_file, format=output_format)
     return audio
+
+
+def _convert_audio_job(
+    src_file: str,
+    dst_file: str,
+    target_sr: Optional[int],
+    normalize: bool,
+    skip_mode: Optional[str],
+    recorded_digest: Optional[str],
+) -> JobResult:
+    start = time.perf_counter()
+    try:
+        skip, src_digest = check_skip(src_file, dst_file, skip_mode, recorded_digest)
+        if skip:
+            return JobResult(src_file, dst_file, "skipped", src_digest=src_digest)
+
+        os.makedirs(os.path.dirname(os.path.abspath(dst_file)), exist_ok=True)
+        tmp_file = partial_path(dst_file)
+        try:
+            audio = convert_audio(src_file, tmp_file, target_sr, normalize)
+            os.replace(tmp_file, dst_file)
+        finally:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+        elapsed = time.perf_counter() - start
+        return JobResult(src_file, dst_file, "converted", audio.duration_seconds, elapsed, src_digest=src_digest)
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        return JobResult(src_file, dst_file, "failed", elapsed=elapsed, error=f"{type(e).__name__}: {e}")
+
+
+def convert_audio_batch(
+    src_files: Sequence[str],
+    dst_files: Sequence[str],
+    target_sr: Optional[int] = None,
+    normalize: bool = False,
+    num_workers: Optional[int] = None,
+    skip_mode: Optional[str] = "mtime",
+    manifest_path: Optional[str] = None,
+) -> BatchReport:
+    """
+    Convert many audio files with `convert_audio` on a process pool.
+
+    Outputs are written to a temporary file and then moved into place, so an interrupted run never leaves a
+    truncated output behind and can be resumed by calling the function again with the same arguments.
+    A failing file is recorded in the report and does not abort the rest of the batch.
+
+    Args:
+        src_files (Sequence[str]): Paths to the source audio files.
+        dst_files (Sequence[str]): Paths to the destination audio files, one for each source file.
+        target_sr (int, optional): Target sample rate for the output audio files.
+        normalize (bool, optional): If True, normalize the audio waveforms before conversion.
+        num_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        skip_mode (str, optional): How to detect outputs that are already up to date and can be skipped.
+            "mtime" skips non-empty outputs that are newer than their sources, unless the manifest records them
+            with other conversion parameters, "hash" skips outputs whose source content hash and conversion
+            parameters match the manifest, and None converts every file. Defaults to "mtime".
+        manifest_path (str, optional): Path to a JSON lines manifest recording completed conversions.
+            Required when `skip_mode` is "hash".
+
+    Returns:
+        BatchReport: Per-file results in the order of `src_files` and the aggregate throughput, where the media
+            throughput is measured in seconds of converted audio per second.
+    """
+    params = {"target_sr": target_sr, "normalize": normalize}
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        return run_batch(
+            executor, _convert_audio_job, src_files, dst_files, (target_sr, normalize), params, skip_mode, manifest_path
+        )
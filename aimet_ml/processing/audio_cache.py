@@ -0,0 +1,122 @@
+import hashlib
+import os
+import uuid
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from ..utils.io_utils import read_json, write_json
+from .audio import load_audio
+from .batch import file_digest
+
+
+class AudioCache:
+    """
+    On-disk cache of decoded waveforms returned by `load_audio`.
+
+    Entries are keyed by the content hash of the source file together with the decoding parameters, and stored as
+    `.npy` files that are memory-mapped on reads. Entries are written atomically and evicted in least-recently-used
+    order, so one cache directory can be shared by concurrent processes such as DataLoader workers.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 10 * 1024**3, backend: str = "pydub"):
+        """
+        Initializes the AudioCache.
+
+        Args:
+            cache_dir (str): Directory holding the cache entries. It is created if it does not exist.
+            max_bytes (int, optional): Budget for the total size of the cached waveforms in bytes. Default is 10 GiB.
+            backend (str, optional): Decoder passed to `load_audio` on cache misses. Default is "pydub".
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def load_audio(
+        self, file_path: str, target_sr: Optional[int] = None, normalize: bool = False
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Load an audio file from the cache, decoding and caching it on a miss.
+
+        Args:
+            file_path (str): Path to the audio file.
+            target_sr (int, optional): Target sample rate for the audio waveform.
+            normalize (bool, optional): If True, normalize the audio waveform.
+
+        Returns:
+            Tuple[np.ndarray, int]: A tuple containing the waveform and the sample rate. Cache hits return a
+                read-only memory-mapped array.
+        """
+        key = self._key(file_path, target_sr, normalize)
+        cached = self._read(key)
+        if cached is not None:
+            return cached
+
+        waveform, sample_rate = load_audio(file_path, target_sr, normalize, self.backend)
+        self._write(key, waveform, sample_rate)
+        self.evict()
+        return waveform, sample_rate
+
+    def evict(self) -> None:
+        """Delete least-recently-used entries until the cached waveforms fit in the byte budget."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".npy") and not entry.name.startswith("."):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            for file_path in (path, path[: -len(".npy")] + ".json"):
+                try:
+                    os.remove(file_path)
+                except FileNotFoundError:
+                    pass
+            total_bytes -= size
+
+    def clear(self) -> None:
+        """Delete every entry in the cache."""
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith((".npy", ".json")):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def _key(self, file_path: str, target_sr: Optional[int], normalize: bool) -> str:
+        stat = os.stat(file_path)
+        stat_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        if stat_key not in self._digests:
+            self._digests[stat_key] = file_digest(file_path)
+        key = f"{self._digests[stat_key]}:{target_sr}:{normalize}:{self.backend}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _read(self, key: str) -> Optional[Tuple[np.ndarray, int]]:
+        waveform_path = os.path.join(self.cache_dir, f"{key}.npy")
+        try:
+            waveform = np.load(waveform_path, mmap_mode="r")
+            sample_rate = read_json(os.path.join(self.cache_dir, f"{key}.json"))["sample_rate"]
+            os.utime(waveform_path)
+        except (FileNotFoundError, ValueError):
+            # the entry is missing, partially evicted or was evicted while being read
+            return None
+        return waveform, sample_rate
+
+    def _write(self, key: str, waveform: np.ndarray, sample_rate: int) -> None:
+        tmp_path = os.path.join(self.cache_dir, f".{key}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        try:
+            write_json(tmp_path, {"sample_rate": sample_rate})
+            os.replace(tmp_path, os.path.join(self.cache_dir, f"{key}.json"))
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(waveform, dtype=np.float32))
+            os.replace(tmp_path, os.path.join(self.cache_dir, f"{key}.npy"))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import Executor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class JobResult:
+    """Outcome of converting a single file in a batch."""
+
+    src_file: str
+    dst_file: str
+    status: str
+    duration: float = 0.0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    src_digest: Optional[str] = None
+    attempts: int = 1
+
+    @property
+    def media_sec_per_sec(self) -> float:
+        """Seconds of converted media per second of wall-clock time spent on this file."""
+        return self.duration / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass
+class BatchReport:
+    """Per-file results and aggregate throughput of a batch conversion."""
+
+    results: List[JobResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def _count(self, status: str) -> int:
+        return sum(result.status == status for result in self.results)
+
+    @property
+    def num_converted(self) -> int:
+        """Number of files converted in this run."""
+        return self._count("converted")
+
+    @property
+    def num_skipped(self) -> int:
+        """Number of files skipped because their outputs were up to date."""
+        return self._count("skipped")
+
+    @property
+    def num_failed(self) -> int:
+        """Number of files that failed to convert."""
+        return self._count("failed")
+
+    @property
+    def failures(self) -> List[JobResult]:
+        """Results of the files that failed to convert."""
+        return [result for result in self.results if result.status == "failed"]
+
+    @property
+    def files_per_sec(self) -> float:
+        """Converted files per second of wall-clock time."""
+        return self.num_converted / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def media_sec_per_sec(self) -> float:
+        """Seconds of converted media per second of wall-clock time."""
+        converted_duration = sum(result.duration for result in self.results if result.status == "converted")
+        return converted_duration / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the batch as a flat dictionary.
+
+        Returns:
+            Dict[str, Any]: Counts per status, the elapsed time and the throughput figures.
+        """
+        return {
+            "num_files": len(self.results),
+            "num_converted": self.num_converted,
+            "num_skipped": self.num_skipped,
+            "num_failed": self.num_failed,
+            "elapsed": self.elapsed,
+            "files_per_sec": self.files_per_sec,
+            "media_sec_per_sec": self.media_sec_per_sec,
+        }
+
+
+def file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 digest of a file's content.
+
+    Args:
+        file_path (str): Path to the file.
+        chunk_size (int, optional): Number of bytes read at a time. Defaults to 1 MiB.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_newer(src_file: str, dst_file: str) -> bool:
+    """
+    Check if a non-empty output file was written after its source file was last modified.
+
+    Args:
+        src_file (str): Path to the source file.
+        dst_file (str): Path to the output file.
+
+    Returns:
+        bool: True if the output exists, is not empty and is at least as recent as the source.
+    """
+    if not os.path.exists(dst_file):
+        return False
+    dst_stat = os.stat(dst_file)
+    return dst_stat.st_size > 0 and dst_stat.st_mtime >= os.stat(src_file).st_mtime
+
+
+def check_skip(
+    src_file: str, dst_file: str, skip_mode: Optional[str], recorded_digest: Optional[str]
+) -> Tuple[bool, Optional[str]]:
+    """
+    Decide whether an output is up to date and its conversion can be skipped.
+
+    Args:
+        src_file (str): Path to the source file.
+        dst_file (str): Path to the output file.
+        skip_mode (str, optional): "mtime" compares modification times, "hash" compares the source content hash
+            with `recorded_digest`, and None never skips.
+        recorded_digest (str, optional): Source digest recorded in the manifest when the output was written with
+            the same parameters.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether to skip the file, and the source digest when it was computed.
+    """
+    if skip_mode == "mtime":
+        return is_newer(src_file, dst_file), None
+    if skip_mode == "hash":
+        src_digest = file_digest(src_file)
+        return src_digest == recorded_digest and os.path.exists(dst_file), src_digest
+    return False, None
+
+
+def partial_path(dst_file: str) -> str:
+    """
+    Get the temporary path an output is written to before it is atomically moved to `dst_file`.
+
+    The file extension is kept so that the output format can still be inferred from the path.
+
+    Args:
+        dst_file (str): Path to the final output file.
+
+    Returns:
+        str: The temporary path, unique to the current process.
+    """
+    root, ext = os.path.splitext(dst_file)
+    return f"{root}.part-{os.getpid()}{ext}"
+
+
+class Manifest:
+    """Append-only JSON lines record of completed conversions, used to skip finished files when resuming."""
+
+    def __init__(self, file_path: str):
+        """
+        Initializes the Manifest and loads the records written by previous runs.
+
+        Args:
+            file_path (str): Path to the manifest file. It is created on the first record.
+        """
+        self.file_path = file_path
+        self.records: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(file_path):
+            with open(file_path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.records[record["dst_file"]] = record
+
+    def get(self, dst_file: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest record of an output file.
+
+        Args:
+            dst_file (str): Path to the output file.
+
+        Returns:
+            Dict[str, Any], optional: The record, or None if the output was never recorded.
+        """
+        return self.records.get(dst_file)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """
+        Append a record and flush it to disk immediately.
+
+        Args:
+            record (Dict[str, Any]): The record to add. It must contain a "dst_file" key.
+        """
+        self.records[record["dst_file"]] = record
+        with open(self.file_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def run_batch(
+    executor: Executor,
+    job: Callable[..., JobResult],
+    src_files: Sequence[str],
+    dst_files: Sequence[str],
+    job_args: Sequence[Any],
+    params: Dict[str, Any],
+    skip_mode: Optional[str],
+    manifest_path: Optional[str],
+) -> BatchReport:
+    """
+    Run one conversion job per file on an executor and collect the results.
+
+    Each job is called as `job(src_file, dst_file, *job_args, skip_mode, recorded_digest)` and must catch its own
+    errors. Converted files are recorded in the manifest together with `params`, so that a later run with the same
+    parameters can skip them. Outputs that the manifest records with another source or other parameters are always
+    converted again, whatever the skip mode.
+
+    Args:
+        executor (Executor): The executor running the jobs.
+        job (Callable[..., JobResult]): The conversion job. It must be picklable for process pools.
+        src_files (Sequence[str]): Paths to the source files.
+        dst_files (Sequence[str]): Paths to the output files, one for each source file.
+        job_args (Sequence[Any]): Extra positional arguments of the job.
+        params (Dict[str, Any]): Conversion parameters recorded in the manifest.
+        skip_mode (str, optional): One of "mtime", "hash" or None, see `check_skip`.
+        manifest_path (str, optional): Path to a JSON lines manifest recording completed conversions.
+            Required when `skip_mode` is "hash".
+
+    Returns:
+        BatchReport: Per-file results in the order of `src_files` and the aggregate throughput.
+
+    Raises:
+        ValueError: If the arguments are inconsistent.
+    """
+    if len(src_files) != len(dst_files):
+        raise ValueError("src_files and dst_files must have the same length")
+    if skip_mode not in (None, "mtime", "hash"):
+        raise ValueError(f"Unsupported skip_mode: {skip_mode}")
+    if skip_mode == "hash" and manifest_path is None:
+        raise ValueError("manifest_path is required when skip_mode is 'hash'")
+
+    manifest = Manifest(manifest_path) if manifest_path else None
+    results: List[Optional[JobResult]] = [None] * len(src_files)
+
+    start = time.perf_counter()
+    futures = {}
+    for i, (src_file, dst_file) in enumerate(zip(src_files, dst_files)):
+        record = manifest.get(dst_file) if manifest else None
+        recorded_digest = None
+        job_skip_mode = skip_mode
+        if record and record["src_file"] == src_file and record["params"] == params:
+            recorded_digest = record["src_digest"]
+        elif record:
+            # The output was written from another source or with other parameters, so it is stale whatever its mtime.
+            job_skip_mode = None
+        future = executor.submit(job, src_file, dst_file, *job_args, job_skip_mode, recorded_digest)
+        futures[future] = i
+
+    for future in as_completed(futures):
+        i = futures[future]
+        try:
+            result = future.result()
+        except Exception as e:
+            result = JobResult(src_files[i], dst_files[i], "failed", error=f"{type(e).__name__}: {e}")
+        if manifest and result.status == "converted":
+            manifest.add(
+                {
+                    "src_file": result.src_file,
+                    "dst_file": result.dst_file,
+                    "src_digest": result.src_digest,
+                    "params": params,
+                }
+            )
+        results[i] = result
+
+    return BatchReport([result for result in results if result is not None], time.perf_counter() - start)
@@ -0,0 +1,176 @@
+import subprocess
+import tempfile
+from fractions import Fraction
+from functools import lru_cache
+from typing import IO, Any, Dict, Optional, Tuple
+
+import ffmpeg
+import numpy as np
+import static_ffmpeg
+
+
+@lru_cache(maxsize=None)
+def add_ffmpeg_paths() -> None:
+    """
+    Add the bundled ffmpeg and ffprobe executables to PATH.
+
+    The setup runs at most once per process, so it can be called before every ffmpeg use.
+    """
+    static_ffmpeg.add_paths()
+
+
+def probe_stream(file_path: str, codec_type: str) -> Dict[str, Any]:
+    """
+    Probe a media file and return the description of its first stream of the given type.
+
+    Args:
+        file_path (str): Path to the media file.
+        codec_type (str): Stream type to look for, e.g. "audio" or "video".
+
+    Returns:
+        Dict[str, Any]: The ffprobe description of the stream.
+
+    Raises:
+        ValueError: If the file has no stream of the requested type.
+    """
+    add_ffmpeg_paths()
+    for stream in ffmpeg.probe(file_path)["streams"]:
+        if stream["codec_type"] == codec_type:
+            return stream
+    raise ValueError(f"{file_path} has no {codec_type} stream")
+
+
+def parse_rate(rate: Optional[str]) -> Optional[float]:
+    """
+    Parse a frame rate reported by ffprobe, such as "30000/1001".
+
+    Args:
+        rate (str, optional): The rate as a fraction string.
+
+    Returns:
+        float, optional: The rate, or None if it is missing or undefined ("0/0").
+    """
+    if not rate or rate.startswith("0/") or rate.endswith("/0"):
+        return None
+    return float(Fraction(rate))
+
+
+def video_stream_info(stream: Dict[str, Any]) -> Tuple[float, int, Tuple[int, int]]:
+    """
+    Read the frame rate, frame count and displayed frame size from an ffprobe video stream description.
+
+    Args:
+        stream (Dict[str, Any]): The ffprobe description of a video stream.
+
+    Returns:
+        Tuple[float, int, Tuple[int, int]]: The frame rate (0 if unknown), the number of frames, estimated from
+            the duration if the container does not report it, and the `(width, height)` of the frames after
+            applying the rotation metadata.
+    """
+    fps = parse_rate(stream.get("avg_frame_rate")) or parse_rate(stream.get("r_frame_rate")) or 0.0
+    if stream.get("nb_frames"):
+        num_frames = int(stream["nb_frames"])
+    else:
+        num_frames = round(float(stream.get("duration", 0)) * fps)
+
+    rotation = stream.get("tags", {}).get("rotate", 0)
+    for side_data in stream.get("side_data_list", []):
+        rotation = side_data.get("rotation", rotation)
+    width, height = stream["width"], stream["height"]
+    if int(rotation) % 180 != 0:
+        width, height = height, width
+    return fps, num_frames, (width, height)
+
+
+def open_pipe(stream_spec: Any, **kwargs) -> subprocess.Popen:
+    """
+    Start an ffmpeg process whose output is read from its stdout pipe.
+
+    The error output goes to a temporary file rather than a pipe, so a chatty ffmpeg cannot block on a full stderr
+    pipe while the caller is reading stdout. `close_pipe` reads it back.
+
+    Args:
+        stream_spec: An ffmpeg-python output stream writing to "pipe:".
+        **kwargs: Extra keyword arguments for `subprocess.Popen`, e.g. `pass_fds`.
+
+    Returns:
+        subprocess.Popen: The running ffmpeg process.
+    """
+    add_ffmpeg_paths()
+    args = stream_spec.global_args("-nostdin", "-loglevel", "error").compile()
+    stderr = tempfile.TemporaryFile()
+    try:
+        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=stderr, **kwargs)
+    except BaseException:
+        stderr.close()
+        raise
+    # Popen leaves `stderr` unset for file targets; keep the file on the process so `close_pipe` can read it.
+    process.stderr = stderr
+    return process
+
+
+def close_pipe(process: subprocess.Popen, check: bool = True) -> None:
+    """
+    Stop an ffmpeg process started by `open_pipe` and release its pipes.
+
+    Args:
+        process (subprocess.Popen): The ffmpeg process.
+        check (bool, optional): If True, raise when ffmpeg exited with an error. Disable it when the output was
+            abandoned before the end, as ffmpeg is killed in that case.
+
+    Raises:
+        ffmpeg.Error: If `check` is True and ffmpeg exited with a non-zero code.
+    """
+    if process.poll() is None and not check:
+        process.kill()
+    if process.stdout is not None:
+        process.stdout.close()
+    returncode = process.wait()
+    stderr = b""
+    if process.stderr is not None:
+        process.stderr.seek(0)
+        stderr = process.stderr.read()
+        process.stderr.close()
+    if returncode != 0 and check:
+        raise ffmpeg.Error("ffmpeg", None, stderr)
+
+
+def read_into(pipe: IO[bytes], buffer: np.ndarray) -> int:
+    """
+    Fill a buffer from a pipe, reading until the buffer is full or the pipe is exhausted.
+
+    Args:
+        pipe (IO[bytes]): The binary pipe to read from.
+        buffer (np.ndarray): A C-contiguous, writable destination array.
+
+    Returns:
+        int: The number of bytes read, which is smaller than the buffer size only at the end of the pipe.
+    """
+    view = buffer.data.cast("B")
+    num_bytes = 0
+    while num_bytes < len(view):
+        n = pipe.readinto(view[num_bytes:])  # type: ignore[attr-defined]
+        if not n:
+            break
+        num_bytes += n
+    return num_bytes
+
+
+def read_all_into(pipe: IO[bytes], buffer: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Read a pipe to the end into a buffer, doubling the buffer along its first axis whenever it is full.
+
+    Args:
+        pipe (IO[bytes]): The binary pipe to read from.
+        buffer (np.ndarray): A C-contiguous, writable, non-empty destination array, sized for the expected data.
+
+    Returns:
+        Tuple[np.ndarray, int]: The buffer, which is a new array if it had to grow, and the number of complete
+            rows read along its first axis.
+    """
+    row_bytes = buffer[0].nbytes
+    num_rows = read_into(pipe, buffer) // row_bytes
+    while num_rows == len(buffer):
+        buffer = np.concatenate([buffer, np.empty_like(buffer)])
+        num_rows += read_into(pipe, buffer[num_rows:]) // row_bytes
+    return buffer, num_rows
@@ -0,0 +1,143 @@
+import math
+import os
+import subprocess
+import threading
+from typing import IO, Any, Dict, List, Optional, Tuple, cast
+
+import ffmpeg
+import numpy as np
+
+from .ffmpeg_utils import add_ffmpeg_paths, close_pipe, open_pipe, read_all_into, video_stream_info
+
+
+def load_media(
+    file_path: str,
+    target_fps: Optional[float] = None,
+    target_sr: Optional[int] = None,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    size: Optional[Tuple[int, int]] = None,
+    grayscale: bool = False,
+    mono: bool = True,
+    threads: int = 0,
+) -> Tuple[np.ndarray, float, Optional[np.ndarray], Optional[int]]:
+    """
+    Load time-aligned video frames and audio from a media file with a single ffmpeg process.
+
+    The file is probed once and demuxed and decoded once: ffmpeg writes the raw frames and the float32 samples to
+    two pipes that are read concurrently into preallocated arrays. Frame `i` is shown at `i / fps` seconds and
+    sample `j` is played at `j / sample_rate` seconds after `start_time`, so both share one timeline. Frames are
+    repeated or dropped to reach the target frame rate, and audio is padded with silence if it starts late.
+
+    Args:
+        file_path (str): Path to the media file.
+        target_fps (float, optional): Frame rate of the returned frames. Defaults to the source frame rate.
+        target_sr (int, optional): Sample rate of the returned waveform. Defaults to the source sample rate.
+        start_time (float, optional): Start time in seconds. Defaults to the start of the file.
+        end_time (float, optional): End time in seconds. Defaults to the end of the file.
+        size (Tuple[int, int], optional): Resize frames to `(width, height)`.
+        grayscale (bool, optional): If True, convert frames to single-channel grayscale. Defaults to False.
+        mono (bool, optional): If True, downmix the audio to a single channel. Defaults to True.
+        threads (int, optional): Number of ffmpeg decoding threads, or 0 to choose automatically. Defaults to 0.
+
+    Returns:
+        Tuple[np.ndarray, float, Optional[np.ndarray], Optional[int]]: The uint8 BGR frames of shape
+            `(num_frames, height, width, 3)`, or `(num_frames, height, width)` in grayscale, the frame rate, the
+            float32 waveform of shape `(num_samples,)` if `mono` is True and `(num_samples, channels)` otherwise,
+            and the sample rate. The waveform and sample rate are None if the file has no audio stream.
+
+    Raises:
+        ValueError: If the file has no video stream.
+    """
+    add_ffmpeg_paths()
+    probe = ffmpeg.probe(file_path)
+    video_info = next((stream for stream in probe["streams"] if stream["codec_type"] == "video"), None)
+    audio_info = next((stream for stream in probe["streams"] if stream["codec_type"] == "audio"), None)
+    if video_info is None:
+        raise ValueError(f"{file_path} has no video stream")
+
+    src_fps, _, frame_size = video_stream_info(video_info)
+    fps = target_fps if target_fps else src_fps
+    width, height = size if size is not None else frame_size
+    start = max(start_time or 0.0, 0.0)
+    duration = float(probe.get("format", {}).get("duration") or video_info.get("duration") or 0)
+    if end_time is not None:
+        duration = min(duration, end_time) if duration else end_time
+    duration = max(duration - start, 0.0)
+
+    input_kwargs: Dict[str, Any] = {"threads": threads}
+    if start > 0:
+        input_kwargs["ss"] = start
+    if end_time is not None:
+        input_kwargs["t"] = duration
+    source = ffmpeg.input(file_path, **input_kwargs)
+
+    video = source.video.filter("fps", fps=fps, start_time=0)
+    if size is not None:
+        video = video.filter("scale", width, height, flags="area")
+    pix_fmt = "gray" if grayscale else "bgr24"
+    outputs = [video.output("pipe:1", format="rawvideo", pix_fmt=pix_fmt)]
+    frame_shape: Tuple[int, ...] = (height, width) if grayscale else (height, width, 3)
+    frames = np.empty((math.ceil(duration * fps) + 1, *frame_shape), dtype=np.uint8)
+
+    waveform: Optional[np.ndarray] = None
+    sample_rate: Optional[int] = None
+    fds: List[int] = []
+    if audio_info is not None:
+        sample_rate = target_sr if target_sr else int(audio_info["sample_rate"])
+        num_channels = 1 if mono else int(audio_info["channels"])
+        waveform = np.empty((max(round(duration * sample_rate), 1) + 1, num_channels), dtype=np.float32)
+        # the audio is written to an extra pipe inherited by ffmpeg; padding keeps it aligned with the frames
+        fds = list(os.pipe())
+        audio = source.audio.filter("aresample", **{"async": 1, "first_pts": 0})
+        outputs.append(
+            audio.output(f"pipe:{fds[1]}", format="f32le", acodec="pcm_f32le", ac=num_channels, ar=sample_rate)
+        )
+
+    try:
+        process = open_pipe(ffmpeg.merge_outputs(*outputs), pass_fds=fds[1:])
+    except BaseException:
+        for fd in fds:
+            os.close(fd)
+        raise
+    if fds:
+        os.close(fds[1])
+
+    audio_pipe = os.fdopen(fds[0], "rb") if fds else None
+    frames, num_frames, waveform, num_samples = _read_pipes(process, frames, audio_pipe, waveform)
+    if waveform is not None:
+        waveform = waveform[:num_samples, 0] if mono else waveform[:num_samples]
+    return frames[:num_frames], fps, waveform, sample_rate
+
+
+def _read_pipes(
+    process: subprocess.Popen, frames: np.ndarray, audio_pipe: Optional[IO[bytes]], waveform: Optional[np.ndarray]
+) -> Tuple[np.ndarray, int, Optional[np.ndarray], int]:
+    # both pipes must be drained at the same time, otherwise ffmpeg blocks on whichever one fills up first
+    audio_result: Dict[str, Any] = {"waveform": waveform, "num_samples": 0}
+
+    def read_audio(pipe: IO[bytes], buffer: np.ndarray) -> None:
+        try:
+            audio_result["waveform"], audio_result["num_samples"] = read_all_into(pipe, buffer)
+        except Exception as e:
+            audio_result["error"] = e
+
+    audio_reader = None
+    if audio_pipe is not None and waveform is not None:
+        audio_reader = threading.Thread(target=read_audio, args=(audio_pipe, waveform), daemon=True)
+        audio_reader.start()
+    try:
+        frames, num_frames = read_all_into(cast(IO[bytes], process.stdout), frames)
+    except BaseException:
+        close_pipe(process, check=False)
+        raise
+    finally:
+        if audio_reader is not None:
+            audio_reader.join()
+        if audio_pipe is not None:
+            audio_pipe.close()
+    close_pipe(process)
+
+    if "error" in audio_result:
+        raise audio_result["error"]
+    return frames, num_frames, audio_result["waveform"], audio_result["num_samples"]
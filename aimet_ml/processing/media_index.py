@@ -0,0 +1,231 @@
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+import ffmpeg
+
+from .ffmpeg_utils import add_ffmpeg_paths, parse_rate
+
+COLUMNS = [
+    "path",
+    "mtime_ns",
+    "size",
+    "codec_types",
+    "duration",
+    "fps",
+    "width",
+    "height",
+    "sample_rate",
+    "channels",
+    "error",
+]
+
+
+def probe_media(file_path: str) -> Dict[str, Any]:
+    """
+    Probe a media file and summarize its streams.
+
+    Args:
+        file_path (str): Path to the media file.
+
+    Returns:
+        Dict[str, Any]: The codec types of all streams, the duration in seconds, the frame rate and frame size of
+            the first video stream, and the sample rate and channel count of the first audio stream. Fields that
+            do not apply are None. If ffprobe fails, the error message is stored under "error".
+    """
+    add_ffmpeg_paths()
+    info: Dict[str, Any] = {column: None for column in COLUMNS}
+    info["path"] = file_path
+    try:
+        probe = ffmpeg.probe(file_path)
+    except ffmpeg.Error as e:
+        info["codec_types"] = []
+        info["error"] = (e.stderr or b"").decode(errors="replace").strip() or "ffprobe failed"
+        return info
+
+    streams = probe.get("streams", [])
+    info["codec_types"] = [stream["codec_type"] for stream in streams]
+    durations = [float(stream["duration"]) for stream in streams if "duration" in stream]
+    duration = probe.get("format", {}).get("duration")
+    info["duration"] = float(duration) if duration else max(durations, default=None)
+
+    video = next((stream for stream in streams if stream["codec_type"] == "video"), None)
+    if video is not None:
+        info["fps"] = parse_rate(video.get("avg_frame_rate")) or parse_rate(video.get("r_frame_rate"))
+        info["width"] = video.get("width")
+        info["height"] = video.get("height")
+
+    audio = next((stream for stream in streams if stream["codec_type"] == "audio"), None)
+    if audio is not None:
+        info["sample_rate"] = int(audio["sample_rate"]) if audio.get("sample_rate") else None
+        info["channels"] = audio.get("channels")
+    return info
+
+
+class MediaIndex:
+    """
+    Persistent SQLite index of media stream metadata.
+
+    Files are probed in parallel with a bounded thread pool and their stream information is stored with the file's
+    modification time and size. Queries are answered from the index, and a file is probed again only when it is
+    missing from the index or has changed since it was indexed.
+    """
+
+    def __init__(self, db_path: str, num_workers: int = 8):
+        """
+        Initializes the MediaIndex.
+
+        Args:
+            db_path (str): Path to the SQLite database file. It is created if it does not exist.
+            num_workers (int, optional): Maximum number of concurrent ffprobe processes. Default is 8.
+        """
+        self.db_path = db_path
+        self.num_workers = num_workers
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS media (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                codec_types TEXT NOT NULL,
+                duration REAL,
+                fps REAL,
+                width INTEGER,
+                height INTEGER,
+                sample_rate INTEGER,
+                channels INTEGER,
+                error TEXT
+            )
+            """
+        )
+        self.connection.commit()
+
+    def update(self, file_paths: Iterable[str]) -> int:
+        """
+        Probe the files that are missing from the index or have changed, and store their metadata.
+
+        Files that no longer exist or cannot be accessed are skipped, and their index entries are removed.
+
+        Args:
+            file_paths (Iterable[str]): Paths to the media files.
+
+        Returns:
+            int: The number of files that were probed.
+        """
+        stale = []
+        missing = []
+        for file_path in file_paths:
+            file_path = os.path.abspath(file_path)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                missing.append((file_path,))
+                continue
+            if self._lookup(file_path, stat) is None:
+                stale.append((file_path, stat))
+        self.connection.executemany("DELETE FROM media WHERE path = ?", missing)
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            infos = list(executor.map(probe_media, [file_path for file_path, _ in stale]))
+
+        rows = []
+        for (_, stat), info in zip(stale, infos):
+            info.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size, codec_types=json.dumps(info["codec_types"]))
+            rows.append([info[column] for column in COLUMNS])
+        self.connection.executemany(
+            f"INSERT OR REPLACE INTO media ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", rows
+        )
+        self.connection.commit()
+        return len(rows)
+
+    def get(self, file_path: str) -> Dict[str, Any]:
+        """
+        Get the metadata of a media file, probing it first if the index entry is missing or stale.
+
+        Args:
+            file_path (str): Path to the media file.
+
+        Returns:
+            Dict[str, Any]: The metadata described in `probe_media`.
+        """
+        file_path = os.path.abspath(file_path)
+        info = self._lookup(file_path, os.stat(file_path))
+        if info is None:
+            self.update([file_path])
+            info = self._lookup(file_path, os.stat(file_path))
+        return info if info is not None else probe_media(file_path)
+
+    def is_video(self, file_path: str) -> bool:
+        """
+        Check if a given file contains video streams.
+
+        Args:
+            file_path (str): The path to the input file.
+
+        Returns:
+            bool: True if the file contains video streams, False otherwise or if it cannot be probed.
+        """
+        return "video" in self.get(file_path)["codec_types"]
+
+    def get_duration(self, file_path: str) -> Optional[float]:
+        """
+        Get the duration of a media file.
+
+        Args:
+            file_path (str): Path to the media file.
+
+        Returns:
+            float, optional: The duration in seconds, or None if it is unknown.
+        """
+        return self.get(file_path)["duration"]
+
+    def get_sample_rate(self, file_path: str) -> Optional[int]:
+        """
+        Get the sample rate of the first audio stream of a media file.
+
+        Args:
+            file_path (str): Path to the media file.
+
+        Returns:
+            int, optional: The sample rate, or None if the file has no audio stream.
+        """
+        return self.get(file_path)["sample_rate"]
+
+    def filter_videos(self, file_paths: Iterable[str]) -> List[str]:
+        """
+        Select the files that contain video streams, indexing any missing or stale files first.
+
+        Args:
+            file_paths (Iterable[str]): Paths to the media files.
+
+        Returns:
+            List[str]: The paths, as given, of the files that contain video streams. Files that no longer exist or
+                cannot be accessed are left out.
+        """
+        file_paths = list(file_paths)
+        self.update(file_paths)
+        videos = []
+        for file_path in file_paths:
+            try:
+                if self.is_video(file_path):
+                    videos.append(file_path)
+            except OSError:
+                continue
+        return videos
+
+    def close(self) -> None:
+        """Close the connection to the database."""
+        self.connection.close()
+
+    def _lookup(self, file_path: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        row = self.connection.execute(f"SELECT {', '.join(COLUMNS)} FROM media WHERE path = ?", (file_path,)).fetchone()
+        if row is None:
+            return None
+        info = dict(zip(COLUMNS, row))
+        if info["mtime_ns"] != stat.st_mtime_ns or info["size"] != stat.st_size:
+            return None
+        info["codec_types"] = json.loads(info["codec_types"])
+        return info
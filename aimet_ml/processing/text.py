@@ -1,12 +1,164 @@
-from typing import List, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union, cast
 
+import numpy as np
+import pandas as pd
 from transformers import PreTrainedTokenizer
 
 
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton matching a fixed list of keywords against texts in a single pass.
+
+    The automaton is built once from the keywords, and each query scans a text once regardless of the number of
+    keywords, instead of searching the text for every keyword separately. Matches are case-sensitive substring
+    matches, the same as `keyword in text`, and may overlap.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Initializes the KeywordMatcher and builds the automaton.
+
+        Args:
+            keywords (Iterable[str]): The keywords to match. Duplicates are matched once.
+        """
+        self.keywords: List[str] = list(dict.fromkeys(keywords))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[int, ...]] = [()]
+
+        for keyword_idx, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._outputs[state] += (keyword_idx,)
+
+        # breadth-first, so that the failure state of a node is final before its children are visited
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._outputs[state] += self._outputs[0]
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._outputs[child] += self._outputs[self._fail[child]]
+                queue.append(child)
+
+    def _scan(self, text: str) -> Iterable[Tuple[int, Tuple[int, ...]]]:
+        # yields the end offset and the matched keyword indices of every position with at least one match
+        if self._outputs[0]:
+            yield 0, self._outputs[0]
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                yield end, outputs[state]
+
+    def any(self, text: str) -> bool:
+        """
+        Check if any keyword is present in the text.
+
+        Args:
+            text (str): The text to search.
+
+        Returns:
+            bool: True if at least one keyword is present, False otherwise.
+        """
+        return next(iter(self._scan(text)), None) is not None
+
+    def all(self, text: str) -> bool:
+        """
+        Check if every keyword is present in the text.
+
+        Args:
+            text (str): The text to search.
+
+        Returns:
+            bool: True if all keywords are present, False otherwise. True if there are no keywords.
+        """
+        if not self.keywords:
+            return True
+        found: Set[int] = set()
+        for _, keyword_indices in self._scan(text):
+            found.update(keyword_indices)
+            if len(found) == len(self.keywords):
+                return True
+        return False
+
+    def count(self, text: str) -> int:
+        """
+        Count the occurrences of all keywords in the text, including overlapping ones.
+
+        Args:
+            text (str): The text to search.
+
+        Returns:
+            int: The total number of occurrences.
+        """
+        return sum(len(keyword_indices) for _, keyword_indices in self._scan(text))
+
+    def find_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find every occurrence of the keywords in the text, including overlapping ones.
+
+        Args:
+            text (str): The text to search.
+
+        Returns:
+            List[Tuple[int, int, str]]: The `(start, end, keyword)` of each occurrence, such that
+                `text[start:end] == keyword`, sorted by end offset and then by decreasing length.
+        """
+        spans = []
+        for end, keyword_indices in self._scan(text):
+            for keyword_idx in keyword_indices:
+                keyword = self.keywords[keyword_idx]
+                spans.append((end - len(keyword), end, keyword))
+        return spans
+
+    def mask(self, texts: Union[Sequence[str], pd.Series], mode: str = "any") -> np.ndarray:
+        """
+        Match many texts at once and return a boolean mask, e.g. to filter the rows of a DataFrame.
+
+        Args:
+            texts (Union[Sequence[str], pd.Series]): The texts to search. Missing values never match.
+            mode (str, optional): "any" to require at least one keyword, or "all" to require every keyword.
+                Defaults to "any".
+
+        Returns:
+            np.ndarray: A boolean array with one entry per text, in the same order.
+        """
+        if mode not in ("any", "all"):
+            raise ValueError(f"Unsupported mode: {mode}")
+        match = self.any if mode == "any" else self.all
+        values = texts.to_numpy() if isinstance(texts, pd.Series) else texts
+        return np.fromiter((isinstance(text, str) and match(text) for text in values), dtype=bool, count=len(values))
+
+
+@lru_cache(maxsize=32)
+def _compile_keywords(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
 def include_keywords(text: str, keywords: List[str]) -> bool:
     """
     Check if any of the given keywords are present in the text.
 
+    The keyword matcher is compiled once per keyword list and reused. Use `KeywordMatcher` directly to match many
+    texts against the same keywords.
+
     Args:
         text (str): The text to search for keywords.
         keywords (list[str]): List of keywords to check for.
@@ -14,16 +166,16 @@ def include_keywords(text: str, keywords: List[str]) -> bool:
     Returns:
         bool: True if any keyword is present in the text, False otherwise.
     """
-    for kw in keywords:
-        if kw in text:
-            return True
-    return False
+    return _compile_keywords(tuple(keywords)).any(text)
 
 
 def exclude_keywords(text: str, keywords: List[str]) -> bool:
     """
     Check if any of the given keywords are present in the text.
 
+    The keyword matcher is compiled once per keyword list and reused. Use `KeywordMatcher` directly to match many
+    texts against the same keywords.
+
     Args:
         text (str): The text to search for keywords.
         keywords (list[str]): List of keywords to check for.
@@ -31,36 +183,47 @@ def exclude_keywords(text: str, keywords: List[str]) -> bool:
     Returns:
         bool: False if any keyword is present in the text, True otherwise.
     """
-    for kw in keywords:
-        if kw in text:
-            return False
-    return True
+    return not _compile_keywords(tuple(keywords)).any(text)
 
 
 def clean_repeated_tokens(tokens: List[str]) -> List[str]:
     """
     Remove sequences of repeated tokens from a list.
 
+    Sequence sizes are tried from half the list length down to 1. For each size, the list is scanned from left to
+    right and every sequence that is immediately repeated keeps only its first occurrence. Each size is handled
+    in one vectorized pass over integer token ids: a repeated sequence of size `s` is a run of at least `s`
+    positions where a token equals the token `s` positions later, and all repetitions in a run are dropped at once.
+
+    Sequences are compared token by token. Earlier versions compared the joined text of the sequences, so token lists
+    that only repeat a text with different tokens, such as `["ab", "c", "a", "bc"]`, are no longer shortened.
+
     Args:
         tokens (list[str]): List of tokens to clean.
 
     Returns:
         list[str]: List of tokens with repeated sequences removed.
     """
-    tokens = tokens.copy()
-    sequence_size = len(tokens) // 2
-    while sequence_size > 0:
-        cur_idx = 0
-        while cur_idx < len(tokens) - sequence_size:
-            next_idx = cur_idx + sequence_size
-            cur_text = "".join(tokens[cur_idx : cur_idx + sequence_size])
-            next_text = "".join(tokens[next_idx : next_idx + sequence_size])
-            if cur_text == next_text:
-                tokens = tokens[: cur_idx + sequence_size] + tokens[next_idx + sequence_size :]
-            else:
-                cur_idx += 1
-        sequence_size -= 1
-    return tokens
+    vocab: Dict[str, int] = {}
+    ids = np.array([vocab.setdefault(token, len(vocab)) for token in tokens], dtype=np.int64)
+    positions = np.arange(len(tokens))
+    for sequence_size in range(len(tokens) // 2, 0, -1):
+        if len(ids) < 2 * sequence_size:
+            continue
+        # runs of positions whose token repeats `sequence_size` tokens later
+        is_equal = np.concatenate([[False], ids[:-sequence_size] == ids[sequence_size:], [False]])
+        edges = np.flatnonzero(is_equal[1:] != is_equal[:-1])
+        run_starts, run_ends = edges[::2], edges[1::2]
+        num_repeats = (run_ends - run_starts) // sequence_size
+        if not num_repeats.any():
+            continue
+        # the first sequence of each run is kept and the following `num_repeats` sequences are removed
+        removed = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.add.at(removed, run_starts + sequence_size, 1)
+        np.add.at(removed, run_starts + sequence_size * (num_repeats + 1), -1)
+        keep = np.cumsum(removed[:-1]) == 0
+        ids, positions = ids[keep], positions[keep]
+    return [tokens[position] for position in positions]
 
 
 def trim_tokens(tokenizer: PreTrainedTokenizer, text: str, max_len: int) -> Tuple[str, int]:
@@ -81,3 +244,77 @@ def trim_tokens(tokenizer: PreTrainedTokenizer, text: str, max_len: int) -> Tupl
         tokens = tokens[:max_len]
 
     return tokenizer.convert_tokens_to_string(tokens), len(tokens)
+
+
+_worker_tokenizer: Optional[PreTrainedTokenizer] = None
+
+
+def _init_trim_worker(tokenizer: PreTrainedTokenizer) -> None:
+    global _worker_tokenizer
+    _worker_tokenizer = tokenizer
+
+
+def _trim_tokens_worker(text: str, max_len: int) -> Tuple[str, int]:
+    return trim_tokens(cast(PreTrainedTokenizer, _worker_tokenizer), text, max_len)
+
+
+def trim_tokens_batch(
+    tokenizer: PreTrainedTokenizer,
+    texts: Union[Sequence[str], pd.Series],
+    max_len: int,
+    batch_size: int = 1000,
+    num_workers: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Trim many texts so that each one has at most `max_len` tokens.
+
+    Fast tokenizers tokenize each batch of texts in one call with truncation, and every text is trimmed by slicing
+    the original string at the end offset of its last kept token, so the trimmed text keeps its original casing
+    and spacing instead of being rebuilt from the tokens as in `trim_tokens`. Slow tokenizers do not report
+    offsets and fall back to `trim_tokens`, optionally on a process pool.
+
+    Args:
+        tokenizer (PreTrainedTokenizer): The tokenizer used to tokenize the input texts.
+        texts (Union[Sequence[str], pd.Series]): The input texts.
+        max_len (int): The maximum allowed number of tokens per text, excluding special tokens.
+        batch_size (int, optional): Number of texts per tokenizer call of a fast tokenizer. Defaults to 1000.
+        num_workers (int, optional): Number of worker processes for slow tokenizers, or 0 to trim in the current
+            process. Defaults to 0.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: An object array of the trimmed texts and an integer array of their numbers
+            of tokens, in the order of `texts`.
+    """
+    texts = list(texts)
+    trimmed_texts = np.empty(len(texts), dtype=object)
+    num_tokens = np.zeros(len(texts), dtype=np.int64)
+    if max_len <= 0:
+        trimmed_texts[:] = ""
+        return trimmed_texts, num_tokens
+
+    if not tokenizer.is_fast:
+        if num_workers > 0:
+            with ProcessPoolExecutor(num_workers, initializer=_init_trim_worker, initargs=(tokenizer,)) as executor:
+                chunksize = max(len(texts) // (4 * num_workers), 1)
+                results = list(executor.map(_trim_tokens_worker, texts, [max_len] * len(texts), chunksize=chunksize))
+        else:
+            results = [trim_tokens(tokenizer, text, max_len) for text in texts]
+        for i, (trimmed_text, count) in enumerate(results):
+            trimmed_texts[i], num_tokens[i] = trimmed_text, count
+        return trimmed_texts, num_tokens
+
+    for batch_start in range(0, len(texts), batch_size):
+        batch = texts[batch_start : batch_start + batch_size]
+        encodings = tokenizer(
+            batch,
+            add_special_tokens=False,
+            truncation=True,
+            max_length=max_len,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )
+        for i, (text, offsets) in enumerate(zip(batch, encodings["offset_mapping"]), batch_start):
+            trimmed_texts[i] = text[offsets[0][0] : offsets[-1][1]] if offsets else ""
+            num_tokens[i] = len(offsets)
+    return trimmed_texts, num_tokens
@@ -1,9 +1,26 @@
-from typing import List
+import errno
+import itertools
+import math
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import IO, Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, cast
 
 import cv2
 import ffmpeg
 import numpy as np
 
+from .batch import BatchReport, JobResult, check_skip, partial_path, run_batch
+from .ffmpeg_utils import add_ffmpeg_paths, close_pipe, open_pipe, probe_stream, read_into, video_stream_info
+
+BACKENDS = ("opencv", "ffmpeg")
+
 
 def is_video(file_path: str) -> bool:
     """
@@ -15,6 +32,7 @@ def is_video(file_path: str) -> bool:
     Returns:
         bool: True if the file contains video streams, False otherwise.
     """
+    add_ffmpeg_paths()
     probe = ffmpeg.probe(file_path)
     streams = probe["streams"]
 
@@ -25,28 +43,342 @@ def is_video(file_path: str) -> bool:
     return False
 
 
-def load_video(file_path: str) -> tuple:
+def _sampled_fps(fps: float, stride: int, target_fps: Optional[float]) -> float:
+    if target_fps is not None:
+        fps = min(fps, target_fps)
+    return fps / stride
+
+
+def _sampling_interval(fps: float, stride: int, target_fps: Optional[float]) -> float:
+    # number of decoded frames between two sampled frames, which is fractional when resampling to `target_fps`
+    if stride < 1:
+        raise ValueError("stride must be a positive integer")
+    if target_fps is not None and target_fps <= 0:
+        raise ValueError("target_fps must be positive")
+    step = fps / target_fps if target_fps is not None and target_fps < fps else 1.0
+    return stride * step
+
+
+def _read_frames(
+    cap: cv2.VideoCapture,
+    fps: float,
+    stride: int = 1,
+    target_fps: Optional[float] = None,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    size: Optional[Tuple[int, int]] = None,
+    grayscale: bool = False,
+    out: Optional[np.ndarray] = None,
+) -> Iterator[np.ndarray]:
+    # when `out` is given, frames are decoded into its rows and reading stops once it is full
+    interval = _sampling_interval(fps, stride, target_fps)
+    start_idx = max(math.ceil(start_time * fps), 0) if start_time else 0
+    end_idx = math.ceil(end_time * fps) if end_time is not None else None
+    if start_idx > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_idx)
+
+    # frames are decoded one by one, but only the sampled ones are converted to images
+    frame_idx = start_idx
+    num_samples = 0
+    while end_idx is None or frame_idx < end_idx:
+        if out is not None and num_samples == len(out):
+            break
+        sample_time = math.ceil(num_samples * interval - 1e-6)
+        if not cap.grab():
+            break
+        if frame_idx - start_idx == sample_time:
+            target = out[num_samples] if out is not None else None
+            ret, frame = cap.retrieve(target if not grayscale and size is None else None)
+            if not ret:
+                break
+            if grayscale:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=target if size is None else None)
+            if size is not None:
+                frame = cv2.resize(frame, size, dst=target, interpolation=cv2.INTER_AREA)
+            if target is not None and frame.ctypes.data != target.ctypes.data:
+                target[...] = frame
+                frame = target
+            num_samples += 1
+            yield frame
+        frame_idx += 1
+
+
+def _read_frames_ffmpeg(
+    file_path: str,
+    fps: float,
+    frame_size: Tuple[int, int],
+    stride: int = 1,
+    target_fps: Optional[float] = None,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    size: Optional[Tuple[int, int]] = None,
+    grayscale: bool = False,
+    out: Optional[np.ndarray] = None,
+    threads: int = 0,
+    queue_size: int = 8,
+) -> Iterator[np.ndarray]:
+    # same sampling as `_read_frames`, but ffmpeg decodes, samples, scales and converts the frames with its own threads
+    interval = _sampling_interval(fps, stride, target_fps)
+    start_idx = max(math.ceil(start_time * fps), 0) if start_time else 0
+    end_idx = math.ceil(end_time * fps) if end_time is not None else None
+    if end_idx is not None and end_idx <= start_idx:
+        return
+
+    input_kwargs: Dict[str, float] = {"threads": threads}
+    if start_idx > 0:
+        # seek half a frame early so that the first decoded frame is `start_idx`
+        input_kwargs["ss"] = (start_idx - 0.5) / fps
+    if end_idx is not None:
+        input_kwargs["t"] = (end_idx - start_idx + 1) / fps
+    stream = ffmpeg.input(file_path, **input_kwargs).video
+
+    # keep frame `n` if it is the first frame at or after the next sample time, as in `_read_frames`
+    select = f"lte((floor((n-1+1e-06)/{interval!r})+1)*{interval!r}-1e-06,n)"
+    if end_idx is not None:
+        select += f"*lt(n,{end_idx - start_idx})"
+    if interval != 1.0 or end_idx is not None:
+        stream = stream.filter("select", select)
+    if size is not None:
+        stream = stream.filter("scale", size[0], size[1], flags="area")
+    pix_fmt = "gray" if grayscale else "bgr24"
+    process = open_pipe(stream.output("pipe:", format="rawvideo", pix_fmt=pix_fmt, vsync=0))
+    width, height = size if size is not None else frame_size
+    frame_shape: Tuple[int, ...] = (height, width) if grayscale else (height, width, 3)
+    yield from _iter_pipe_frames(process, frame_shape, out, queue_size)
+
+
+def _iter_pipe_frames(
+    process: subprocess.Popen, frame_shape: Tuple[int, ...], out: Optional[np.ndarray], queue_size: int
+) -> Iterator[np.ndarray]:
+    # a reader thread copies raw frames from the ffmpeg pipe into a bounded queue, so that decoding and reading
+    # overlap with the consumer's work without buffering the whole video
+    pipe = cast(IO[bytes], process.stdout)
+    frames: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    exhausted = threading.Event()
+
+    def put(item: object) -> bool:
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read() -> None:
+        try:
+            for i in itertools.count():
+                if out is not None and i == len(out):
+                    break
+                frame = out[i] if out is not None else np.empty(frame_shape, dtype=np.uint8)
+                if read_into(pipe, frame) < frame.nbytes:
+                    exhausted.set()
+                    break
+                if not put(frame):
+                    return
+            put(None)
+        except Exception as e:
+            put(e)
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = frames.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # ffmpeg is killed if the frames were abandoned early, which also ends a blocked read in the reader
+        finished = exhausted.is_set()
+        stop.set()
+        if not finished:
+            process.kill()
+        reader.join()
+        close_pipe(process, check=finished)
+
+
+@contextmanager
+def _open_video(
+    file_path: str, backend: str, threads: int
+) -> Iterator[Tuple[float, int, Tuple[int, int], Callable[..., Iterator[np.ndarray]]]]:
+    # yields the frame rate, the frame count, the frame size and a `_read_frames`-like reader bound to the video
+    if backend == "opencv":
+        cap = cv2.VideoCapture(file_path)
+        try:
+            frame_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            yield fps, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), frame_size, partial(_read_frames, cap, fps)
+        finally:
+            cap.release()
+    elif backend == "ffmpeg":
+        fps, num_frames, frame_size = video_stream_info(probe_stream(file_path, "video"))
+        yield fps, num_frames, frame_size, partial(_read_frames_ffmpeg, file_path, fps, frame_size, threads=threads)
+    else:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+
+
+def iter_frames(
+    file_path: str,
+    stride: int = 1,
+    target_fps: Optional[float] = None,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    size: Optional[Tuple[int, int]] = None,
+    grayscale: bool = False,
+    backend: str = "opencv",
+    threads: int = 0,
+) -> Iterator[np.ndarray]:
+    """
+    Lazily read frames from a video file, one decoded frame at a time.
+
+    Args:
+        file_path (str): The path to the video file.
+        stride (int, optional): Keep every `stride`-th frame, counted after `target_fps` sampling. Defaults to 1.
+        target_fps (float, optional): Sample frames at this rate. Videos with a lower frame rate keep every frame.
+        start_time (float, optional): Seek to this time in seconds before reading. Defaults to the start.
+        end_time (float, optional): Stop before the frame at this time in seconds. Defaults to the end.
+        size (Tuple[int, int], optional): Resize frames to `(width, height)`.
+        grayscale (bool, optional): If True, convert frames to single-channel grayscale. Defaults to False.
+        backend (str, optional): Decoder to use, either "opencv" or "ffmpeg". The "ffmpeg" backend decodes,
+            samples and resizes frames in a multi-threaded ffmpeg process and reads them through a pipe, which is
+            faster on many-core machines. Colors and resized pixels may differ slightly between the backends.
+            Defaults to "opencv".
+        threads (int, optional): Number of ffmpeg decoding threads, or 0 to choose automatically. Only used by
+            the "ffmpeg" backend. Defaults to 0.
+
+    Yields:
+        np.ndarray: A BGR frame of shape `(height, width, 3)`, or `(height, width)` in grayscale.
+    """
+    with _open_video(file_path, backend, threads) as (_, _, _, read_frames):
+        yield from read_frames(stride, target_fps, start_time, end_time, size, grayscale)
+
+
+def load_video(
+    file_path: str,
+    stride: int = 1,
+    target_fps: Optional[float] = None,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    size: Optional[Tuple[int, int]] = None,
+    grayscale: bool = False,
+    backend: str = "opencv",
+    threads: int = 0,
+) -> tuple:
     """
     Load frames from a video file.
 
+    The sampling and transformation options are the same as in `iter_frames`.
+
     Args:
         file_path (str): The path to the video file.
+        stride (int, optional): Keep every `stride`-th frame, counted after `target_fps` sampling. Defaults to 1.
+        target_fps (float, optional): Sample frames at this rate. Videos with a lower frame rate keep every frame.
+        start_time (float, optional): Seek to this time in seconds before reading. Defaults to the start.
+        end_time (float, optional): Stop before the frame at this time in seconds. Defaults to the end.
+        size (Tuple[int, int], optional): Resize frames to `(width, height)`.
+        grayscale (bool, optional): If True, convert frames to single-channel grayscale. Defaults to False.
+        backend (str, optional): Decoder to use, either "opencv" or "ffmpeg", as in `iter_frames`.
+            Defaults to "opencv".
+        threads (int, optional): Number of ffmpeg decoding threads, or 0 to choose automatically. Only used by
+            the "ffmpeg" backend. Defaults to 0.
 
     Returns:
-        tuple: A tuple containing a list of frames and the frames per second (fps).
+        tuple: A tuple containing a list of frames and the frames per second (fps) of the sampled frames.
     """
-    frames: List[np.ndarray] = []
-    cap = cv2.VideoCapture(file_path)
-    fps = cap.get(cv2.CAP_PROP_FPS)
+    with _open_video(file_path, backend, threads) as (fps, _, _, read_frames):
+        frames = list(read_frames(stride, target_fps, start_time, end_time, size, grayscale))
+    return frames, _sampled_fps(fps, stride, target_fps)
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frames.append(frame)
 
-    cap.release()
-    return frames, fps
+def _num_sampled_frames(
+    num_frames: int,
+    fps: float,
+    stride: int,
+    target_fps: Optional[float],
+    start_time: Optional[float],
+    end_time: Optional[float],
+) -> int:
+    start_idx = max(math.ceil(start_time * fps), 0) if start_time else 0
+    end_idx = min(math.ceil(end_time * fps), num_frames) if end_time is not None else num_frames
+    interval = _sampling_interval(fps, stride, target_fps)
+    if end_idx <= start_idx:
+        return 0
+    return math.floor((end_idx - start_idx - 1 + 1e-6) / interval) + 1
+
+
+def load_video_array(
+    file_path: str,
+    stride: int = 1,
+    target_fps: Optional[float] = None,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+    size: Optional[Tuple[int, int]] = None,
+    grayscale: bool = False,
+    memmap_path: Optional[str] = None,
+    backend: str = "opencv",
+    threads: int = 0,
+) -> Tuple[np.ndarray, float]:
+    """
+    Load frames from a video file into one preallocated, contiguous array.
+
+    The number and shape of the frames are read from the container first, so a single uint8 array is allocated
+    and every frame is decoded straight into it. If the container reports more frames than can be decoded, the
+    array is trimmed; if it reports fewer, the extra frames are dropped.
+
+    Args:
+        file_path (str): The path to the video file.
+        stride (int, optional): Keep every `stride`-th frame, counted after `target_fps` sampling. Defaults to 1.
+        target_fps (float, optional): Sample frames at this rate. Videos with a lower frame rate keep every frame.
+        start_time (float, optional): Seek to this time in seconds before reading. Defaults to the start.
+        end_time (float, optional): Stop before the frame at this time in seconds. Defaults to the end.
+        size (Tuple[int, int], optional): Resize frames to `(width, height)`.
+        grayscale (bool, optional): If True, convert frames to single-channel grayscale. Defaults to False.
+        memmap_path (str, optional): If given, back the array by a `.npy` file at this path, opened as a
+            memory map. The file keeps the preallocated length when the array is trimmed.
+        backend (str, optional): Decoder to use, either "opencv" or "ffmpeg", as in `iter_frames`.
+            Defaults to "opencv".
+        threads (int, optional): Number of ffmpeg decoding threads, or 0 to choose automatically. Only used by
+            the "ffmpeg" backend. Defaults to 0.
+
+    Returns:
+        Tuple[np.ndarray, float]: A tuple containing the frames of shape `(num_frames, height, width, 3)`,
+            or `(num_frames, height, width)` in grayscale, and the frames per second (fps) of the sampled frames.
+    """
+    with _open_video(file_path, backend, threads) as (fps, num_frames, frame_size, read_frames):
+        num_frames = _num_sampled_frames(num_frames, fps, stride, target_fps, start_time, end_time)
+        width, height = size if size is not None else frame_size
+        shape: Tuple[int, ...] = (num_frames, height, width) if grayscale else (num_frames, height, width, 3)
+        if memmap_path is not None:
+            frames = np.lib.format.open_memmap(memmap_path, mode="w+", dtype=np.uint8, shape=shape)
+        else:
+            frames = np.empty(shape, dtype=np.uint8)
+
+        frame_iter = read_frames(stride, target_fps, start_time, end_time, size, grayscale, frames)
+        num_decoded = sum(1 for _ in frame_iter)
+    return frames[:num_decoded], _sampled_fps(fps, stride, target_fps)
+
+
+TRANSIENT_ERRORS = (
+    "Resource temporarily unavailable",
+    "Cannot allocate memory",
+    "Too many open files",
+    "Connection reset",
+    "timed out",
+)
+TRANSIENT_ERRNOS = (errno.EAGAIN, errno.EMFILE, errno.ENOMEM, errno.EINTR, errno.EBUSY)
+
+
+def _conversion_stream(src_file: str, dst_file: str, target_fps: float, threads: Optional[int] = None) -> Any:
+    thread_kwargs = {"threads": threads} if threads is not None else {}
+    input_vid = ffmpeg.input(src_file, **thread_kwargs)
+
+    audio = input_vid.audio
+    video = input_vid.video.filter("fps", target_fps)
+    return ffmpeg.output(video, audio, dst_file, acodec="aac", max_muxing_queue_size=1024, **thread_kwargs)
 
 
 def convert_video(src_file: str, dst_file: str, target_fps: int) -> None:
@@ -57,20 +389,153 @@ def convert_video(src_file: str, dst_file: str, target_fps: int) -> None:
         src_file (str): Path to the source video file.
         dst_file (str): Path to the output video file.
         target_fps (int): The target frames per second for the output video.
-    """
-    input_vid = ffmpeg.input(src_file)
 
-    audio = input_vid.audio
-    video = input_vid.video.filter("fps", target_fps)
+    Raises:
+        ffmpeg.Error: If ffmpeg fails. The error message is available in its `stderr` attribute.
+    """
+    add_ffmpeg_paths()
     (
-        ffmpeg.output(
-            video,
-            audio,
-            dst_file,
-            acodec="aac",
-            loglevel="quiet",
-            max_muxing_queue_size=1024,
-        )
+        _conversion_stream(src_file, dst_file, target_fps)
+        .global_args("-loglevel", "error")
         .overwrite_output()
-        .run()
+        .run(capture_stdout=True, capture_stderr=True)
     )
+
+
+def _run_conversion(stream_spec: Any, progress_callback: Optional[Callable[[Dict[str, str]], None]] = None) -> float:
+    # run ffmpeg with machine-readable progress reports on stdout, and return the converted duration in seconds
+    add_ffmpeg_paths()
+    args = stream_spec.global_args("-nostdin", "-loglevel", "error", "-nostats", "-progress", "pipe:1").compile()
+    duration = 0.0
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=stderr)
+        progress: Dict[str, str] = {}
+        for line in cast(IO[bytes], process.stdout):
+            key, _, value = line.decode(errors="replace").strip().partition("=")
+            progress[key] = value
+            if key != "progress":
+                continue
+            # each report is a block of key=value lines terminated by progress=continue or progress=end
+            if progress.get("out_time_us", "N/A") != "N/A":
+                duration = max(int(progress["out_time_us"]), 0) / 1e6
+            if progress_callback is not None:
+                progress_callback(progress)
+            progress = {}
+        cast(IO[bytes], process.stdout).close()
+        if process.wait() != 0:
+            stderr.seek(0)
+            message = stderr.read()
+            if process.returncode < 0:
+                message += f"ffmpeg was killed by signal {-process.returncode}".encode()
+            raise ffmpeg.Error("ffmpeg", None, message)
+    return duration
+
+
+def _is_transient(error: Exception) -> bool:
+    # resource exhaustion and killed processes may succeed on a retry, while invalid inputs fail again
+    if isinstance(error, OSError):
+        return error.errno in TRANSIENT_ERRNOS
+    if isinstance(error, ffmpeg.Error):
+        message = (error.stderr or b"").decode(errors="replace")
+        return "killed by signal" in message or any(pattern in message for pattern in TRANSIENT_ERRORS)
+    return False
+
+
+def _convert_video_job(
+    src_file: str,
+    dst_file: str,
+    target_fps: float,
+    threads: int,
+    max_retries: int,
+    retry_delay: float,
+    progress_callback: Optional[Callable[[str, Dict[str, str]], None]],
+    skip_mode: Optional[str],
+    recorded_digest: Optional[str],
+) -> JobResult:
+    start = time.perf_counter()
+    attempts = 0
+    try:
+        skip, src_digest = check_skip(src_file, dst_file, skip_mode, recorded_digest)
+        if skip:
+            return JobResult(src_file, dst_file, "skipped", src_digest=src_digest)
+
+        os.makedirs(os.path.dirname(os.path.abspath(dst_file)), exist_ok=True)
+        tmp_file = partial_path(dst_file)
+        callback = partial(progress_callback, src_file) if progress_callback is not None else None
+        while True:
+            attempts += 1
+            try:
+                stream_spec = _conversion_stream(src_file, tmp_file, target_fps, threads).overwrite_output()
+                duration = _run_conversion(stream_spec, callback)
+                os.replace(tmp_file, dst_file)
+                break
+            except Exception as e:
+                if attempts > max_retries or not _is_transient(e):
+                    raise
+                time.sleep(retry_delay * 2 ** (attempts - 1))
+            finally:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
+        elapsed = time.perf_counter() - start
+        return JobResult(src_file, dst_file, "converted", duration, elapsed, src_digest=src_digest, attempts=attempts)
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        if isinstance(e, ffmpeg.Error) and e.stderr:
+            message = e.stderr.decode(errors="replace").strip()
+        else:
+            message = str(e)
+        error = f"{type(e).__name__}: {message}"
+        return JobResult(src_file, dst_file, "failed", elapsed=elapsed, error=error, attempts=attempts)
+
+
+def convert_video_batch(
+    src_files: Sequence[str],
+    dst_files: Sequence[str],
+    target_fps: float,
+    cpu_budget: Optional[int] = None,
+    threads_per_job: int = 2,
+    skip_mode: Optional[str] = "mtime",
+    manifest_path: Optional[str] = None,
+    max_retries: int = 2,
+    retry_delay: float = 1.0,
+    progress_callback: Optional[Callable[[str, Dict[str, str]], None]] = None,
+) -> BatchReport:
+    """
+    Convert many videos to a different frame rate, running several ffmpeg processes concurrently.
+
+    The number of concurrent ffmpeg processes is the CPU budget divided by the threads given to each process.
+    Outputs are written to a temporary file and then moved into place, so an interrupted run can be resumed by
+    calling the function again with the same arguments. Failures caused by resource exhaustion or a killed
+    process are retried with exponential backoff, and other failures are recorded in the report with ffmpeg's
+    error message without aborting the rest of the batch.
+
+    Args:
+        src_files (Sequence[str]): Paths to the source video files.
+        dst_files (Sequence[str]): Paths to the output video files, one for each source file.
+        target_fps (float): The target frames per second for the output videos.
+        cpu_budget (int, optional): Number of CPUs the batch may use. Defaults to the number of CPUs.
+        threads_per_job (int, optional): Number of threads of each ffmpeg process. Defaults to 2.
+        skip_mode (str, optional): How to detect outputs that are already up to date and can be skipped.
+            "mtime" skips non-empty outputs that are newer than their sources, unless the manifest records them
+            with other conversion parameters, "hash" skips outputs whose source content hash and conversion
+            parameters match the manifest, and None converts every file. Defaults to "mtime".
+        manifest_path (str, optional): Path to a JSON lines manifest recording completed conversions.
+            Required when `skip_mode` is "hash".
+        max_retries (int, optional): Maximum number of retries of a transient failure. Defaults to 2.
+        retry_delay (float, optional): Delay in seconds before the first retry, doubled on every further retry.
+            Defaults to 1 second.
+        progress_callback (Callable[[str, Dict[str, str]], None], optional): Called from worker threads with the
+            source path and each ffmpeg progress report, e.g. `{"frame": "120", "out_time_us": "4000000",
+            "speed": "3.1x", "progress": "continue"}`.
+
+    Returns:
+        BatchReport: Per-file results in the order of `src_files` and the aggregate throughput, where the media
+            throughput is measured in seconds of converted video per second.
+    """
+    if threads_per_job < 1:
+        raise ValueError("threads_per_job must be a positive integer")
+    num_workers = max((cpu_budget or os.cpu_count() or 1) // threads_per_job, 1)
+    params = {"target_fps": target_fps}
+    job_args = (target_fps, threads_per_job, max_retries, retry_delay, progress_callback)
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        return run_batch(executor, _convert_video_job, src_files, dst_files, job_args, params, skip_mode, manifest_path)
@@ -1 +1,8 @@
-from . import git, hamd_7, io_utils, plots, wandb_utils
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+if TYPE_CHECKING:
+    from . import aws, git, hamd_7, io_utils, plots, wandb_utils
+
+__getattr__, __dir__, __all__ = attach(__name__, ["aws", "git", "hamd_7", "io_utils", "plots", "wandb_utils"])
@@ -0,0 +1,71 @@
+"""
+Measure the throughput and latency of `BatchingFeatureExtractor` under concurrent single-text requests.
+
+A number of concurrent clients each send their texts one at a time, as request handlers of a web app would. Each
+configuration reports the throughput in texts per second, the mean batch size and the p50 and p99 request latency.
+
+Usage:
+    python benchmarks/batching_server.py [--model cross-encoder/ms-marco-TinyBERT-L-2-v2] [--clients 64]
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from feature_extraction import random_texts
+
+from aimet_ml.features.textual.batching import BatchingFeatureExtractor, BatchingMetrics
+from aimet_ml.features.textual.transformers import TransformerFeatureExtractor
+
+
+async def serve(batching: BatchingFeatureExtractor, texts: List[str], num_clients: int) -> BatchingMetrics:
+    """
+    Send the texts from concurrent clients and wait for all features.
+
+    Args:
+        batching (BatchingFeatureExtractor): The batching front end.
+        texts (List[str]): The texts, split evenly between the clients.
+        num_clients (int): Number of concurrent clients.
+
+    Returns:
+        BatchingMetrics: The statistics after all requests.
+    """
+
+    async def client(client_texts: List[str]) -> None:
+        for text in client_texts:
+            await batching.extract(text)
+
+    async with batching:
+        await asyncio.gather(*(client(texts[i::num_clients]) for i in range(num_clients)))
+        return batching.metrics()
+
+
+def main():
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="cross-encoder/ms-marco-TinyBERT-L-2-v2", help="model name or path")
+    parser.add_argument("--num-texts", type=int, default=2000, help="number of sentences")
+    parser.add_argument("--num-emb-layers", type=int, default=2, help="number of last layers summed")
+    parser.add_argument("--clients", type=int, default=64, help="number of concurrent clients")
+    parser.add_argument("--max-batch-sizes", type=int, nargs="+", default=[1, 8, 32], help="batch sizes to measure")
+    parser.add_argument("--max-wait", type=float, default=0.005, help="maximum batching delay in seconds")
+    args = parser.parse_args()
+
+    extractor = TransformerFeatureExtractor(args.model, args.num_emb_layers, max_length=128, device="cpu")
+    texts = random_texts(args.num_texts)
+    extractor.extract_features(texts[:32])
+
+    print(f"{'max_batch':>9} {'texts/s':>10} {'mean_batch':>10} {'p50_ms':>8} {'p99_ms':>8}")
+    for max_batch_size in args.max_batch_sizes:
+        batching = BatchingFeatureExtractor(extractor, max_batch_size=max_batch_size, max_wait=args.max_wait)
+        start = time.perf_counter()
+        metrics = asyncio.run(serve(batching, texts, args.clients))
+        seconds = time.perf_counter() - start
+        print(
+            f"{max_batch_size:>9} {len(texts) / seconds:>10.0f} {metrics.mean_batch_size:>10.1f} "
+            f"{metrics.latency_p50 * 1000:>8.1f} {metrics.latency_p99 * 1000:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Compare the vectorized `clean_repeated_tokens` with the original quadratic-scan implementation.
+
+The inputs imitate ASR hallucination loops: a short prefix followed by a phrase repeated until the hypothesis
+reaches the requested length. The original implementation is skipped for inputs longer than `--max-reference`.
+
+Usage:
+    python benchmarks/clean_repeated_tokens.py [--lengths 250 1000 4000] [--repeat 3]
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from aimet_ml.processing.text import clean_repeated_tokens
+
+
+def reference_clean_repeated_tokens(tokens: List[str]) -> List[str]:
+    """
+    Remove sequences of repeated tokens with the original quadratic-scan implementation.
+
+    Args:
+        tokens (list[str]): List of tokens to clean.
+
+    Returns:
+        list[str]: List of tokens with repeated sequences removed.
+    """
+    tokens = tokens.copy()
+    sequence_size = len(tokens) // 2
+    while sequence_size > 0:
+        cur_idx = 0
+        while cur_idx < len(tokens) - sequence_size:
+            next_idx = cur_idx + sequence_size
+            cur_text = "".join(tokens[cur_idx : cur_idx + sequence_size])
+            next_text = "".join(tokens[next_idx : next_idx + sequence_size])
+            if cur_text == next_text:
+                tokens = tokens[: cur_idx + sequence_size] + tokens[next_idx + sequence_size :]
+            else:
+                cur_idx += 1
+        sequence_size -= 1
+    return tokens
+
+
+def looping_tokens(num_tokens: int, seed: int = 0) -> List[str]:
+    """
+    Build a token list that ends in a repeated phrase.
+
+    Args:
+        num_tokens (int): Number of tokens.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        List[str]: The tokens.
+    """
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(200)]
+    prefix = rng.choices(words, k=min(20, num_tokens))
+    phrase = rng.choices(words, k=7)
+    loop = phrase * (num_tokens // len(phrase) + 1)
+    return (prefix + loop)[:num_tokens]
+
+
+def measure(function: Callable[[List[str]], List[str]], tokens: List[str], repeat: int) -> float:
+    """
+    Time a cleaning function.
+
+    Args:
+        function (Callable[[List[str]], List[str]]): The function to time.
+        tokens (List[str]): The input tokens.
+        repeat (int): Number of runs.
+
+    Returns:
+        float: Seconds of the fastest run.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(tokens)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[250, 1000, 4000], help="numbers of tokens")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per input")
+    parser.add_argument("--max-reference", type=int, default=1000, help="longest input for the original version")
+    args = parser.parse_args()
+
+    print(f"{'tokens':>8} {'original_s':>11} {'vectorized_s':>13} {'speedup':>8}")
+    for num_tokens in args.lengths:
+        tokens = looping_tokens(num_tokens)
+        new_seconds = measure(clean_repeated_tokens, tokens, args.repeat)
+        if num_tokens <= args.max_reference:
+            assert clean_repeated_tokens(tokens) == reference_clean_repeated_tokens(tokens)
+            old_seconds = measure(reference_clean_repeated_tokens, tokens, args.repeat)
+            print(f"{num_tokens:>8} {old_seconds:>11.4f} {new_seconds:>13.4f} {old_seconds / new_seconds:>7.0f}x")
+        else:
+            print(f"{num_tokens:>8} {'-':>11} {new_seconds:>13.4f} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
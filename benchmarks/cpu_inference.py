@@ -0,0 +1,66 @@
+"""
+Compare the throughput and accuracy of the CPU inference modes of `TransformerFeatureExtractor`.
+
+Every mode extracts features for the same texts at each batch size, after one warm-up call that also builds
+compiled or traced graphs. The throughput is reported in texts per second together with the largest relative error
+of a feature vector against the float32 baseline.
+
+Usage:
+    python benchmarks/cpu_inference.py [--model cross-encoder/ms-marco-TinyBERT-L-2-v2] [--batch-sizes 1 8 32]
+"""
+import argparse
+import time
+
+from feature_extraction import random_texts
+
+from aimet_ml.features.textual.transformers import TransformerFeatureExtractor
+
+MODES = {
+    "baseline": {},
+    "inference_mode": {"inference_mode": True},
+    "int8": {"inference_mode": True, "quantize": True},
+    "bf16": {"inference_mode": True, "autocast_bf16": True},
+    "torchscript": {"jit": "torchscript"},
+    "compile": {"jit": "compile"},
+}
+
+
+def main():
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="cross-encoder/ms-marco-TinyBERT-L-2-v2", help="model name or path")
+    parser.add_argument("--num-texts", type=int, default=512, help="number of sentences")
+    parser.add_argument("--num-emb-layers", type=int, default=2, help="number of last layers summed")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32], help="batch sizes to measure")
+    parser.add_argument("--num-threads", type=int, default=None, help="intra-op CPU threads")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES), help="modes to measure")
+    args = parser.parse_args()
+
+    texts = random_texts(args.num_texts)
+    print(f"{'mode':<16} {'batch':>6} {'texts/s':>10} {'max_rel_err':>12}")
+    for batch_size in args.batch_sizes:
+        expected = TransformerFeatureExtractor(
+            args.model, args.num_emb_layers, max_length=128, device="cpu", batch_size=batch_size
+        ).extract_features(texts)
+        for mode in args.modes:
+            extractor = TransformerFeatureExtractor(
+                args.model,
+                args.num_emb_layers,
+                max_length=128,
+                device="cpu",
+                batch_size=batch_size,
+                num_threads=args.num_threads,
+                **MODES[mode],
+            )
+            extractor.extract_features(texts[:batch_size])
+
+            start = time.perf_counter()
+            features = extractor.extract_features(texts)
+            seconds = time.perf_counter() - start
+
+            error = ((features - expected).norm(dim=1) / expected.norm(dim=1)).max().item()
+            print(f"{mode:<16} {batch_size:>6} {len(texts) / seconds:>10.0f} {error:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Measure the tokenization and model costs of `TransformerFeatureExtractor.extract_features` separately.
+
+Tokenization is timed for the former per-text `tokenize` loop with `torch.cat` and for the batched `encode` call.
+The model cost is timed by passing the pre-tokenized batch to `extract_features`, so it excludes tokenization.
+
+Usage:
+    python benchmarks/feature_extraction.py [--model cross-encoder/ms-marco-TinyBERT-L-2-v2] [--num-texts 2000]
+"""
+import argparse
+import random
+import time
+
+import torch
+
+from aimet_ml.features.textual.transformers import TransformerFeatureExtractor
+
+WORDS = "the a an of to and in is was for on with as by at from this that it be are or not have we you they".split()
+
+
+def random_texts(num_texts: int, seed: int = 0) -> list:
+    """
+    Build sentences of random lengths.
+
+    Args:
+        num_texts (int): Number of sentences.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list: The sentences.
+    """
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(3, 60))) for _ in range(num_texts)]
+
+
+def main():
+    """Run the benchmark and print the seconds spent in each stage."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="cross-encoder/ms-marco-TinyBERT-L-2-v2", help="model name or path")
+    parser.add_argument("--num-texts", type=int, default=2000, help="number of sentences")
+    parser.add_argument("--num-emb-layers", type=int, default=2, help="number of last layers summed")
+    parser.add_argument("--batch-size", type=int, default=64, help="maximum number of texts per forward pass")
+    parser.add_argument("--device", default="cpu", help="device of the model")
+    args = parser.parse_args()
+
+    extractor = TransformerFeatureExtractor(
+        args.model, args.num_emb_layers, max_length=128, device=args.device, batch_size=args.batch_size
+    )
+    texts = random_texts(args.num_texts)
+
+    start = time.perf_counter()
+    tokenized = [extractor.tokenize(text) for text in texts]
+    torch.cat([output["input_ids"] for output in tokenized])
+    torch.cat([output["attention_mask"] for output in tokenized])
+    per_text_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encodings = extractor.encode(texts)
+    batched_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    extractor.extract_features(encodings)
+    model_seconds = time.perf_counter() - start
+
+    print(f"{'stage':<28} {'seconds':>8} {'texts/s':>10}")
+    for stage, seconds in [
+        ("tokenize per text", per_text_seconds),
+        ("tokenize batched", batched_seconds),
+        ("model (pre-tokenized)", model_seconds),
+    ]:
+        print(f"{stage:<28} {seconds:>8.3f} {len(texts) / seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
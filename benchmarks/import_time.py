@@ -0,0 +1,66 @@
+"""
+Measure the cold-start cost of importing aimet-ml modules.
+
+Each statement is executed in a fresh interpreter so that module caches do not hide the import cost.
+
+Usage:
+    python benchmarks/import_time.py [--repeat 5]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = [
+    "import aimet_ml",
+    "from aimet_ml.utils import io_utils",
+    "from aimet_ml.model_selection import split_dataset",
+    "from aimet_ml.processing import audio",
+    "from aimet_ml.processing import video",
+    "from aimet_ml.features.textual import transformers",
+]
+
+CODE = """
+import resource, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, len(sys.modules))
+"""
+
+
+def measure(statement: str, repeat: int) -> tuple:
+    """
+    Import a statement in fresh interpreters and report the median time, peak RSS and module count.
+
+    Args:
+        statement (str): The import statement to measure.
+        repeat (int): Number of fresh interpreters to run.
+
+    Returns:
+        tuple: Median seconds, median peak RSS in MB and the number of loaded modules.
+    """
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", CODE.format(statement=statement)], check=True, capture_output=True, text=True
+        ).stdout
+        runs.append([float(value) for value in output.split()])
+    seconds, rss_mb, num_modules = (statistics.median(values) for values in zip(*runs))
+    return seconds, rss_mb, int(num_modules)
+
+
+def main():
+    """Run the import-time benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="number of fresh interpreters per statement")
+    args = parser.parse_args()
+
+    print(f"{'statement':<55} {'seconds':>8} {'rss_mb':>8} {'modules':>8}")
+    for statement in STATEMENTS:
+        seconds, rss_mb, num_modules = measure(statement, args.repeat)
+        print(f"{statement:<55} {seconds:>8.3f} {rss_mb:>8.1f} {num_modules:>8d}")
+
+
+if __name__ == "__main__":
+    main()
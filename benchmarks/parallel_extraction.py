@@ -0,0 +1,63 @@
+"""
+Measure how the throughput of `ParallelFeatureExtractor` scales with the number of CPU worker processes.
+
+For every worker count from 1 to `--max-workers`, the CPUs are divided evenly between the workers, one warm-up
+call is made, and the throughput of extracting the features of all texts is reported in texts per second, together
+with the speedup over the single process `TransformerFeatureExtractor` using all CPUs.
+
+Usage:
+    python benchmarks/parallel_extraction.py [--model cross-encoder/ms-marco-TinyBERT-L-2-v2] [--max-workers 4]
+"""
+import argparse
+import os
+import time
+
+from feature_extraction import random_texts
+
+from aimet_ml.features.textual.parallel import ParallelFeatureExtractor
+from aimet_ml.features.textual.transformers import TransformerFeatureExtractor
+
+
+def main():
+    """Run the benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="cross-encoder/ms-marco-TinyBERT-L-2-v2", help="model name or path")
+    parser.add_argument("--num-texts", type=int, default=4000, help="number of sentences")
+    parser.add_argument("--num-emb-layers", type=int, default=2, help="number of last layers summed")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="largest number of workers")
+    parser.add_argument("--chunk-size", type=int, default=256, help="number of texts per task")
+    parser.add_argument("--pin-cores", action="store_true", help="bind every worker to its own CPUs")
+    args = parser.parse_args()
+
+    texts = random_texts(args.num_texts)
+    extractor = TransformerFeatureExtractor(
+        args.model, args.num_emb_layers, max_length=128, device="cpu", num_threads=os.cpu_count()
+    )
+    extractor.extract_features(texts[: args.chunk_size])
+    start = time.perf_counter()
+    extractor.extract_features(texts)
+    baseline = len(texts) / (time.perf_counter() - start)
+
+    print(f"{'workers':>7} {'threads':>7} {'texts/s':>10} {'speedup':>8}")
+    print(f"{'single':>7} {os.cpu_count():>7} {baseline:>10.0f} {1:>7.2f}x")
+    for num_workers in range(1, args.max_workers + 1):
+        with ParallelFeatureExtractor(
+            args.model,
+            num_workers,
+            pin_cores=args.pin_cores,
+            chunk_size=args.chunk_size,
+            num_emb_layers=args.num_emb_layers,
+            max_length=128,
+        ) as parallel_extractor:
+            parallel_extractor.extract_features(texts[: args.chunk_size * num_workers])
+            start = time.perf_counter()
+            parallel_extractor.extract_features(texts)
+            throughput = len(texts) / (time.perf_counter() - start)
+        print(
+            f"{num_workers:>7} {parallel_extractor.threads_per_worker:>7} {throughput:>10.0f} "
+            f"{throughput / baseline:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare the decoding throughput of the OpenCV and ffmpeg video backends.
+
+Every video is decoded in full with each backend and configuration, and the best of the repeated runs is reported
+in frames per second.
+
+Usage:
+    python benchmarks/video_backends.py [--repeat 3] [--threads 0] [videos ...]
+"""
+import argparse
+import glob
+import os
+import time
+
+from aimet_ml.processing.video import load_video_array
+
+VIDEO_DIR = os.path.join(os.path.dirname(__file__), "..", "aimet_ml", "resources", "videos")
+
+CONFIGS = {
+    "full": {},
+    "resize": {"size": (224, 224)},
+    "gray+resize": {"size": (224, 224), "grayscale": True},
+    "10fps": {"target_fps": 10},
+}
+
+
+def measure(file_path: str, repeat: int, **kwargs) -> float:
+    """
+    Decode a video several times and report the best throughput.
+
+    Args:
+        file_path (str): Path to the video file.
+        repeat (int): Number of runs.
+        **kwargs: Keyword arguments for `load_video_array`.
+
+    Returns:
+        float: Decoded frames per second of the fastest run.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frames, _ = load_video_array(file_path, **kwargs)
+        best = max(best, len(frames) / (time.perf_counter() - start))
+    return best
+
+
+def main():
+    """Run the backend benchmark and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", nargs="*", help="video files, defaults to the bundled sample videos")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per video and backend")
+    parser.add_argument("--threads", type=int, default=0, help="ffmpeg decoding threads, 0 for automatic")
+    args = parser.parse_args()
+
+    videos = args.videos or sorted(glob.glob(os.path.join(VIDEO_DIR, "*.mp4")))
+    print(f"{'video':<20} {'config':<12} {'opencv_fps':>11} {'ffmpeg_fps':>11} {'speedup':>8}")
+    for file_path in videos:
+        for name, kwargs in CONFIGS.items():
+            opencv_fps = measure(file_path, args.repeat, backend="opencv", **kwargs)
+            ffmpeg_fps = measure(file_path, args.repeat, backend="ffmpeg", threads=args.threads, **kwargs)
+            print(
+                f"{os.path.basename(file_path):<20} {name:<12} {opencv_fps:>11.1f} {ffmpeg_fps:>11.1f} "
+                f"{ffmpeg_fps / opencv_fps:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
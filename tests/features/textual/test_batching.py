@@ -0,0 +1,104 @@
+import asyncio
+from typing import List
+
+import pytest
+import torch
+
+from aimet_ml.features.textual.batching import BatchingFeatureExtractor
+from aimet_ml.features.textual.transformers import TransformerFeatureExtractor
+
+
+@pytest.fixture(scope="module")
+def feature_extractor() -> TransformerFeatureExtractor:
+    """Fixture providing a feature extractor on the CPU."""
+    return TransformerFeatureExtractor(
+        model_name="cross-encoder/ms-marco-TinyBERT-L-2-v2", num_emb_layers=2, max_length=128, device="cpu"
+    )
+
+
+def test_concurrent_requests_are_batched(feature_extractor: TransformerFeatureExtractor) -> None:
+    """Test that concurrent requests are grouped into batches and every caller gets its own features."""
+    texts = [f"Sentence number {i}." + " with more words" * (i % 4) for i in range(10)]
+    expected = feature_extractor.extract_features(texts)
+
+    async def run() -> List[torch.Tensor]:
+        async with BatchingFeatureExtractor(feature_extractor, max_batch_size=4, max_wait=0.05) as batching:
+            features = await asyncio.gather(*(batching.extract(text) for text in texts))
+            metrics = batching.metrics()
+        assert metrics.num_requests == len(texts)
+        assert metrics.batch_size_histogram == {2: 1, 4: 2}
+        assert metrics.mean_batch_size == pytest.approx(10 / 3)
+        assert metrics.queue_depth == 0
+        assert 0 < metrics.latency_p50 <= metrics.latency_p99
+        return features
+
+    features = asyncio.run(run())
+    assert torch.allclose(torch.stack(features), expected, atol=1e-5)
+
+
+def test_max_wait(feature_extractor: TransformerFeatureExtractor) -> None:
+    """Test that a batch is run after the maximum wait time even if it is not full."""
+
+    async def run() -> None:
+        batching = BatchingFeatureExtractor(feature_extractor, max_batch_size=32, max_wait=0.01)
+        first = await batching.extract("A sentence.")
+        second = await asyncio.wait_for(batching.extract("Another sentence."), timeout=5)
+        await batching.stop()
+
+        assert first.shape == second.shape == (feature_extractor.model.config.hidden_size,)
+        assert batching.metrics().batch_size_histogram == {1: 2}
+        with pytest.raises(RuntimeError, match="stopped"):
+            await batching.extract("Too late.")
+
+    asyncio.run(run())
+
+
+def test_requests_during_stop(feature_extractor: TransformerFeatureExtractor) -> None:
+    """Test that requests made while stopping are rejected and that unprocessed requests are failed."""
+
+    async def run() -> None:
+        batching = BatchingFeatureExtractor(feature_extractor, max_batch_size=2, max_wait=0.05)
+        pending = asyncio.ensure_future(batching.extract("A sentence."))
+        await asyncio.sleep(0)
+        stopping = asyncio.ensure_future(batching.stop())
+        await asyncio.sleep(0)
+
+        with pytest.raises(RuntimeError, match="stopped"):
+            await asyncio.wait_for(batching.extract("Too late."), timeout=5)
+        assert batching._queue is not None
+        late = asyncio.get_running_loop().create_future()
+        batching._queue.put_nowait(("Behind the sentinel.", late, 0.0))
+
+        await asyncio.wait_for(stopping, timeout=5)
+        assert (await pending).shape == (feature_extractor.model.config.hidden_size,)
+        with pytest.raises(RuntimeError, match="stopped"):
+            await asyncio.wait_for(late, timeout=5)
+
+    asyncio.run(run())
+
+
+def test_errors_are_returned_to_callers(feature_extractor: TransformerFeatureExtractor) -> None:
+    """Test that a failed batch raises in all of its callers and later batches still run."""
+
+    async def run() -> None:
+        async with BatchingFeatureExtractor(feature_extractor, max_batch_size=2, max_wait=0.05) as batching:
+            invalid_text: str = None  # type: ignore[assignment]
+            results = await asyncio.gather(
+                batching.extract("A sentence."), batching.extract(invalid_text), return_exceptions=True
+            )
+            assert all(isinstance(result, Exception) for result in results)
+            assert (await batching.extract("A sentence.")).shape == (feature_extractor.model.config.hidden_size,)
+
+    asyncio.run(run())
+
+
+def test_invalid_arguments(feature_extractor: TransformerFeatureExtractor) -> None:
+    """Test that invalid batching settings are rejected."""
+    with pytest.raises(ValueError, match="max_batch_size"):
+        BatchingFeatureExtractor(feature_extractor, max_batch_size=0)
+    with pytest.raises(ValueError, match="max_wait"):
+        BatchingFeatureExtractor(feature_extractor, max_wait=-1)
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from aimet_ml.features.textual.embedding_cache import EmbeddingCache, text_key
+
+
+@pytest.fixture
+def cache_dir(tmp_path) -> str:
+    """Fixture providing an empty cache directory."""
+    return str(tmp_path / "cache")
+
+
+def test_text_key() -> None:
+    """Test that text keys are stable and distinguish texts."""
+    assert text_key("hello") == text_key("hello")
+    assert text_key("hello") != text_key("hello ")
+    assert len(text_key("")) == 64
+
+
+def test_get_empty(cache_dir: str) -> None:
+    """Test lookups in an empty cache."""
+    cache = EmbeddingCache(cache_dir, {"model_name": "test"})
+    found, vectors = cache.get(["a", "b"])
+
+    assert found.tolist() == [False, False]
+    assert vectors is None
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize("dtype, atol", [("float32", 0.0), ("float16", 1e-3)])
+def test_put_get(cache_dir: str, dtype: str, atol: float) -> None:
+    """Test that stored vectors are returned as float32 and that existing keys are not overwritten."""
+    rng = np.random.default_rng(0)
+    vectors = rng.random((3, 8), dtype=np.float32)
+    cache = EmbeddingCache(cache_dir, {"model_name": "test"}, dtype=dtype)
+    cache.put(["a", "b", "c"], vectors)
+    cache.put(["b", "d"], np.ones((2, 8), dtype=np.float32))
+
+    found, result = cache.get(["d", "x", "b", "a"])
+    assert found.tolist() == [True, False, True, True]
+    assert result is not None and result.dtype == np.float32
+    assert np.allclose(result[[2, 3]], vectors[[1, 0]], atol=atol)
+    assert np.array_equal(result[0], np.ones(8))
+    assert np.array_equal(result[1], np.zeros(8))
+    assert cache.keys() == ["a", "b", "c", "d"]
+
+
+def test_shared_between_instances(cache_dir: str) -> None:
+    """Test that instances with the same namespace see each other's writes, and other namespaces do not."""
+    writer = EmbeddingCache(cache_dir, {"model_name": "test", "max_length": 128})
+    reader = EmbeddingCache(cache_dir, {"max_length": 128, "model_name": "test"}, dtype="float16")
+    other = EmbeddingCache(cache_dir, {"model_name": "test", "max_length": 64})
+
+    writer.put(["a"], np.full((1, 4), 0.5))
+    assert reader.get(["a"])[0].tolist() == [True]
+    writer.put(["b"], np.full((1, 4), 2.0))
+    found, vectors = reader.get(["b", "a"])
+    assert found.tolist() == [True, True]
+    assert vectors is not None and vectors.tolist() == [[2.0] * 4, [0.5] * 4]
+    assert reader.dtype == "float32"
+    assert len(other) == 0
+
+
+def test_partial_writes_are_ignored(cache_dir: str) -> None:
+    """Test that a partially written index line and vector left by a crashed writer are ignored and overwritten."""
+    cache = EmbeddingCache(cache_dir, {"model_name": "test"})
+    cache.put(["a"], np.ones((1, 4)))
+    with open(f"{cache.path}/vectors.bin", "ab") as f:
+        f.write(b"\x00" * 6)
+    with open(f"{cache.path}/index.txt", "a") as f:
+        f.write("b 1")
+
+    reader = EmbeddingCache(cache_dir, {"model_name": "test"})
+    assert reader.keys() == ["a"]
+    reader.put(["c"], np.full((1, 4), 3.0))
+    found, vectors = EmbeddingCache(cache_dir, {"model_name": "test"}).get(["a", "b", "c"])
+    assert found.tolist() == [True, False, True]
+    assert vectors is not None and vectors[2].tolist() == [3.0] * 4
+
+
+def test_invalid_dtype(cache_dir: str) -> None:
+    """Test that unsupported storage dtypes are rejected."""
+    with pytest.raises(ValueError, match="Unsupported dtype"):
+        EmbeddingCache(cache_dir, {"model_name": "test"}, dtype="int8")
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,117 @@
+import os
+from typing import Iterator, List
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from aimet_ml.features.textual.embedding_shards import load_embedding_shards, read_manifest, write_embedding_shards
+from aimet_ml.features.textual.transformers import TransformerFeatureExtractor
+
+
+@pytest.fixture(scope="module")
+def feature_extractor() -> TransformerFeatureExtractor:
+    """Fixture providing a feature extractor on the CPU."""
+    return TransformerFeatureExtractor(
+        model_name="cross-encoder/ms-marco-TinyBERT-L-2-v2",
+        num_emb_layers=2,
+        max_length=128,
+        device="cpu",
+        batch_size=4,
+    )
+
+
+@pytest.fixture
+def texts() -> List[str]:
+    """Fixture providing texts of varying lengths."""
+    return [f"Sentence number {i}." + " with more words" * (i % 5) for i in range(23)]
+
+
+def test_iter_features(feature_extractor: TransformerFeatureExtractor, texts: List[str]) -> None:
+    """Test that chunked extraction gives the same features as one call."""
+    chunks = list(feature_extractor.iter_features(iter(texts), chunk_size=10))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 3]
+    assert torch.allclose(torch.cat(chunks), feature_extractor.extract_features(texts), atol=1e-5)
+    with pytest.raises(ValueError, match="chunk_size"):
+        next(feature_extractor.iter_features(texts, chunk_size=0))
+
+
+def test_write_embedding_shards(feature_extractor: TransformerFeatureExtractor, texts: List[str], tmp_path) -> None:
+    """Test that shards hold the features of all texts in input order."""
+    output_dir = str(tmp_path / "shards")
+    manifest = write_embedding_shards(feature_extractor, pd.Series(texts), output_dir, shard_size=10, chunk_size=4)
+
+    assert manifest["complete"]
+    assert manifest["num_rows"] == len(texts)
+    assert [shard["num_rows"] for shard in manifest["shards"]] == [10, 10, 3]
+    assert read_manifest(output_dir) == manifest
+    assert sorted(os.listdir(output_dir)) == ["manifest.json", "shard-00000.npy", "shard-00001.npy", "shard-00002.npy"]
+
+    shards = load_embedding_shards(output_dir)
+    expected = feature_extractor.extract_features(texts).numpy()
+    assert np.allclose(np.concatenate(shards), expected, atol=1e-5)
+
+
+def test_write_embedding_shards_resume(
+    feature_extractor: TransformerFeatureExtractor, texts: List[str], tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that an interrupted run continues after the last complete shard."""
+    output_dir = str(tmp_path / "shards")
+
+    def interrupted(limit: int) -> Iterator[str]:
+        yield from texts[:limit]
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        write_embedding_shards(feature_extractor, interrupted(15), output_dir, shard_size=10, chunk_size=5)
+    manifest = read_manifest(output_dir)
+    assert not manifest["complete"]
+    assert manifest["num_rows"] == 10
+
+    extracted: List[int] = []
+    extract_features = feature_extractor.extract_features
+
+    def counting_extract_features(chunk: List[str]) -> torch.Tensor:
+        extracted.append(len(chunk))
+        return extract_features(chunk)
+
+    monkeypatch.setattr(feature_extractor, "extract_features", counting_extract_features)
+    manifest = write_embedding_shards(feature_extractor, texts, output_dir, shard_size=10, chunk_size=5)
+    assert sum(extracted) == len(texts) - 10
+    assert write_embedding_shards(feature_extractor, texts, output_dir, shard_size=10) == manifest
+    assert sum(extracted) == len(texts) - 10
+    monkeypatch.undo()
+
+    expected = feature_extractor.extract_features(texts).numpy()
+    assert np.allclose(np.concatenate(load_embedding_shards(output_dir, mmap=False)), expected, atol=1e-5)
+
+
+def test_write_embedding_shards_float16(
+    feature_extractor: TransformerFeatureExtractor, texts: List[str], tmp_path
+) -> None:
+    """Test that shards can be stored as float16."""
+    output_dir = str(tmp_path / "shards")
+    write_embedding_shards(feature_extractor, texts, output_dir, shard_size=100, dtype="float16")
+    (shard,) = load_embedding_shards(output_dir)
+
+    assert shard.dtype == np.float16
+    assert np.allclose(shard, feature_extractor.extract_features(texts).numpy(), atol=1e-2)
+
+
+def test_write_embedding_shards_other_settings(
+    feature_extractor: TransformerFeatureExtractor, texts: List[str], tmp_path
+) -> None:
+    """Test that a shard directory cannot be resumed with other settings."""
+    output_dir = str(tmp_path / "shards")
+    write_embedding_shards(feature_extractor, texts[:3], output_dir, shard_size=10)
+
+    with pytest.raises(ValueError, match="other settings"):
+        write_embedding_shards(feature_extractor, texts[:3], output_dir, shard_size=5)
+    with pytest.raises(ValueError, match="Unsupported dtype"):
+        write_embedding_shards(feature_extractor, texts[:3], output_dir, dtype="int8")
+
+
+if __name__ == "__main__":
+    pytest.main()
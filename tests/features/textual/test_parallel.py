@@ -0,0 +1,71 @@
+import pytest
+import torch
+
+from aimet_ml.features.textual.parallel import ParallelFeatureExtractor
+from aimet_ml.features.textual.transformers import TransformerFeatureExtractor
+
+MODEL_NAME = "cross-encoder/ms-marco-TinyBERT-L-2-v2"
+
+
+@pytest.fixture(scope="module")
+def parallel_extractor():
+    """Fixture providing a parallel feature extractor with two workers, stopped after the tests."""
+    with ParallelFeatureExtractor(
+        MODEL_NAME, num_workers=2, chunk_size=3, num_emb_layers=2, max_length=128
+    ) as extractor:
+        yield extractor
+
+
+def test_extract_features(parallel_extractor: ParallelFeatureExtractor) -> None:
+    """Test that the workers return the same features as one extractor, in input order."""
+    texts = [f"Sentence number {i}." + " with more words" * (i % 4) for i in range(11)]
+    expected = TransformerFeatureExtractor(MODEL_NAME, num_emb_layers=2, max_length=128, device="cpu").extract_features(
+        texts
+    )
+
+    features = parallel_extractor.extract_features(texts)
+    assert features.shape == expected.shape
+    assert torch.allclose(features, expected, atol=1e-5)
+    assert torch.allclose(parallel_extractor.extract_features(texts[4]), expected[4:5], atol=1e-5)
+    assert parallel_extractor.extract_features([]).shape == (0, expected.shape[1])
+
+
+def test_worker_errors(parallel_extractor: ParallelFeatureExtractor) -> None:
+    """Test that errors raised in a worker are reported and leave the workers usable."""
+    with pytest.raises(RuntimeError, match="failed"):
+        parallel_extractor.extract_features(["A sentence.", None, "Another sentence."] * 2)  # type: ignore[list-item]
+    assert parallel_extractor.extract_features(["A sentence."]).shape == (1, parallel_extractor.dim)
+
+
+def test_closed_extractor() -> None:
+    """Test that a closed extractor, or one whose worker died, raises instead of waiting for results."""
+    parallel_extractor = ParallelFeatureExtractor(MODEL_NAME, num_workers=1, num_emb_layers=2, max_length=128)
+    parallel_extractor.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        parallel_extractor.extract_features(["A sentence."])
+
+    parallel_extractor = ParallelFeatureExtractor(MODEL_NAME, num_workers=1, num_emb_layers=2, max_length=128)
+    parallel_extractor._processes[0].kill()
+    parallel_extractor._processes[0].join()
+    with pytest.raises(RuntimeError, match="exited unexpectedly"):
+        parallel_extractor.extract_features(["A sentence."])
+    with pytest.raises(RuntimeError, match="closed"):
+        parallel_extractor.extract_features(["A sentence."])
+
+
+def test_invalid_arguments() -> None:
+    """Test that invalid worker settings are rejected before starting workers."""
+    with pytest.raises(ValueError, match="positive"):
+        ParallelFeatureExtractor(MODEL_NAME, num_workers=0)
+    with pytest.raises(ValueError, match="device"):
+        ParallelFeatureExtractor(MODEL_NAME, num_workers=1, device="cuda:0")
+
+
+def test_worker_start_failure() -> None:
+    """Test that a model that cannot be loaded is reported."""
+    with pytest.raises(RuntimeError, match="failed to start"):
+        ParallelFeatureExtractor(MODEL_NAME, num_workers=1, pooling="sum")
+
+
+if __name__ == "__main__":
+    pytest.main()
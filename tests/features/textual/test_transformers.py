@@ -1,7 +1,13 @@
+import gc
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
 import pytest
 import torch
+import transformers
 
-from aimet_ml.features.textual.transformers import TransformerFeatureExtractor
+from aimet_ml.features.textual.transformers import TransformerFeatureExtractor, _LayerPooling, load_model
 
 
 @pytest.fixture
@@ -95,5 +101,386 @@ def test_extract_single_text(feature_extractor: TransformerFeatureExtractor) ->
     )
 
 
+@pytest.mark.parametrize("batch_size, max_tokens", [(32, None), (2, None), (4, 40)])
+def test_extract_features_bucketing(
+    feature_extractor: TransformerFeatureExtractor, batch_size: int, max_tokens: Optional[int]
+) -> None:
+    """
+    Test that length-bucketed batches give the same features, in input order, as one batch padded to max_length.
+
+    Args:
+        feature_extractor (TransformerFeatureExtractor): The feature extractor instance for testing.
+        batch_size (int): Maximum number of texts per forward pass.
+        max_tokens (int, optional): Maximum number of padded tokens per forward pass.
+    """
+    texts = ["A short one.", "A much longer sentence " * 6, "", "Medium length sentence here.", "Two words"]
+    tokenized = [feature_extractor.tokenize(text) for text in texts]
+    with torch.no_grad():
+        hidden_states = feature_extractor.model(
+            torch.cat([output["input_ids"] for output in tokenized]).to(feature_extractor.model.device),
+            attention_mask=torch.cat([output["attention_mask"] for output in tokenized]).to(
+                feature_extractor.model.device
+            ),
+            output_hidden_states=True,
+        )["hidden_states"]
+    expected = sum(hidden_states[-i][:, 0, :] for i in range(1, feature_extractor.num_emb_layers + 1)).cpu()
+
+    feature_extractor.batch_size = batch_size
+    feature_extractor.max_tokens = max_tokens
+    features = feature_extractor.extract_features(texts)
+    assert torch.allclose(features, expected, atol=1e-5)
+
+
+def test_extract_features_pre_tokenized(feature_extractor: TransformerFeatureExtractor) -> None:
+    """
+    Test that pre-tokenized input gives the same features as raw texts.
+
+    Args:
+        feature_extractor (TransformerFeatureExtractor): The feature extractor instance for testing.
+    """
+    texts = ["This is sentence 1.", "Another, slightly longer sentence here.", "Short"]
+    features = feature_extractor.extract_features(texts)
+
+    encodings = feature_extractor.encode(texts)
+    assert [len(input_ids) for input_ids in encodings["input_ids"]] == [
+        int(feature_extractor.tokenize(text)["attention_mask"].sum()) for text in texts
+    ]
+    assert torch.equal(feature_extractor.extract_features(encodings), features)
+
+    padded = feature_extractor.tokenizer(texts, padding=True, return_tensors="pt")
+    assert torch.allclose(feature_extractor.extract_features(dict(padded)), features, atol=1e-6)
+
+
+def test_extract_features_empty(feature_extractor: TransformerFeatureExtractor) -> None:
+    """
+    Test extract_features with an empty list of texts.
+
+    Args:
+        feature_extractor (TransformerFeatureExtractor): The feature extractor instance for testing.
+    """
+    features = feature_extractor.extract_features([])
+    assert features.shape == (0, feature_extractor.model.config.hidden_size)
+
+
+@pytest.mark.parametrize("cache_dtype, atol", [("float32", 0.0), ("float16", 1e-2)])
+def test_extract_features_cache(
+    feature_extractor: TransformerFeatureExtractor,
+    tmp_path,
+    monkeypatch: pytest.MonkeyPatch,
+    cache_dtype: str,
+    atol: float,
+) -> None:
+    """
+    Test that cached features are served without loading the model and that only misses are computed.
+
+    Args:
+        feature_extractor (TransformerFeatureExtractor): The feature extractor instance for testing.
+        tmp_path: Temporary directory of the cache.
+        monkeypatch (pytest.MonkeyPatch): Fixture used to make model loading fail.
+        cache_dtype (str): Storage dtype of the cache.
+        atol (float): Tolerance of the cached features.
+    """
+    texts = ["This is sentence 1.", "Another sentence here.", "This is sentence 1."]
+    expected = feature_extractor.extract_features(texts + ["A new sentence."])
+    kwargs: Dict[str, Any] = {
+        "model_name": "cross-encoder/ms-marco-TinyBERT-L-2-v2",
+        "num_emb_layers": 2,
+        "max_length": 128,
+        "device": "cpu",
+        "cache_dir": str(tmp_path),
+        "cache_dtype": cache_dtype,
+        "share_model": False,
+    }
+
+    cached_extractor = TransformerFeatureExtractor(**kwargs)
+    assert torch.allclose(cached_extractor.extract_features(texts), expected[:3].cpu(), atol=1e-5)
+    assert cached_extractor.cache is not None and len(cached_extractor.cache) == 2
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the model must not be loaded")
+
+    monkeypatch.setattr(transformers.AutoModel, "from_pretrained", fail)
+    features = TransformerFeatureExtractor(**kwargs).extract_features(texts[::-1])
+    assert features.dtype == torch.float32
+    assert torch.allclose(features, expected[:3].flip(0).cpu(), atol=atol + 1e-5)
+
+    monkeypatch.undo()
+    features = TransformerFeatureExtractor(**kwargs).extract_features(["A new sentence.", texts[1]])
+    assert torch.allclose(features, expected[[3, 1]].cpu(), atol=atol + 1e-5)
+    assert len(cached_extractor.cache) == 3
+
+    other_extractor = TransformerFeatureExtractor(**{**kwargs, "num_emb_layers": 1})
+    assert other_extractor.cache is not None and len(other_extractor.cache) == 0
+
+
+@pytest.mark.parametrize(
+    "options, rtol",
+    [
+        ({"inference_mode": True}, 1e-6),
+        ({"num_threads": 1}, 1e-5),
+        ({"jit": "torchscript"}, 1e-5),
+        ({"jit": "compile"}, 1e-4),
+        ({"quantize": True}, 5e-2),
+        ({"autocast_bf16": True}, 5e-2),
+        ({"inference_mode": True, "quantize": True, "jit": "torchscript"}, 5e-2),
+    ],
+)
+def test_inference_modes(options: Dict[str, Any], rtol: float) -> None:
+    """
+    Test that the CPU inference modes stay within a relative tolerance of the float32 baseline.
+
+    Args:
+        options (Dict[str, Any]): Inference mode options of the feature extractor.
+        rtol (float): Maximum relative error of each feature vector.
+    """
+    texts = ["This is sentence 1.", "Another, slightly longer sentence here.", "Short", "A much longer one " * 8]
+    kwargs: Dict[str, Any] = {
+        "model_name": "cross-encoder/ms-marco-TinyBERT-L-2-v2",
+        "num_emb_layers": 2,
+        "max_length": 128,
+        "device": "cpu",
+        "batch_size": 2,
+    }
+    expected = TransformerFeatureExtractor(**kwargs).extract_features(texts)
+
+    num_threads = torch.get_num_threads()
+    try:
+        feature_extractor = TransformerFeatureExtractor(**kwargs, **options)
+        features = feature_extractor.extract_features(texts)
+        features_again = feature_extractor.extract_features(texts[::-1])
+    finally:
+        torch.set_num_threads(num_threads)
+
+    assert features.dtype == torch.float32
+    assert torch.equal(features_again, features.flip(0))
+    errors = (features - expected).norm(dim=1) / expected.norm(dim=1)
+    assert errors.max() <= rtol
+
+
+def test_invalid_inference_options() -> None:
+    """Test that unknown jit modes are rejected."""
+    with pytest.raises(ValueError, match="Invalid jit mode"):
+        TransformerFeatureExtractor("cross-encoder/ms-marco-TinyBERT-L-2-v2", device="cpu", jit="onnx")
+
+
+@pytest.mark.parametrize("pooling", ["cls", "mean", "max"])
+@pytest.mark.parametrize("layers", [None, [0, -1], [1], [-1, -1]])
+def test_pooling(feature_extractor: TransformerFeatureExtractor, pooling: str, layers: Optional[List[int]]) -> None:
+    """
+    Test the pooling strategies over selected layers against pooling all hidden states of the model.
+
+    Args:
+        feature_extractor (TransformerFeatureExtractor): The feature extractor instance for testing.
+        pooling (str): Pooling strategy.
+        layers (List[int], optional): Indices of the pooled hidden states.
+    """
+    texts = ["A short one.", "A much longer sentence " * 6, "Medium length sentence here."]
+    padded = feature_extractor.tokenizer(texts, padding=True, return_tensors="pt").to(feature_extractor.model.device)
+    with torch.no_grad():
+        hidden_states = feature_extractor.model(**padded, output_hidden_states=True)["hidden_states"]
+    mask = padded["attention_mask"].unsqueeze(-1).bool()
+    pooled = []
+    for layer in layers or [-1, -2]:
+        if pooling == "cls":
+            pooled.append(hidden_states[layer][:, 0])
+        elif pooling == "mean":
+            pooled.append((hidden_states[layer] * mask).sum(dim=1) / mask.sum(dim=1))
+        else:
+            pooled.append(hidden_states[layer].masked_fill(~mask, float("-inf")).max(dim=1).values)
+    expected = torch.stack(pooled).sum(dim=0)
+
+    pooling_extractor = TransformerFeatureExtractor(
+        model_name="cross-encoder/ms-marco-TinyBERT-L-2-v2",
+        num_emb_layers=2,
+        max_length=128,
+        device="cpu",
+        batch_size=2,
+        pooling=pooling,
+        layers=layers,
+    )
+    features = pooling_extractor.extract_features(texts)
+    assert torch.allclose(features, expected.cpu(), atol=1e-5)
+
+
+def test_pooling_skips_unused_layers() -> None:
+    """Test that the layers after the deepest selected one are not run."""
+    feature_extractor = TransformerFeatureExtractor(
+        model_name="cross-encoder/ms-marco-TinyBERT-L-2-v2", device="cpu", pooling="mean", layers=[1]
+    )
+    calls: List[int] = []
+    feature_extractor.model.encoder.layer[0].register_forward_pre_hook(lambda *args: calls.append(0))
+    feature_extractor.model.encoder.layer[-1].register_forward_pre_hook(lambda *args: calls.append(-1))
+    feature_extractor.model.pooler.register_forward_pre_hook(lambda *args: calls.append(-2))
+
+    feature_extractor.extract_features(["This is sentence 1.", "Another sentence here."])
+    assert calls == [0]
+
+    feature_extractor.model(**feature_extractor.tokenizer(["This is sentence 1."], return_tensors="pt"))
+    assert calls == [0, 0, -1, -2]
+
+
+def test_extract_features_from_threads() -> None:
+    """Test that one extractor can be called from several threads at once."""
+    feature_extractor = TransformerFeatureExtractor(
+        "cross-encoder/ms-marco-TinyBERT-L-2-v2", device="cpu", pooling="mean", layers=[1], batch_size=2
+    )
+    texts = [f"Sentence number {i}." + " with more words" * (i % 4) for i in range(8)]
+    expected = feature_extractor.extract_features(texts)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: feature_extractor.extract_features(texts), range(64)))
+    for features in results:
+        assert torch.allclose(features, expected, atol=1e-5)
+
+
+def test_pooling_hooks_do_not_accumulate() -> None:
+    """Test that extractors on one model add no hooks of their own and are freed once unused."""
+    model_name = "cross-encoder/ms-marco-TinyBERT-L-2-v2"
+    feature_extractor = TransformerFeatureExtractor(model_name, num_emb_layers=2, device="cpu")
+    feature_extractor.extract_features(["A sentence."])
+    layer = feature_extractor.model.encoder.layer[0]
+    num_hooks = len(layer._forward_hooks)
+
+    extractor_refs = []
+    for _ in range(20):
+        other_extractor = TransformerFeatureExtractor(model_name, layers=[1], pooling="max", device="cpu")
+        other_extractor.extract_features(["Another sentence."])
+        extractor_refs.append(weakref.ref(other_extractor))
+    del other_extractor
+    gc.collect()
+
+    assert len(layer._forward_hooks) == num_hooks
+    assert all(extractor_ref() is None for extractor_ref in extractor_refs)
+
+
+def test_invalid_pooling_options() -> None:
+    """Test that unknown pooling strategies and out of range layers are rejected."""
+    with pytest.raises(ValueError, match="Invalid pooling"):
+        TransformerFeatureExtractor("cross-encoder/ms-marco-TinyBERT-L-2-v2", device="cpu", pooling="sum")
+    with pytest.raises(ValueError, match="layers must not be empty"):
+        TransformerFeatureExtractor("cross-encoder/ms-marco-TinyBERT-L-2-v2", device="cpu", layers=[])
+
+    with pytest.raises(ValueError, match="hidden state indices"):
+        TransformerFeatureExtractor("cross-encoder/ms-marco-TinyBERT-L-2-v2", device="cpu", layers=[-1, 12])
+    with pytest.raises(ValueError, match="hidden state indices"):
+        TransformerFeatureExtractor("cross-encoder/ms-marco-TinyBERT-L-2-v2", device="cpu", num_emb_layers=13)
+
+
+def test_shared_models() -> None:
+    """Test that extractors loading the same model with the same settings share its weights."""
+    model_name = "cross-encoder/ms-marco-TinyBERT-L-2-v2"
+    first = TransformerFeatureExtractor(model_name, num_emb_layers=2, device="cpu")
+    second = TransformerFeatureExtractor(model_name, num_emb_layers=1, pooling="mean", device="cpu")
+    assert first.model is second.model
+    assert load_model(model_name) is first.model
+    assert (
+        TransformerFeatureExtractor(model_name, num_emb_layers=2, device="cpu", share_model=False).model
+        is not first.model
+    )
+    assert (
+        TransformerFeatureExtractor(model_name, num_emb_layers=2, device="cpu", torch_dtype="bfloat16").model
+        is not first.model
+    )
+
+    texts = ["This is sentence 1.", "Another sentence here."]
+    expected = TransformerFeatureExtractor(model_name, num_emb_layers=2, device="cpu", share_model=False)
+    assert torch.allclose(first.extract_features(texts), expected.extract_features(texts), atol=1e-5)
+
+    model_ref = weakref.ref(first.model)
+    del first, second
+    gc.collect()
+    assert model_ref() is None
+
+
+def test_shared_model_concurrent_extractors() -> None:
+    """Test that extractors with different pooling settings can run on one shared model at the same time."""
+    model_name = "cross-encoder/ms-marco-TinyBERT-L-2-v2"
+    settings: List[Dict[str, Any]] = [
+        {"num_emb_layers": 2},
+        {"layers": [1], "pooling": "mean"},
+        {"layers": [0, -1], "pooling": "max"},
+    ]
+    extractors = [TransformerFeatureExtractor(model_name, device="cpu", batch_size=2, **kwargs) for kwargs in settings]
+    assert all(extractor.model is extractors[0].model for extractor in extractors)
+
+    texts = [f"Sentence number {i}." + " with more words" * (i % 4) for i in range(6)]
+    expected = [
+        TransformerFeatureExtractor(model_name, device="cpu", share_model=False, **kwargs).extract_features(texts)
+        for kwargs in settings
+    ]
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        futures = [(i, executor.submit(extractors[i % 3].extract_features, texts)) for i in range(60)]
+        for i, future in futures:
+            assert torch.allclose(future.result(), expected[i % 3], atol=1e-5)
+
+
+@pytest.mark.parametrize("torch_dtype", ["bfloat16", torch.bfloat16])
+def test_torch_dtype(torch_dtype: Any) -> None:
+    """
+    Test that weights are loaded in the requested dtype and that features are still returned as float32.
+
+    Args:
+        torch_dtype (Any): The dtype of the weights.
+    """
+    texts = ["This is sentence 1.", "Another, slightly longer sentence here."]
+    kwargs: Dict[str, Any] = {
+        "model_name": "cross-encoder/ms-marco-TinyBERT-L-2-v2",
+        "num_emb_layers": 2,
+        "device": "cpu",
+    }
+    expected = TransformerFeatureExtractor(**kwargs).extract_features(texts)
+
+    feature_extractor = TransformerFeatureExtractor(**kwargs, torch_dtype=torch_dtype, use_safetensors=True)
+    assert feature_extractor.model.dtype == torch.bfloat16
+    assert feature_extractor.namespace["torch_dtype"] == "torch.bfloat16"
+
+    features = feature_extractor.extract_features(texts)
+    assert features.dtype == torch.float32
+    assert ((features - expected).norm(dim=1) / expected.norm(dim=1)).max() <= 5e-2
+
+
+def test_invalid_torch_dtype() -> None:
+    """Test that invalid dtypes, and quantizing weights that are not float32, are rejected."""
+    with pytest.raises(ValueError, match="Invalid torch_dtype"):
+        TransformerFeatureExtractor("cross-encoder/ms-marco-TinyBERT-L-2-v2", device="cpu", torch_dtype="float64x")
+    with pytest.raises(ValueError, match="Invalid torch_dtype"):
+        TransformerFeatureExtractor("cross-encoder/ms-marco-TinyBERT-L-2-v2", device="cpu", torch_dtype="nn")
+    with pytest.raises(ValueError, match="quantize requires float32"):
+        TransformerFeatureExtractor(
+            "cross-encoder/ms-marco-TinyBERT-L-2-v2", device="cpu", torch_dtype="float16", quantize=True
+        )
+
+
+@pytest.mark.parametrize("layers", [[0], [0, -1], [1, 2]])
+def test_pooling_projected_embeddings(layers: List[int]) -> None:
+    """
+    Test pooling a model that projects its embeddings to the hidden size against its output hidden states.
+
+    Args:
+        layers (List[int]): Indices of the pooled hidden states.
+    """
+    torch.manual_seed(0)
+    config = transformers.ElectraConfig(
+        vocab_size=100,
+        embedding_size=16,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+    )
+    model = transformers.ElectraModel(config).eval()
+    input_ids = torch.randint(1, config.vocab_size, (2, 7))
+    attention_mask = torch.ones_like(input_ids)
+    attention_mask[1, 4:] = 0
+    with torch.no_grad():
+        hidden_states = model(input_ids, attention_mask=attention_mask, output_hidden_states=True)["hidden_states"]
+        features = _LayerPooling(model, layers, "mean")(input_ids, attention_mask)
+    mask = attention_mask.unsqueeze(-1)
+    expected = sum((hidden_states[layer] * mask).sum(dim=1) / mask.sum(dim=1) for layer in layers)
+    assert features.shape == (2, config.hidden_size)
+    assert torch.allclose(features, expected, atol=1e-5)
+
+
 if __name__ == "__main__":
     pytest.main()
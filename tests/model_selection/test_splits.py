@@ -1,11 +1,13 @@
 from contextlib import nullcontext as does_not_raise
 from typing import Any, Collection, Optional, Union
 
+import numpy as np
 import pandas as pd
 import pytest
 from sklearn.model_selection import GroupKFold, KFold, StratifiedGroupKFold, StratifiedKFold
 
 from aimet_ml.model_selection import (
+    encode_cols,
     get_splitter,
     join_cols,
     split_dataset,
@@ -97,6 +99,32 @@ def test_join_cols(cols: Collection[str], sep: str, expectation: Any, sample_df:
         assert all(joined == expectation.enter_result)
 
 
+def test_join_cols_matches_row_wise_join() -> None:
+    """Test that the column-wise join gives the same keys as joining each row."""
+    df = pd.DataFrame({"a": ["x", "y", None, "x"], "b": [1, 2, 3, 1], "c": [0.5, np.nan, 1.0, 0.5]})
+    expected = df[["a", "b", "c"]].apply(lambda row: "|".join(row.astype(str)), axis=1)
+    assert join_cols(df, ("a", "b", "c"), "|").tolist() == expected.tolist()
+
+
+def test_encode_cols() -> None:
+    """Test that rows get the same integer label if and only if they have the same values."""
+    df = pd.DataFrame(
+        {
+            "a": [2, 1, np.nan, 1, 2, np.nan],
+            "b": ["x", "y", "y", "y", "z", "y"],
+            "c": pd.Categorical(["p", "q", "q", "q", "p", "q"], categories=["p", "q", "r"]),
+        }
+    )
+    labels = encode_cols(df, ["a", "b", "c"])
+
+    assert labels.dtype.kind == "i"
+    assert labels.tolist() == [1, 0, 3, 0, 2, 3]
+    assert encode_cols(df, ["c"]).tolist() == [0, 1, 1, 1, 0, 1]
+    assert len(set(labels)) == join_cols(df, ["a", "b", "c"]).nunique()
+    with pytest.raises(ValueError, match="At least a column name is required"):
+        encode_cols(df, [])
+
+
 @pytest.mark.parametrize(
     "stratify_cols, group_cols, n_splits, expectation",
     [
@@ -5,7 +5,15 @@ from typing import Optional
 import numpy as np
 import pytest
 
-from aimet_ml.processing.audio import convert_audio, load_audio
+from aimet_ml.processing.audio import (
+    convert_audio,
+    convert_audio_batch,
+    decode_audio,
+    load_audio,
+    normalize_waveform,
+    normalize_waveforms,
+    stream_audio,
+)
 
 PWD = Path(__file__).parent
 
@@ -114,5 +122,178 @@ def test_convert_audio_from_video(video_file_path: str, temp_output_path: str) -
     os.remove(temp_output_path)
 
 
+def test_load_audio_ffmpeg_backend_matches_pydub(audio_file_path: str) -> None:
+    """Test that the ffmpeg backend decodes the same samples as the pydub backend."""
+    waveform, sample_rate = load_audio(audio_file_path)
+    ffmpeg_waveform, ffmpeg_sample_rate = load_audio(audio_file_path, backend="ffmpeg")
+    assert ffmpeg_sample_rate == sample_rate
+    assert ffmpeg_waveform.dtype == np.float32
+    assert np.array_equal(ffmpeg_waveform, waveform)
+
+
+def test_load_audio_invalid_backend(audio_file_path: str) -> None:
+    """Test that unknown backends are rejected."""
+    with pytest.raises(ValueError, match="Unsupported backend"):
+        load_audio(audio_file_path, backend="unknown")
+
+
+@pytest.mark.parametrize("channels, expected_ndim", [(1, 1), (2, 2), (None, 2)])
+def test_decode_audio_channels(audio_file_path: str, channels: Optional[int], expected_ndim: int) -> None:
+    """Test decoding audio with an explicit channel count."""
+    target_sample_rate = 16000
+    waveform, sample_rate = decode_audio(audio_file_path, target_sample_rate, channels, normalize=True)
+    validate_audio(waveform, sample_rate, target_sample_rate)
+    assert waveform.ndim == expected_ndim
+    assert waveform.flags.writeable
+    if expected_ndim == 2:
+        assert waveform.shape[1] == 2
+    assert np.isclose(np.abs(waveform).max(), 10 ** (-0.1 / 20))
+
+
+@pytest.fixture
+def sine_wave() -> np.ndarray:
+    """Fixture providing three seconds of a full-scale 997 Hz sine sampled at 48 kHz."""
+    return np.sin(2 * np.pi * 997 * np.arange(3 * 48000) / 48000).astype(np.float32)
+
+
+def test_normalize_waveform_peak(sine_wave: np.ndarray) -> None:
+    """Test peak normalization to the default and a custom level."""
+    assert np.isclose(np.abs(normalize_waveform(0.1 * sine_wave)).max(), 10 ** (-0.1 / 20))
+    assert np.isclose(np.abs(normalize_waveform(sine_wave, target_level=-6.0)).max(), 10 ** (-6.0 / 20))
+
+
+def test_normalize_waveform_rms(sine_wave: np.ndarray) -> None:
+    """Test RMS normalization of a stereo waveform."""
+    stereo = np.stack([sine_wave, 0.5 * sine_wave], axis=1)
+    normalized = normalize_waveform(stereo, "rms", -20.0)
+    assert normalized.shape == stereo.shape
+    assert np.isclose(np.sqrt(np.mean(np.square(normalized, dtype=np.float64))), 0.1)
+
+
+def test_normalize_waveform_lufs(sine_wave: np.ndarray) -> None:
+    """Test loudness normalization, where a full-scale 997 Hz sine measures -3.01 LUFS."""
+    normalized = normalize_waveform(sine_wave, "lufs", -23.0, sample_rate=48000)
+    assert np.isclose(np.abs(normalized).max(), 10 ** ((-23.0 + 3.01) / 20), rtol=1e-3)
+    with pytest.raises(ValueError, match="sample_rate is required"):
+        normalize_waveform(sine_wave, "lufs")
+
+
+def test_normalize_waveform_silence() -> None:
+    """Test that silent waveforms are left unchanged."""
+    silence = np.zeros(100, dtype=np.float32)
+    for mode in ["peak", "rms", "lufs"]:
+        assert np.array_equal(normalize_waveform(silence, mode, sample_rate=16000), silence)
+
+
+def test_normalize_waveforms(sine_wave: np.ndarray) -> None:
+    """Test that each clip of a batch is normalized independently."""
+    clips = np.stack([0.1 * sine_wave, 0.5 * sine_wave])
+    for mode in ["peak", "rms", "lufs"]:
+        normalized = normalize_waveforms(clips, mode, -12.0, sample_rate=48000)
+        assert normalized.dtype == np.float32
+        assert np.allclose(normalized[0], normalized[1], atol=1e-5)
+        assert np.allclose(normalized[0], normalize_waveform(clips[0], mode, -12.0, sample_rate=48000), atol=1e-6)
+    with pytest.raises(ValueError, match="2-D array"):
+        normalize_waveforms(sine_wave)
+    with pytest.raises(ValueError, match="Unsupported normalization mode"):
+        normalize_waveforms(clips, "unknown")
+
+
+def test_stream_audio_matches_load_audio(audio_file_path: str) -> None:
+    """Test that non-overlapping windows concatenate to the waveform returned by load_audio."""
+    waveform, sample_rate = load_audio(audio_file_path)
+    windows = list(stream_audio(audio_file_path, window_size=0.5, mono=False))
+    assert all(window.dtype == np.float32 for window in windows)
+    assert all(len(window) == sample_rate // 2 for window in windows[:-1])
+    assert np.array_equal(np.concatenate(windows).ravel(), waveform)
+
+
+@pytest.mark.parametrize("drop_last", [False, True])
+def test_stream_audio_overlapping_windows(audio_file_path: str, drop_last: bool) -> None:
+    """Test streaming overlapping, resampled mono windows."""
+    target_sample_rate = 16000
+    windows = list(stream_audio(audio_file_path, 0.5, 0.25, target_sample_rate, drop_last=drop_last))
+    full_windows = windows[:-1] if not drop_last else windows
+    assert all(window.shape == (target_sample_rate // 2,) for window in full_windows)
+    assert np.array_equal(windows[0][target_sample_rate // 4 :], windows[1][: target_sample_rate // 4])
+    assert len(windows[-1]) <= target_sample_rate // 2
+    for window in windows:
+        validate_audio(window, target_sample_rate, target_sample_rate)
+
+
+def test_stream_audio_from_video(video_file_path: str) -> None:
+    """Test streaming windows with a gap between them from a video file."""
+    windows = list(stream_audio(video_file_path, 0.2, 0.5, target_sr=8000))
+    assert [len(window) for window in windows[:-1]] == [1600] * (len(windows) - 1)
+
+
+def test_stream_audio_invalid_window(audio_file_path: str) -> None:
+    """Test that empty windows are rejected."""
+    with pytest.raises(ValueError, match="at least one sample"):
+        next(stream_audio(audio_file_path, window_size=0))
+
+
+@pytest.mark.parametrize("skip_mode", ["mtime", "hash"])
+def test_convert_audio_batch(audio_file_path: str, video_file_path: str, tmp_path: Path, skip_mode: str) -> None:
+    """Test batch conversion with a failing file, then resuming it with every output up to date."""
+    target_sample_rate = 16000
+    src_files = [audio_file_path, video_file_path, str(tmp_path / "missing.wav")]
+    dst_files = [str(tmp_path / "out" / f"{i}.wav") for i in range(len(src_files))]
+    manifest_path = str(tmp_path / "manifest.jsonl")
+
+    report = convert_audio_batch(
+        src_files,
+        dst_files,
+        target_sample_rate,
+        normalize=True,
+        num_workers=2,
+        skip_mode=skip_mode,
+        manifest_path=manifest_path,
+    )
+    assert [result.status for result in report.results] == ["converted", "converted", "failed"]
+    assert report.failures[0].src_file == src_files[2]
+    assert report.files_per_sec > 0 and report.media_sec_per_sec > 0
+    for dst_file in dst_files[:2]:
+        waveform, sample_rate = load_audio(dst_file)
+        validate_audio(waveform, sample_rate, target_sample_rate)
+    assert sorted(os.listdir(tmp_path / "out")) == ["0.wav", "1.wav"]
+
+    resumed_report = convert_audio_batch(
+        src_files,
+        dst_files,
+        target_sample_rate,
+        normalize=True,
+        num_workers=2,
+        skip_mode=skip_mode,
+        manifest_path=manifest_path,
+    )
+    assert resumed_report.summary()["num_skipped"] == 2
+    assert resumed_report.num_failed == 1
+
+
+def test_convert_audio_batch_changed_params(audio_file_path: str, tmp_path: Path) -> None:
+    """Test that outputs recorded with other parameters are converted again in mtime mode."""
+    dst_files = [str(tmp_path / "out.wav")]
+    manifest_path = str(tmp_path / "manifest.jsonl")
+
+    report = convert_audio_batch([audio_file_path], dst_files, 16000, num_workers=1, manifest_path=manifest_path)
+    assert report.results[0].status == "converted"
+    report = convert_audio_batch([audio_file_path], dst_files, 16000, num_workers=1, manifest_path=manifest_path)
+    assert report.results[0].status == "skipped"
+
+    report = convert_audio_batch([audio_file_path], dst_files, 8000, num_workers=1, manifest_path=manifest_path)
+    assert report.results[0].status == "converted"
+    _, sample_rate = load_audio(dst_files[0])
+    assert sample_rate == 8000
+
+
+def test_convert_audio_batch_invalid_arguments(audio_file_path: str, tmp_path: Path) -> None:
+    """Test the argument validation of convert_audio_batch."""
+    with pytest.raises(ValueError, match="same length"):
+        convert_audio_batch([audio_file_path], [])
+    with pytest.raises(ValueError, match="manifest_path is required"):
+        convert_audio_batch([audio_file_path], [str(tmp_path / "out.wav")], skip_mode="hash")
+
+
 if __name__ == "__main__":
     pytest.main()
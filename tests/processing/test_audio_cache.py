@@ -0,0 +1,104 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from aimet_ml.processing.audio import load_audio
+from aimet_ml.processing.audio_cache import AudioCache
+
+PWD = Path(__file__).parent
+
+
+@pytest.fixture
+def audio_file_path() -> str:
+    """Fixture providing the path to the audio file."""
+    return str(PWD.parent.parent / "aimet_ml" / "resources" / "audios" / "sample.wav")
+
+
+@pytest.fixture
+def video_file_path() -> str:
+    """Fixture providing the path to the video file."""
+    return str(PWD.parent.parent / "aimet_ml" / "resources" / "videos" / "sample.mp4")
+
+
+def load_cached_audio(cache_dir: str, file_path: str) -> float:
+    """
+    Load an audio file through a cache in a separate process.
+
+    Args:
+        cache_dir (str): The cache directory.
+        file_path (str): Path to the audio file.
+
+    Returns:
+        float: The sum of the waveform.
+    """
+    waveform, _ = AudioCache(cache_dir).load_audio(file_path, 16000, normalize=True)
+    return float(np.sum(waveform))
+
+
+def test_audio_cache_hit(audio_file_path: str, tmp_path: Path) -> None:
+    """Test that a cached waveform is memory-mapped and equal to the decoded one."""
+    cache = AudioCache(str(tmp_path))
+    waveform, sample_rate = cache.load_audio(audio_file_path, 16000, normalize=True)
+    cached_waveform, cached_sample_rate = cache.load_audio(audio_file_path, 16000, normalize=True)
+
+    expected_waveform, expected_sample_rate = load_audio(audio_file_path, 16000, normalize=True)
+    assert sample_rate == cached_sample_rate == expected_sample_rate
+    assert isinstance(cached_waveform, np.memmap)
+    assert cached_waveform.dtype == np.float32
+    assert np.array_equal(cached_waveform, expected_waveform)
+    assert np.array_equal(waveform, expected_waveform)
+
+
+def test_audio_cache_keys(audio_file_path: str, tmp_path: Path) -> None:
+    """Test that decoding parameters and file content are part of the cache key."""
+    cache = AudioCache(str(tmp_path / "cache"))
+    _, sample_rate = cache.load_audio(audio_file_path)
+    _, target_sample_rate = cache.load_audio(audio_file_path, 8000)
+    assert (sample_rate, target_sample_rate) == (44100, 8000)
+
+    copied_file_path = tmp_path / "copy.wav"
+    copied_file_path.write_bytes(Path(audio_file_path).read_bytes())
+    cache.load_audio(str(copied_file_path), 8000)
+    assert len(list((tmp_path / "cache").glob("*.npy"))) == 2
+
+
+def test_audio_cache_lru_eviction(audio_file_path: str, video_file_path: str, tmp_path: Path) -> None:
+    """Test that the least recently used entry is evicted to stay under the byte budget."""
+    cache = AudioCache(str(tmp_path), max_bytes=0)
+    cache.load_audio(audio_file_path)
+    assert list(tmp_path.glob("*.npy")) == []
+
+    cache.max_bytes = 10 * 1024**2
+    cache.load_audio(audio_file_path)
+    audio_entry = next(tmp_path.glob("*.npy"))
+    cache.load_audio(video_file_path)
+    video_entry = next(entry for entry in tmp_path.glob("*.npy") if entry != audio_entry)
+    os.utime(audio_entry, (0, 0))
+    os.utime(video_entry, (1, 1))
+
+    cache.load_audio(audio_file_path)
+    assert audio_entry.stat().st_mtime > 1
+
+    cache.max_bytes = os.path.getsize(audio_entry)
+    cache.evict()
+    assert list(tmp_path.glob("*.npy")) == [audio_entry]
+    assert not video_entry.with_suffix(".json").exists()
+
+    cache.clear()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_audio_cache_concurrent_readers(audio_file_path: str, tmp_path: Path) -> None:
+    """Test that several processes can share a cache directory."""
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        sums = list(executor.map(load_cached_audio, [str(tmp_path)] * 8, [audio_file_path] * 8))
+    assert len(set(sums)) == 1
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+    assert not [entry for entry in tmp_path.iterdir() if entry.name.startswith(".")]
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import ffmpeg
+import numpy as np
+import pytest
+
+from aimet_ml.processing.ffmpeg_utils import close_pipe, open_pipe, read_all_into
+
+
+def test_open_pipe_reads_output() -> None:
+    """Test reading the output of an ffmpeg process from its stdout pipe."""
+    stream = ffmpeg.input("anullsrc=r=8000:cl=mono", f="lavfi", t=1).output("pipe:", format="s16le", acodec="pcm_s16le")
+    process = open_pipe(stream)
+    assert process.stdout is not None
+    buffer, num_samples = read_all_into(process.stdout, np.empty(1024, dtype=np.int16))
+    close_pipe(process)
+    assert num_samples == 8000
+    assert not np.any(buffer[:num_samples])
+
+
+def test_close_pipe_reports_stderr(tmp_path: Path) -> None:
+    """Test that the ffmpeg error output, kept out of a pipe, is attached to the raised error."""
+    stream = ffmpeg.input(str(tmp_path / "missing.wav")).output("pipe:", format="s16le")
+    process = open_pipe(stream)
+    assert process.stdout is not None and process.stderr is not None
+    assert process.stdout.read() == b""
+    with pytest.raises(ffmpeg.Error) as exc_info:
+        close_pipe(process)
+    assert b"No such file or directory" in exc_info.value.stderr
+    assert process.stderr.closed
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from aimet_ml.processing.audio import decode_audio
+from aimet_ml.processing.media import load_media
+from aimet_ml.processing.video import load_video_array
+
+PWD = Path(__file__).parent
+
+
+@pytest.fixture
+def audio_file_path() -> str:
+    """Fixture providing the path to the audio file."""
+    return str(PWD.parent.parent / "aimet_ml" / "resources" / "audios" / "sample.wav")
+
+
+@pytest.fixture
+def video_file_path() -> str:
+    """Fixture providing the path to the video file."""
+    return str(PWD.parent.parent / "aimet_ml" / "resources" / "videos" / "sample.mp4")
+
+
+def test_load_media_matches_separate_loaders(video_file_path: str) -> None:
+    """Test that the single-pass loader returns the same frames and samples as the separate loaders."""
+    frames, fps, waveform, sample_rate = load_media(video_file_path)
+    expected_frames, expected_fps = load_video_array(video_file_path)
+    expected_waveform, expected_sample_rate = decode_audio(video_file_path, channels=1)
+
+    assert fps == expected_fps
+    assert sample_rate == expected_sample_rate
+    assert np.array_equal(frames, expected_frames)
+    assert waveform is not None and waveform.dtype == np.float32
+    assert np.array_equal(waveform, expected_waveform)
+
+
+def test_load_media_resampling(video_file_path: str) -> None:
+    """Test that frames and audio are resampled and trimmed to the same time range."""
+    frames, fps, waveform, sample_rate = load_media(
+        video_file_path,
+        target_fps=10,
+        target_sr=16000,
+        start_time=0.5,
+        end_time=1.2,
+        size=(64, 36),
+        grayscale=True,
+        mono=False,
+    )
+    assert fps == 10
+    assert sample_rate == 16000
+    assert frames.shape == (7, 36, 64)
+    assert waveform is not None and waveform.shape == (11200, 2)
+    assert len(frames) / fps == pytest.approx(len(waveform) / sample_rate)
+
+
+def test_load_media_without_video(audio_file_path: str) -> None:
+    """Test that files without a video stream are rejected."""
+    with pytest.raises(ValueError, match="no video stream"):
+        load_media(audio_file_path)
+
+
+if __name__ == "__main__":
+    pytest.main()
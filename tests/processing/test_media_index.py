@@ -0,0 +1,103 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from aimet_ml.processing.media_index import MediaIndex, probe_media
+
+PWD = Path(__file__).parent
+
+
+@pytest.fixture
+def audio_file_path() -> str:
+    """Fixture providing the path to the audio file."""
+    return str(PWD.parent.parent / "aimet_ml" / "resources" / "audios" / "sample.wav")
+
+
+@pytest.fixture
+def video_file_path() -> str:
+    """Fixture providing the path to the video file."""
+    return str(PWD.parent.parent / "aimet_ml" / "resources" / "videos" / "sample.mp4")
+
+
+@pytest.fixture
+def media_index(tmp_path: Path) -> Iterator[MediaIndex]:
+    """Fixture providing an empty media index."""
+    index = MediaIndex(str(tmp_path / "media.sqlite"), num_workers=2)
+    yield index
+    index.close()
+
+
+def test_probe_media(audio_file_path: str, video_file_path: str, tmp_path: Path) -> None:
+    """Test summarizing the streams of audio, video and invalid files."""
+    audio_info = probe_media(audio_file_path)
+    assert audio_info["codec_types"] == ["audio"]
+    assert audio_info["sample_rate"] == 44100
+    assert audio_info["channels"] == 2
+    assert audio_info["fps"] is None
+
+    video_info = probe_media(video_file_path)
+    assert sorted(video_info["codec_types"]) == ["audio", "video"]
+    assert video_info["fps"] == 30
+    assert (video_info["width"], video_info["height"]) == (1280, 720)
+    assert video_info["duration"] > 0
+
+    text_file_path = tmp_path / "notes.txt"
+    text_file_path.write_text("not a media file")
+    assert probe_media(str(text_file_path))["error"]
+
+
+def test_media_index_queries(media_index: MediaIndex, audio_file_path: str, video_file_path: str) -> None:
+    """Test answering queries from the index."""
+    assert media_index.update([audio_file_path, video_file_path]) == 2
+    assert media_index.update([audio_file_path, video_file_path]) == 0
+
+    assert media_index.is_video(video_file_path)
+    assert not media_index.is_video(audio_file_path)
+    assert media_index.get_sample_rate(audio_file_path) == 44100
+    assert media_index.get_duration(video_file_path) == pytest.approx(1.8, abs=0.1)
+    assert media_index.filter_videos([audio_file_path, video_file_path]) == [video_file_path]
+
+
+def test_media_index_invalidation(media_index: MediaIndex, audio_file_path: str, video_file_path: str, tmp_path: Path):
+    """Test that changed files are probed again and that the index persists across instances."""
+    file_path = str(tmp_path / "media")
+    shutil.copy(audio_file_path, file_path)
+    assert not media_index.is_video(file_path)
+
+    shutil.copy(video_file_path, file_path)
+    os.utime(file_path, ns=(0, 0))
+    assert media_index.is_video(file_path)
+
+    reopened_index = MediaIndex(media_index.db_path)
+    assert reopened_index.update([file_path]) == 0
+    assert reopened_index.is_video(file_path)
+    reopened_index.close()
+
+
+def test_media_index_invalid_file(media_index: MediaIndex, tmp_path: Path) -> None:
+    """Test that files that cannot be probed are indexed as non-video files."""
+    text_file_path = tmp_path / "notes.txt"
+    text_file_path.write_text("not a media file")
+    assert not media_index.is_video(str(text_file_path))
+    assert media_index.get(str(text_file_path))["error"]
+
+
+def test_media_index_vanished_file(media_index: MediaIndex, video_file_path: str, tmp_path: Path) -> None:
+    """Test that files removed after being listed are skipped and dropped from the index."""
+    file_path = str(tmp_path / "media")
+    shutil.copy(video_file_path, file_path)
+    assert media_index.update([file_path]) == 1
+
+    os.remove(file_path)
+    assert media_index.update([file_path, video_file_path]) == 1
+    assert media_index.connection.execute("SELECT COUNT(*) FROM media WHERE path = ?", (file_path,)).fetchone() == (0,)
+    assert media_index.filter_videos([file_path, video_file_path]) == [video_file_path]
+    with pytest.raises(FileNotFoundError):
+        media_index.get(file_path)
+
+
+if __name__ == "__main__":
+    pytest.main()
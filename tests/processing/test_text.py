@@ -1,9 +1,19 @@
+import random
 from typing import List
 
+import numpy as np
+import pandas as pd
 import pytest
 from transformers import AutoTokenizer, PreTrainedTokenizer
 
-from aimet_ml.processing.text import clean_repeated_tokens, exclude_keywords, include_keywords, trim_tokens
+from aimet_ml.processing.text import (
+    KeywordMatcher,
+    clean_repeated_tokens,
+    exclude_keywords,
+    include_keywords,
+    trim_tokens,
+    trim_tokens_batch,
+)
 
 
 def tokenize(tokenizer: PreTrainedTokenizer, text: str) -> List[str]:
@@ -77,6 +87,47 @@ def test_exclude_keywords_negative():
     assert exclude_keywords(text, keywords) is False
 
 
+def test_keyword_matcher():
+    """Test the keyword matcher queries with overlapping keywords."""
+    matcher = KeywordMatcher(["he", "she", "his", "hers", "he"])
+    text = "ushers and his"
+    assert matcher.keywords == ["he", "she", "his", "hers"]
+    assert matcher.any(text)
+    assert matcher.all(text)
+    assert not matcher.all("ushe")
+    assert matcher.count(text) == 4
+    assert matcher.find_spans(text) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers"), (11, 14, "his")]
+
+
+def test_keyword_matcher_matches_substring_search():
+    """Test the keyword matcher against naive substring search on random texts."""
+    rng = random.Random(0)
+    for _ in range(500):
+        keywords = ["".join(rng.choices("abc", k=rng.randint(0, 4))) for _ in range(rng.randint(0, 6))]
+        text = "".join(rng.choices("abc", k=rng.randint(0, 20)))
+        matcher = KeywordMatcher(keywords)
+        spans = sorted(
+            (start, start + len(keyword), keyword)
+            for keyword in set(keywords)
+            for start in range(len(text) - len(keyword) + 1)
+            if text.startswith(keyword, start)
+        )
+        assert matcher.any(text) == any(keyword in text for keyword in keywords)
+        assert matcher.all(text) == all(keyword in text for keyword in keywords)
+        assert sorted(matcher.find_spans(text)) == spans
+        assert matcher.count(text) == len(spans)
+
+
+def test_keyword_matcher_mask():
+    """Test matching a Series and a list of texts at once."""
+    matcher = KeywordMatcher(["apple", "banana"])
+    texts = pd.Series(["apple pie", None, "banana and apple", "cherry"], index=[3, 1, 4, 1])
+    assert np.array_equal(matcher.mask(texts), [True, False, True, False])
+    assert np.array_equal(matcher.mask(list(texts), mode="all"), [False, False, True, False])
+    with pytest.raises(ValueError, match="mode"):
+        matcher.mask(texts, mode="none")
+
+
 def test_clean_repeated_tokens():
     """Test clean_repeated_tokens function."""
     tokens = ["hello", "world", "world", "world", "python", "python", "code"]
@@ -98,6 +149,56 @@ def test_clean_repeated_tokens_single_token():
     assert cleaned_tokens == ["hello"]
 
 
+def reference_clean_repeated_tokens(tokens: List[str]) -> List[str]:
+    """
+    Remove sequences of repeated tokens with the original quadratic scan, comparing token slices.
+
+    Args:
+        tokens (list[str]): List of tokens to clean.
+
+    Returns:
+        list[str]: List of tokens with repeated sequences removed.
+    """
+    tokens = tokens.copy()
+    sequence_size = len(tokens) // 2
+    while sequence_size > 0:
+        cur_idx = 0
+        while cur_idx < len(tokens) - sequence_size:
+            next_idx = cur_idx + sequence_size
+            if tokens[cur_idx : cur_idx + sequence_size] == tokens[next_idx : next_idx + sequence_size]:
+                tokens = tokens[: cur_idx + sequence_size] + tokens[next_idx + sequence_size :]
+            else:
+                cur_idx += 1
+        sequence_size -= 1
+    return tokens
+
+
+def test_clean_repeated_tokens_matches_reference():
+    """Test clean_repeated_tokens against the quadratic scan on random looping token lists."""
+    rng = random.Random(0)
+    # multi-character and empty tokens make different token sequences join to the same text
+    vocab = list("abcde") + ["ab", "bc", "abc", ""]
+    for _ in range(2000):
+        tokens: List[str] = []
+        num_tokens = rng.randint(0, 40)
+        while len(tokens) < num_tokens:
+            tokens += rng.choices(vocab, k=rng.randint(1, 6)) * rng.randint(1, 4)
+        assert clean_repeated_tokens(tokens) == reference_clean_repeated_tokens(tokens)
+
+
+def test_clean_repeated_tokens_compares_tokens():
+    """Test that sequences are repeated only when their tokens are equal, not when their joined texts are."""
+    assert clean_repeated_tokens(["ab", "c", "a", "bc"]) == ["ab", "c", "a", "bc"]
+    assert clean_repeated_tokens(["a", "", "a"]) == ["a", "", "a"]
+    assert clean_repeated_tokens(["ab", "c", "ab", "c"]) == ["ab", "c"]
+
+
+def test_clean_repeated_tokens_long_loop():
+    """Test collapsing a long hallucination loop."""
+    tokens = ["hello"] + ["the", "cat", "sat", "on", "the", "mat"] * 500 + ["end"]
+    assert clean_repeated_tokens(tokens) == ["hello", "the", "cat", "sat", "on", "the", "mat", "end"]
+
+
 def test_trim_tokens_with_longer_len(tokenizer: PreTrainedTokenizer, sample_text: str):
     """
     Test trim_and_compare function with max_len longer than the token length of sample_text.
@@ -145,5 +246,39 @@ def test_trim_tokens_with_zero_len(tokenizer: PreTrainedTokenizer, sample_text:
     trim_and_compare(tokenizer, sample_text, 0, 0)
 
 
+@pytest.mark.parametrize("max_len", [0, 3, 100])
+def test_trim_tokens_batch(tokenizer: PreTrainedTokenizer, sample_text: str, max_len: int):
+    """
+    Test that batched trimming keeps the same tokens as trim_tokens and slices the original texts.
+
+    Args:
+        tokenizer (PretrainedTokenizer): The tokenizer.
+        sample_text (str): The sample text.
+        max_len (int): The maximum number of tokens.
+    """
+    texts = pd.Series([sample_text, "", "  Unit Testing, in Software!  ", sample_text.upper()])
+    trimmed_texts, num_tokens = trim_tokens_batch(tokenizer, texts, max_len, batch_size=3)
+    assert trimmed_texts.shape == num_tokens.shape == (len(texts),)
+    for text, trimmed_text, count in zip(texts, trimmed_texts, num_tokens):
+        expected_text, expected_count = trim_tokens(tokenizer, text, max_len)
+        assert count == expected_count
+        assert trimmed_text in text
+        assert tokenize(tokenizer, trimmed_text) == tokenize(tokenizer, expected_text)
+
+
+def test_trim_tokens_batch_slow_tokenizer(sample_text: str):
+    """
+    Test that slow tokenizers fall back to trim_tokens on a process pool.
+
+    Args:
+        sample_text (str): The sample text.
+    """
+    slow_tokenizer = AutoTokenizer.from_pretrained("cross-encoder/ms-marco-TinyBERT-L-2-v2", use_fast=False)
+    texts = [sample_text, "software development"]
+    trimmed_texts, num_tokens = trim_tokens_batch(slow_tokenizer, texts, 3, num_workers=2)
+    assert list(trimmed_texts) == [trim_tokens(slow_tokenizer, text, 3)[0] for text in texts]
+    assert list(num_tokens) == [3, 2]
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -1,11 +1,22 @@
+import errno
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
+import cv2
+import ffmpeg
 import numpy as np
 import pytest
 
-from aimet_ml.processing.video import convert_video, is_video, load_video
+import aimet_ml.processing.video
+from aimet_ml.processing.video import (
+    convert_video,
+    convert_video_batch,
+    is_video,
+    iter_frames,
+    load_video,
+    load_video_array,
+)
 
 PWD = Path(__file__).parent
 
@@ -64,6 +75,149 @@ def test_load_video(video_file_path: str) -> None:
     validate_video(video_file_path)
 
 
+def test_iter_frames(video_file_path: str) -> None:
+    """Test that frames are yielded lazily and match load_video."""
+    frames = iter_frames(video_file_path)
+    assert not isinstance(frames, list)
+    first_frame = next(frames)
+
+    loaded_frames, fps = load_video(video_file_path)
+    assert fps == 30
+    assert len(loaded_frames) == 54
+    assert np.array_equal(first_frame, loaded_frames[0])
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected_num_frames, expected_fps",
+    [
+        ({"stride": 2}, 27, 15),
+        ({"target_fps": 10}, 18, 10),
+        ({"target_fps": 10, "stride": 3}, 6, 10 / 3),
+        ({"target_fps": 60}, 54, 30),
+        ({"start_time": 0.5, "end_time": 1.0}, 15, 30),
+    ],
+)
+def test_load_video_sampling(video_file_path: str, kwargs: dict, expected_num_frames: int, expected_fps: float) -> None:
+    """Test frame striding, target fps sampling and time ranges."""
+    frames, fps = load_video(video_file_path, **kwargs)
+    assert len(frames) == expected_num_frames
+    assert fps == pytest.approx(expected_fps)
+
+
+def test_load_video_seek(video_file_path: str) -> None:
+    """Test that seeking returns the same frames as reading from the start."""
+    frames, _ = load_video(video_file_path, stride=5)
+    seeked_frames, _ = load_video(video_file_path, stride=5, start_time=0.5)
+    assert np.array_equal(seeked_frames[0], frames[3])
+
+
+def test_load_video_transform(video_file_path: str) -> None:
+    """Test resizing and converting frames to grayscale on the fly."""
+    frames, _ = load_video(video_file_path, size=(64, 36))
+    assert frames[0].shape == (36, 64, 3)
+    frames, _ = load_video(video_file_path, size=(64, 36), grayscale=True)
+    assert frames[0].shape == (36, 64)
+    assert frames[0].dtype == np.uint8
+
+
+def test_load_video_invalid_sampling(video_file_path: str) -> None:
+    """Test that invalid sampling arguments are rejected."""
+    with pytest.raises(ValueError, match="stride"):
+        load_video(video_file_path, stride=0)
+    with pytest.raises(ValueError, match="target_fps"):
+        next(iter_frames(video_file_path, target_fps=0))
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{}, {"target_fps": 10, "stride": 2}, {"start_time": 0.5, "stride": 5}, {"size": (64, 36), "grayscale": True}],
+)
+def test_load_video_array(video_file_path: str, kwargs: dict) -> None:
+    """Test that the preallocated array holds the same frames as load_video."""
+    frames, fps = load_video(video_file_path, **kwargs)
+    frames_array, array_fps = load_video_array(video_file_path, **kwargs)
+    assert array_fps == fps
+    assert frames_array.dtype == np.uint8
+    assert frames_array.flags.c_contiguous
+    assert np.array_equal(frames_array, np.stack(frames))
+
+
+def test_load_video_array_memmap(video_file_path: str, tmp_path: Path) -> None:
+    """Test decoding frames into a memory-mapped .npy file."""
+    memmap_path = str(tmp_path / "frames.npy")
+    frames_array, _ = load_video_array(video_file_path, stride=2, memmap_path=memmap_path)
+    assert isinstance(frames_array, np.memmap)
+    assert np.array_equal(np.load(memmap_path), frames_array)
+
+
+@pytest.mark.parametrize("reported_frame_count, expected_num_frames", [(60, 54), (50, 50)])
+def test_load_video_array_frame_count_mismatch(
+    video_file_path: str, monkeypatch: pytest.MonkeyPatch, reported_frame_count: int, expected_num_frames: int
+) -> None:
+    """Test that a wrong frame count from the container is handled by trimming."""
+
+    video_capture = cv2.VideoCapture
+
+    class VideoCapture:
+        def __init__(self, file_path: str):
+            self.cap = video_capture(file_path)
+
+        def __getattr__(self, name: str):
+            return getattr(self.cap, name)
+
+        def get(self, prop_id: int) -> float:
+            if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+                return reported_frame_count
+            return self.cap.get(prop_id)
+
+    monkeypatch.setattr(aimet_ml.processing.video.cv2, "VideoCapture", VideoCapture)
+    frames_array, _ = load_video_array(video_file_path)
+    assert len(frames_array) == expected_num_frames
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"stride": 2},
+        {"target_fps": 7},
+        {"target_fps": 10, "stride": 2, "start_time": 0.3},
+        {"start_time": 0.5, "end_time": 1.2},
+    ],
+)
+def test_ffmpeg_backend_sampling(video_file_path: str, kwargs: dict) -> None:
+    """Test that the ffmpeg backend samples the same frames as the OpenCV backend."""
+    frames, fps = load_video_array(video_file_path, **kwargs)
+    ffmpeg_frames, ffmpeg_fps = load_video_array(video_file_path, backend="ffmpeg", threads=2, **kwargs)
+    assert ffmpeg_fps == fps
+    assert ffmpeg_frames.shape == frames.shape
+    assert np.abs(ffmpeg_frames.astype(np.int16) - frames).mean() < 1
+
+
+def test_ffmpeg_backend_transform(video_file_path: str) -> None:
+    """Test resizing and converting frames to grayscale in ffmpeg."""
+    for grayscale in (False, True):
+        frames, _ = load_video(video_file_path, size=(64, 36), grayscale=grayscale)
+        ffmpeg_frames, _ = load_video(video_file_path, size=(64, 36), grayscale=grayscale, backend="ffmpeg")
+        assert len(ffmpeg_frames) == len(frames)
+        assert ffmpeg_frames[0].shape == frames[0].shape
+        assert ffmpeg_frames[0].dtype == np.uint8
+        assert np.abs(np.stack(ffmpeg_frames).astype(np.int16) - np.stack(frames)).mean() < 5
+
+
+def test_ffmpeg_backend_early_stop(video_file_path: str) -> None:
+    """Test that abandoning the frame iterator stops ffmpeg without raising."""
+    frames = iter_frames(video_file_path, backend="ffmpeg")
+    assert next(frames).shape == (720, 1280, 3)
+    frames.close()  # type: ignore[attr-defined]
+
+
+def test_invalid_backend(video_file_path: str) -> None:
+    """Test that unknown backends are rejected."""
+    with pytest.raises(ValueError, match="backend"):
+        load_video(video_file_path, backend="pyav")
+
+
 def test_convert_video(video_file_path: str, temp_output_path: str) -> None:
     """Test converting video fps."""
     assert is_video(video_file_path)
@@ -72,5 +226,83 @@ def test_convert_video(video_file_path: str, temp_output_path: str) -> None:
     os.remove(temp_output_path)
 
 
+def test_convert_video_error(tmp_path: Path) -> None:
+    """Test that ffmpeg's error message is reported when a conversion fails."""
+    with pytest.raises(ffmpeg.Error) as exc_info:
+        convert_video(str(tmp_path / "missing.mp4"), str(tmp_path / "out.mp4"), 10)
+    assert b"No such file or directory" in exc_info.value.stderr
+
+
+@pytest.mark.parametrize("skip_mode", ["mtime", "hash"])
+def test_convert_video_batch(video_file_path: str, tmp_path: Path, skip_mode: str) -> None:
+    """Test batch conversion with progress reports and a failing file, then resuming it."""
+    src_files = [video_file_path, video_file_path, str(tmp_path / "missing.mp4")]
+    dst_files = [str(tmp_path / "out" / f"{i}.mp4") for i in range(len(src_files))]
+    manifest_path = str(tmp_path / "manifest.jsonl")
+    progress: List[Dict[str, str]] = []
+
+    report = convert_video_batch(
+        src_files,
+        dst_files,
+        10,
+        cpu_budget=4,
+        skip_mode=skip_mode,
+        manifest_path=manifest_path,
+        progress_callback=lambda src_file, info: progress.append(info),
+    )
+    assert [result.status for result in report.results] == ["converted", "converted", "failed"]
+    assert "No such file or directory" in str(report.failures[0].error)
+    assert report.results[0].duration == pytest.approx(1.8, abs=0.1)
+    assert report.results[0].media_sec_per_sec > 0 and report.media_sec_per_sec > 0
+    assert sum(info["progress"] == "end" for info in progress) == 2
+    for dst_file in dst_files[:2]:
+        validate_video(dst_file)
+    assert sorted(os.listdir(tmp_path / "out")) == ["0.mp4", "1.mp4"]
+
+    resumed_report = convert_video_batch(
+        src_files, dst_files, 10, skip_mode=skip_mode, manifest_path=manifest_path, max_retries=0
+    )
+    assert resumed_report.num_skipped == 2
+    assert resumed_report.num_failed == 1
+
+
+def test_convert_video_batch_retry(video_file_path: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that transient failures are retried and permanent ones are not."""
+    run_conversion = aimet_ml.processing.video._run_conversion
+    errors = [ffmpeg.Error("ffmpeg", None, b"Resource temporarily unavailable")]
+
+    def flaky_run_conversion(*args, **kwargs) -> float:
+        if errors:
+            raise errors.pop()
+        return run_conversion(*args, **kwargs)
+
+    monkeypatch.setattr(aimet_ml.processing.video, "_run_conversion", flaky_run_conversion)
+    report = convert_video_batch([video_file_path], [str(tmp_path / "out.mp4")], 10, retry_delay=0)
+    assert report.results[0].status == "converted"
+    assert report.results[0].attempts == 2
+
+    errors.append(ffmpeg.Error("ffmpeg", None, b"Invalid data found when processing input"))
+    report = convert_video_batch([video_file_path], [str(tmp_path / "out2.mp4")], 10, retry_delay=0)
+    assert report.results[0].status == "failed"
+    assert report.results[0].attempts == 1
+
+    errors.append(OSError(errno.EMFILE, "Too many open files"))
+    report = convert_video_batch([video_file_path], [str(tmp_path / "out3.mp4")], 10, retry_delay=0)
+    assert report.results[0].status == "converted"
+    assert report.results[0].attempts == 2
+
+    errors.append(OSError(errno.EISDIR, "Is a directory"))
+    report = convert_video_batch([video_file_path], [str(tmp_path / "out4.mp4")], 10, retry_delay=0)
+    assert report.results[0].status == "failed"
+    assert report.results[0].attempts == 1
+
+
+def test_convert_video_batch_missing_file_not_retried(tmp_path: Path) -> None:
+    """Test that a missing source file fails on the first attempt."""
+    report = convert_video_batch([str(tmp_path / "missing.mp4")], [str(tmp_path / "out.mp4")], 10, retry_delay=0)
+    assert report.results[0].status == "failed"
+    assert report.results[0].attempts == 1
+
+
 if __name__ == "__main__":
     pytest.main()
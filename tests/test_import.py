@@ -0,0 +1,59 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["torch", "transformers", "cv2", "ffmpeg", "pydub", "boto3", "wandb", "matplotlib", "static_ffmpeg"]
+
+
+def imported_modules(statement: str) -> set:
+    """
+    Run an import statement in a fresh interpreter and collect the top-level modules it loaded.
+
+    Args:
+        statement (str): The Python statement to execute.
+
+    Returns:
+        set: Names of the top-level modules present in `sys.modules` afterwards.
+    """
+    code = f"import sys; {statement}; print(' '.join(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return set(output.split())
+
+
+@pytest.mark.parametrize(
+    "statement, allowed",
+    [
+        ("import aimet_ml", set()),
+        ("import aimet_ml.processing, aimet_ml.features, aimet_ml.utils, aimet_ml.metrics", set()),
+        ("from aimet_ml.utils import io_utils", set()),
+        ("from aimet_ml.model_selection import split_dataset", set()),
+        ("from aimet_ml.metrics import flatten_dict", set()),
+        ("from aimet_ml.processing import audio", {"ffmpeg", "pydub", "static_ffmpeg"}),
+    ],
+)
+def test_lazy_imports(statement: str, allowed: set) -> None:
+    """
+    Test that importing lightweight parts of the package does not pull in heavy dependencies.
+
+    Args:
+        statement (str): The import statement to execute.
+        allowed (set): Heavy modules that the statement is expected to load.
+    """
+    loaded = imported_modules(statement)
+    assert loaded.intersection(HEAVY_MODULES) == allowed
+
+
+def test_lazy_attribute_access() -> None:
+    """Test that subpackages and re-exported functions are resolved on first access."""
+    import aimet_ml
+
+    assert aimet_ml.model_selection.join_cols is aimet_ml.model_selection.splits.join_cols
+    assert "processing" in dir(aimet_ml)
+
+    with pytest.raises(AttributeError):
+        aimet_ml.missing_module
+
+
+if __name__ == "__main__":
+    pytest.main()